@@ -1,11 +1,17 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import re
-import time
+import hashlib
 import json
-import random
-from urllib.parse import quote_plus, urlparse
+import os
+from functools import partial
+
+from procar.agendador import obter_agendador
+from procar.busca import PRAZO_LOTE, PRAZO_TELA, buscar_informacoes_peca
+from procar.catalogo import ler_catalogo, obter_catalogo
+from procar.codigos import obter_indice_codigos
+from procar.config import caminho_dados
+from procar.lote import WORKERS_PADRAO, ler_codigos, processar_lote, formatar_duracao
+from procar.metricas import rastrear
+from procar.saude import obter_saude
 
 # Configuração da página
 st.set_page_config(
@@ -84,574 +90,8 @@ Insira o código da peça abaixo e clique em "Buscar Informações" para obter d
 preços, compatibilidade, dimensões e mais.
 """)
 
-# Cache de peças já pesquisadas e validadas
-CACHE_PECAS = {
-    "LR006225": {
-        "nome": "Travessa Dianteira Inferior Land Rover Freelander 2",
-        "fabricante": "Land Rover",
-        "descricao": "TRAVESSA DIANTEIRA INFERIOR LAND ROVER FREELANDER 2 2006 A 2014 - ORIGINAL",
-        "compatibilidade": [
-            "LAND ROVER FREELANDER 2 (2006-2014)",
-            "LAND ROVER DISCOVERY SPORT (2015-2019)",
-            "RANGE ROVER EVOQUE (2012-2018)"
-        ],
-        "preco_novo_min": 580.00,
-        "preco_novo_med": 750.50,
-        "preco_usado_min": 350.00,
-        "preco_usado_med": 450.30,
-        "preco_recond_min": 420.00,
-        "preco_recond_med": 520.00,
-        "dimensoes": {
-            "largura": 40,
-            "altura": 10,
-            "comprimento": 60,
-            "peso": 2.5
-        },
-        "ncm": "87082999",
-        "categoria_ml": "Travessas e Crossmembers",
-        "imagem_url": "https://http2.mlstatic.com/D_NQ_NP_2X_628111-MLB31002253028_062019-F.webp",
-        "fonte": "Cache validado"
-    },
-    "852213BA0A": {
-        "nome": "Suporte Guia Parachoque Traseiro Esquerdo Nissan Versa",
-        "fabricante": "Nissan",
-        "descricao": "SUPORTE GUIA PARACHOQUE TRASEIRO ESQUERDO NISSAN VERSA 2011 A 2019 - ORIGINAL",
-        "compatibilidade": [
-            "NISSAN VERSA (2011-2019)",
-            "NISSAN MARCH (2011-2019)"
-        ],
-        "preco_novo_min": 120.00,
-        "preco_novo_med": 180.50,
-        "preco_usado_min": 80.00,
-        "preco_usado_med": 110.30,
-        "preco_recond_min": 95.00,
-        "preco_recond_med": 130.00,
-        "dimensoes": {
-            "largura": 15,
-            "altura": 10,
-            "comprimento": 25,
-            "peso": 0.35
-        },
-        "ncm": "87082999",
-        "categoria_ml": "Parachoques",
-        "imagem_url": "https://http2.mlstatic.com/D_NQ_NP_2X_991721-MLB43736719278_102020-F.webp",
-        "fonte": "Cache validado"
-    }
-}
-
-# Lista de sites confiáveis para priorizar na busca
-SITES_CONFIAVEIS = [
-    "mercadolivre.com.br",
-    "shopee.com.br",
-    "pecaagora.com.br",
-    "autopecaonline.com.br",
-    "pecasautomotivas.com.br",
-    "buscapecas.com.br",
-    "jaguarlandroverclassic.com",
-    "britcar.com",
-    "autodoc.com.br",
-    "pecas.com.br",
-    "pecauto.com.br",
-    "webpecas.com.br"
-]
-
-# Função para buscar no Google
-def buscar_google(query, num_results=20):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        url = f"https://www.google.com/search?q={quote_plus(query)}&num={num_results}"
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extrair resultados
-        resultados = []
-        for g in soup.find_all('div', class_='g'):
-            anchor = g.find('a')
-            if anchor and anchor.get('href', '').startswith('http'):
-                title_elem = g.find('h3')
-                snippet_elem = g.find('div', class_='VwiC3b') or g.find('span', class_='aCOpRe')
-                
-                title = title_elem.text if title_elem else "Sem título"
-                snippet = snippet_elem.text if snippet_elem else "Sem descrição"
-                link = anchor['href']
-                
-                # Verificar se é um site confiável
-                domain = urlparse(link).netloc
-                confiavel = any(site in domain for site in SITES_CONFIAVEIS)
-                
-                resultados.append({
-                    "titulo": title,
-                    "snippet": snippet,
-                    "link": link,
-                    "confiavel": confiavel,
-                    "domain": domain
-                })
-        
-        # Ordenar resultados: sites confiáveis primeiro
-        resultados.sort(key=lambda x: (not x["confiavel"]))
-        
-        return resultados
-    except Exception as e:
-        return []
-
-# Função para buscar no Mercado Livre
-def buscar_mercado_livre(codigo_peca):
-    try:
-        url = f"https://lista.mercadolivre.com.br/{codigo_peca}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Tentar extrair informações
-        resultados = []
-        items = soup.select('.ui-search-result__content-wrapper')
-        
-        for item in items[:5]:  # Limitar a 5 resultados
-            try:
-                titulo_elem = item.select_one('.ui-search-item__title')
-                preco_elem = item.select_one('.price-tag-fraction')
-                link_elem = item.find_parent('a', class_='ui-search-link')
-                
-                titulo = titulo_elem.text if titulo_elem else "Não disponível"
-                preco = float(preco_elem.text.replace('.', '').replace(',', '.')) if preco_elem else 0
-                link = link_elem['href'] if link_elem else None
-                
-                # Verificar se o código está no título
-                relevancia = 5 if codigo_peca.upper() in titulo.upper() else 1
-                
-                resultados.append({
-                    "titulo": titulo,
-                    "preco": preco,
-                    "link": link,
-                    "relevancia": relevancia
-                })
-            except Exception as e:
-                continue
-        
-        # Ordenar por relevância
-        resultados.sort(key=lambda x: x["relevancia"], reverse=True)
-        
-        return resultados
-    except Exception as e:
-        return []
-
-# Função para buscar na Shopee
-def buscar_shopee(codigo_peca):
-    try:
-        url = f"https://shopee.com.br/search?keyword={codigo_peca}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Tentar extrair informações
-        resultados = []
-        items = soup.select('.shopee-search-item-result__item')
-        
-        for item in items[:5]:  # Limitar a 5 resultados
-            try:
-                titulo_elem = item.select_one('.shopee-item-card__text-name')
-                preco_elem = item.select_one('.shopee-item-card__current-price')
-                link_elem = item.find('a')
-                
-                titulo = titulo_elem.text if titulo_elem else "Não disponível"
-                
-                # Extrair preço (formato pode variar)
-                preco = 0
-                if preco_elem:
-                    preco_text = preco_elem.text.replace('R$', '').strip()
-                    try:
-                        preco = float(preco_text.replace('.', '').replace(',', '.'))
-                    except:
-                        pass
-                
-                # Construir link completo
-                link = None
-                if link_elem and link_elem.get('href'):
-                    href = link_elem['href']
-                    if href.startswith('/'):
-                        link = f"https://shopee.com.br{href}"
-                    else:
-                        link = href
-                
-                # Verificar se o código está no título
-                relevancia = 5 if codigo_peca.upper() in titulo.upper() else 1
-                
-                resultados.append({
-                    "titulo": titulo,
-                    "preco": preco,
-                    "link": link,
-                    "relevancia": relevancia
-                })
-            except Exception as e:
-                continue
-        
-        # Ordenar por relevância
-        resultados.sort(key=lambda x: x["relevancia"], reverse=True)
-        
-        return resultados
-    except Exception as e:
-        return []
-
-# Função para extrair o nome exato da peça a partir dos resultados
-def extrair_nome_exato_peca(resultados_google, resultados_ml, resultados_shopee, codigo_peca):
-    candidatos = []
-    
-    # Processar resultados do Mercado Livre (alta prioridade)
-    for resultado in resultados_ml:
-        titulo = resultado.get("titulo", "")
-        if codigo_peca.upper() in titulo.upper():
-            # Limpar o título
-            titulo_limpo = re.sub(r'\b' + re.escape(codigo_peca) + r'\b', '', titulo, flags=re.IGNORECASE).strip()
-            titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
-            
-            if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
-                candidatos.append({
-                    "nome": titulo_limpo,
-                    "pontuacao": 10,
-                    "fonte": "Mercado Livre",
-                    "url": resultado.get("link", "")
-                })
-    
-    # Processar resultados da Shopee
-    for resultado in resultados_shopee:
-        titulo = resultado.get("titulo", "")
-        if codigo_peca.upper() in titulo.upper():
-            # Limpar o título
-            titulo_limpo = re.sub(r'\b' + re.escape(codigo_peca) + r'\b', '', titulo, flags=re.IGNORECASE).strip()
-            titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
-            
-            if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
-                candidatos.append({
-                    "nome": titulo_limpo,
-                    "pontuacao": 8,
-                    "fonte": "Shopee",
-                    "url": resultado.get("link", "")
-                })
-    
-    # Processar resultados do Google
-    for resultado in resultados_google:
-        titulo = resultado.get("titulo", "")
-        snippet = resultado.get("snippet", "")
-        domain = resultado.get("domain", "")
-        
-        # Verificar se o código está no título ou snippet
-        if codigo_peca.upper() in titulo.upper() or codigo_peca.upper() in snippet.upper():
-            # Extrair do título
-            if codigo_peca.upper() in titulo.upper():
-                # Limpar o título
-                titulo_limpo = re.sub(r'\b' + re.escape(codigo_peca) + r'\b', '', titulo, flags=re.IGNORECASE).strip()
-                titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
-                
-                if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
-                    pontuacao_base = 7
-                    
-                    # Aumentar pontuação para sites confiáveis
-                    if resultado.get("confiavel", False):
-                        pontuacao_base += 3
-                    
-                    candidatos.append({
-                        "nome": titulo_limpo,
-                        "pontuacao": pontuacao_base,
-                        "fonte": f"Google ({domain})",
-                        "url": resultado.get("link", "")
-                    })
-            
-            # Extrair do snippet
-            match_snippet = re.search(r'([^.,:;]+' + re.escape(codigo_peca) + r'[^.,:;]+)', snippet, re.IGNORECASE)
-            if match_snippet:
-                snippet_text = match_snippet.group(1).strip()
-                # Limpar o snippet
-                snippet_limpo = re.sub(r'\b' + re.escape(codigo_peca) + r'\b', '', snippet_text, flags=re.IGNORECASE).strip()
-                snippet_limpo = re.sub(r'^\W+|\W+$', '', snippet_limpo).strip()  # Remover pontuação no início/fim
-                
-                if len(snippet_limpo) > 10:  # Garantir que não seja muito curto
-                    pontuacao_base = 5
-                    
-                    # Aumentar pontuação para sites confiáveis
-                    if resultado.get("confiavel", False):
-                        pontuacao_base += 2
-                    
-                    candidatos.append({
-                        "nome": snippet_limpo,
-                        "pontuacao": pontuacao_base,
-                        "fonte": f"Google Snippet ({domain})",
-                        "url": resultado.get("link", "")
-                    })
-    
-    # Pontuar os candidatos
-    for candidato in candidatos:
-        nome = candidato["nome"].lower()
-        
-        # Adicionar pontos para nomes mais específicos
-        if re.search(r'(travessa|suporte|defletor|lanterna|filtro|longarina|parachoque|crossmember)', nome):
-            candidato["pontuacao"] += 3
-        
-        # Adicionar pontos para nomes com fabricante
-        if re.search(r'(renault|fiat|volkswagen|vw|chevrolet|gm|ford|toyota|honda|hyundai|kia|nissan|land rover)', nome):
-            candidato["pontuacao"] += 2
-        
-        # Adicionar pontos para nomes com "original"
-        if "original" in nome:
-            candidato["pontuacao"] += 1
-        
-        # Penalizar nomes muito longos
-        if len(nome) > 100:
-            candidato["pontuacao"] -= 2
-    
-    # Ordenar por pontuação
-    candidatos.sort(key=lambda x: x["pontuacao"], reverse=True)
-    
-    # Retornar o melhor candidato e a lista completa para debug
-    if candidatos:
-        return {
-            "nome": candidatos[0]["nome"],
-            "fonte": candidatos[0]["fonte"],
-            "url": candidatos[0]["url"],
-            "todos_candidatos": candidatos[:5]  # Retornar os 5 melhores para debug
-        }
-    else:
-        return {
-            "nome": None,
-            "fonte": None,
-            "url": None,
-            "todos_candidatos": []
-        }
-
-# Função para extrair fabricante do código com base em padrões conhecidos
-def extrair_fabricante_por_padrao(codigo_peca):
-    codigo_upper = codigo_peca.upper()
-    
-    # Land Rover / Jaguar
-    if codigo_upper.startswith("LR") or codigo_upper.startswith("JLR"):
-        return "Land Rover"
-    
-    # Nissan
-    if re.match(r'^[0-9]{6}[A-Z]{2}[0-9]?[A-Z]?$', codigo_upper):
-        return "Nissan"
-    
-    # Hyundai/Kia
-    if re.match(r'^[0-9]{5,6}[A-Z][0-9]{4}[A-Z]$', codigo_upper):
-        return "Hyundai/Kia"
-    
-    # Toyota
-    if re.match(r'^[0-9]{10}$', codigo_upper):
-        return "Toyota"
-    
-    # Renault
-    if re.match(r'^[0-9]{7}[A-Z][0-9]?[A-Z]?$', codigo_upper):
-        return "Renault"
-    
-    # Volkswagen
-    if re.match(r'^[A-Z]{2}[0-9]{6}$', codigo_upper) or re.match(r'^[0-9]{3}[A-Z]{3}[0-9]{3}[A-Z]?$', codigo_upper):
-        return "Volkswagen"
-    
-    # Honda
-    if re.match(r'^[0-9]{10}[A-Z]{2}$', codigo_upper):
-        return "Honda"
-    
-    # Fiat
-    if re.match(r'^[0-9]{7}$', codigo_upper):
-        return "Fiat"
-    
-    # Ford
-    if re.match(r'^[A-Z][0-9]{9,10}$', codigo_upper):
-        return "Ford"
-    
-    # Chevrolet
-    if re.match(r'^[0-9]{8}$', codigo_upper):
-        return "Chevrolet"
-    
-    # BMW
-    if re.match(r'^[0-9]{11}$', codigo_upper) or re.match(r'^[0-9]{7}$', codigo_upper):
-        return "BMW"
-    
-    # Mercedes-Benz
-    if re.match(r'^A[0-9]{10}$', codigo_upper) or re.match(r'^[0-9]{3}[A-Z]{3}[0-9]{2}$', codigo_upper):
-        return "Mercedes-Benz"
-    
-    return None
-
-# Função para extrair fabricante do título da peça
-def extrair_fabricante_do_titulo(titulo):
-    fabricantes = [
-        "Renault", "Fiat", "Volkswagen", "VW", "Chevrolet", "GM", "Ford", "Toyota", 
-        "Honda", "Hyundai", "Kia", "Nissan", "Peugeot", "Citroen", "BMW", "Mercedes", 
-        "Audi", "Mitsubishi", "Subaru", "Suzuki", "Jeep", "Land Rover", "Jaguar", 
-        "Volvo", "Porsche", "Ferrari", "Lamborghini", "Maserati", "Bentley", "Rolls-Royce"
-    ]
-    
-    for fabricante in fabricantes:
-        if fabricante.lower() in titulo.lower():
-            # Normalizar nomes de fabricantes
-            if fabricante.lower() == "vw":
-                return "Volkswagen"
-            if fabricante.lower() == "gm":
-                return "Chevrolet"
-            return fabricante
-    
-    return None
-
-# Função para extrair categoria da peça
-def extrair_categoria(titulo):
-    categorias = {
-        "Suspensão": ["suspensão", "amortecedor", "mola", "bandeja", "pivô", "barra", "estabilizador", "manga de eixo"],
-        "Motor": ["motor", "pistão", "biela", "virabrequim", "comando", "válvula", "cabeçote", "bloco", "junta", "correia", "tensor"],
-        "Freio": ["freio", "pastilha", "disco", "pinça", "cilindro", "fluido", "abs"],
-        "Elétrica": ["elétric", "sensor", "módulo", "chicote", "farol", "lanterna", "lâmpada", "bateria", "alternador", "motor de partida"],
-        "Carroceria": ["carroceria", "porta", "capô", "painel", "para-choque", "parachoque", "paralama", "teto", "coluna", "longarina", "defletor", "suporte", "guia"],
-        "Transmissão": ["transmissão", "câmbio", "embreagem", "disco de embreagem", "platô", "diferencial", "semi-eixo", "homocinética"],
-        "Arrefecimento": ["arrefecimento", "radiador", "ventoinha", "bomba d'água", "bomba de água", "reservatório", "mangueira", "válvula termostática"],
-        "Direção": ["direção", "caixa de direção", "bomba de direção", "hidráulica", "coluna de direção", "terminal", "barra de direção"],
-        "Injeção": ["injeção", "bico injetor", "bomba de combustível", "filtro", "tanque", "sonda lambda", "sensor de oxigênio"],
-        "Escapamento": ["escapamento", "catalisador", "silencioso", "coletor", "abafador", "tubo"],
-        "Interior": ["interior", "banco", "painel", "console", "tapete", "acabamento", "forro", "volante"],
-        "Vidros": ["vidro", "janela", "para-brisa", "parabrisa", "máquina de vidro", "elevador de vidro"],
-        "Travessas": ["travessa", "crossmember", "reforço", "reinforcement", "support panel"]
-    }
-    
-    titulo_lower = titulo.lower()
-    
-    for categoria, palavras_chave in categorias.items():
-        for palavra in palavras_chave:
-            if palavra.lower() in titulo_lower:
-                return categoria
-    
-    return None
-
-# Função para extrair NCM com base na categoria
-def obter_ncm_por_categoria(categoria):
-    ncm_dict = {
-        "Suspensão": "87088000",
-        "Motor": "84099990",
-        "Freio": "87083090",
-        "Elétrica": "85119000",
-        "Carroceria": "87082999",
-        "Transmissão": "87084090",
-        "Arrefecimento": "87089990",
-        "Direção": "87087090",
-        "Injeção": "84133030",
-        "Escapamento": "87089200",
-        "Interior": "87082100",
-        "Vidros": "70072900",
-        "Lanternas": "85122022",
-        "Faróis": "85122010",
-        "Filtros": "84213100",
-        "Travessas": "87082999"
-    }
-    
-    return ncm_dict.get(categoria, "87089990")  # Código genérico para outras peças automotivas
-
-# Função para extrair informações detalhadas de um site
-def extrair_informacoes_site(url, codigo_peca):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extrair título da página
-        titulo = soup.title.text if soup.title else ""
-        
-        # Extrair descrição
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        descricao = meta_desc['content'] if meta_desc else ""
-        
-        # Extrair texto relevante
-        texto_relevante = ""
-        for tag in soup.find_all(['h1', 'h2', 'h3', 'p', 'li', 'td']):
-            if codigo_peca.upper() in tag.text.upper():
-                texto_relevante += tag.text.strip() + " "
-        
-        # Extrair preço
-        preco = None
-        preco_elems = soup.find_all(text=re.compile(r'R\$\s*\d+[,.]\d+'))
-        if preco_elems:
-            for elem in preco_elems:
-                match = re.search(r'R\$\s*(\d+[,.]\d+)', elem)
-                if match:
-                    try:
-                        preco = float(match.group(1).replace('.', '').replace(',', '.'))
-                        break
-                    except:
-                        continue
-        
-        # Extrair compatibilidade
-        compatibilidade = []
-        for tag in soup.find_all(['li', 'p', 'div']):
-            if any(palavra in tag.text.lower() for palavra in ['compatível', 'compatibilidade', 'aplicação', 'serve para']):
-                compatibilidade.append(tag.text.strip())
-        
-        # Extrair dimensões
-        dimensoes = {}
-        for tag in soup.find_all(['li', 'p', 'div', 'td']):
-            if any(palavra in tag.text.lower() for palavra in ['dimensão', 'dimensões', 'medida', 'medidas', 'peso']):
-                texto = tag.text.lower()
-                
-                # Largura
-                match_largura = re.search(r'largura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
-                if match_largura:
-                    dimensoes['largura'] = float(match_largura.group(1).replace(',', '.'))
-                
-                # Altura
-                match_altura = re.search(r'altura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
-                if match_altura:
-                    dimensoes['altura'] = float(match_altura.group(1).replace(',', '.'))
-                
-                # Comprimento
-                match_comp = re.search(r'(?:comprimento|profundidade)[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
-                if match_comp:
-                    dimensoes['comprimento'] = float(match_comp.group(1).replace(',', '.'))
-                
-                # Peso
-                match_peso = re.search(r'peso[:\s]*(\d+(?:[,.]\d+)?)\s*(?:kg|g)', texto)
-                if match_peso:
-                    peso = float(match_peso.group(1).replace(',', '.'))
-                    unidade = re.search(r'peso[:\s]*\d+(?:[,.]\d+)?\s*(kg|g)', texto)
-                    if unidade and unidade.group(1) == 'g':
-                        peso = peso / 1000  # Converter de g para kg
-                    dimensoes['peso'] = peso
-        
-        # Extrair imagem
-        imagem_url = None
-        img_tags = soup.find_all('img')
-        for img in img_tags:
-            src = img.get('src', '')
-            if src and (codigo_peca.upper() in src.upper() or 
-                       (img.get('alt', '') and codigo_peca.upper() in img.get('alt', '').upper())):
-                imagem_url = src
-                break
-        
-        return {
-            "titulo": titulo,
-            "descricao": descricao,
-            "texto_relevante": texto_relevante,
-            "preco": preco,
-            "compatibilidade": compatibilidade,
-            "dimensoes": dimensoes,
-            "imagem_url": imagem_url,
-            "url": url
-        }
-    except Exception as e:
-        return {
-            "titulo": "",
-            "descricao": "",
-            "texto_relevante": "",
-            "preco": None,
-            "compatibilidade": [],
-            "dimensoes": {},
-            "imagem_url": None,
-            "url": url
-        }
-
-# Função para buscar informações da peça
-def buscar_informacoes_peca(codigo_peca):
+# Função para buscar informações da peça exibindo o progresso na tela
+def buscar_com_progresso(codigo_peca):
     # Limpar a sessão para garantir que não haja dados de buscas anteriores
     if 'resultados_anteriores' in st.session_state:
         del st.session_state['resultados_anteriores']
@@ -659,256 +99,61 @@ def buscar_informacoes_peca(codigo_peca):
     # Simulação de busca em progresso
     progress_bar = st.progress(0)
     status_text = st.empty()
-    
-    # Iniciar busca
-    status_text.text("Iniciando busca...")
-    progress_bar.progress(10)
-    
-    # Verificar se o código está no cache de peças validadas (alta prioridade)
-    codigo_normalizado = codigo_peca.upper()
-    if codigo_normalizado in CACHE_PECAS:
-        # Finalizar
-        status_text.text("Peça encontrada no cache validado!")
-        progress_bar.progress(100)
-        time.sleep(0.3)
-        status_text.empty()
-        progress_bar.empty()
-        return CACHE_PECAS[codigo_normalizado]
-    
-    # Buscar no Google primeiro (prioridade máxima)
-    status_text.text("Buscando informações no Google...")
-    progress_bar.progress(15)
-    resultados_google = buscar_google(f"{codigo_peca} peça automotiva nome exato", 20)
-    
-    # Buscar no Mercado Livre (alta prioridade)
-    status_text.text("Buscando no Mercado Livre...")
-    progress_bar.progress(25)
-    resultados_ml = buscar_mercado_livre(codigo_peca)
-    
-    # Buscar na Shopee
-    status_text.text("Buscando na Shopee...")
-    progress_bar.progress(35)
-    resultados_shopee = buscar_shopee(codigo_peca)
-    
-    # Extrair o nome exato da peça
-    status_text.text("Extraindo nome exato da peça...")
-    progress_bar.progress(45)
-    info_nome_exato = extrair_nome_exato_peca(resultados_google, resultados_ml, resultados_shopee, codigo_peca)
-    
-    # Mostrar os resultados do Google para debug
-    resultados_debug = []
-    for i, resultado in enumerate(resultados_google[:5]):
-        resultados_debug.append(f"{i+1}. {resultado.get('titulo', 'Sem título')} - {resultado.get('snippet', 'Sem descrição')[:100]}...")
-    
-    # Extrair informações detalhadas dos melhores resultados
-    status_text.text("Extraindo informações detalhadas...")
-    progress_bar.progress(55)
-    
-    # Coletar URLs para análise detalhada
-    urls_para_analise = []
-    
-    # Adicionar URLs do Mercado Livre (alta prioridade)
-    for resultado in resultados_ml[:3]:
-        if "link" in resultado and resultado["link"]:
-            urls_para_analise.append(resultado["link"])
-    
-    # Adicionar URLs da Shopee
-    for resultado in resultados_shopee[:2]:
-        if "link" in resultado and resultado["link"]:
-            urls_para_analise.append(resultado["link"])
-    
-    # Adicionar URLs do Google (priorizar sites confiáveis)
-    for resultado in resultados_google:
-        if "link" in resultado and resultado["link"] and resultado.get("confiavel", False):
-            urls_para_analise.append(resultado["link"])
-    
-    # Adicionar mais alguns resultados do Google não confiáveis
-    for resultado in resultados_google:
-        if "link" in resultado and resultado["link"] and not resultado.get("confiavel", False):
-            urls_para_analise.append(resultado["link"])
-            if len(urls_para_analise) >= 10:  # Limitar a 10 URLs no total
-                break
-    
-    # Remover duplicatas
-    urls_para_analise = list(set(urls_para_analise))
-    
-    # Extrair informações detalhadas
-    informacoes_detalhadas = []
-    total_urls = len(urls_para_analise)
-    
-    for i, url in enumerate(urls_para_analise):
-        status_text.text(f"Analisando site {i+1} de {total_urls}...")
-        progress_bar.progress(55 + int((i / total_urls) * 25))
-        info = extrair_informacoes_site(url, codigo_peca)
-        informacoes_detalhadas.append(info)
-    
-    # Processar e consolidar resultados
-    status_text.text("Processando e consolidando informações...")
-    progress_bar.progress(80)
-    
-    # Usar o nome exato da peça se disponível
-    nome_peca = info_nome_exato.get("nome")
-    fonte_info = info_nome_exato.get("fonte")
-    url_fonte = info_nome_exato.get("url")
-    candidatos_nome = info_nome_exato.get("todos_candidatos", [])
-    
-    # Se não encontrou nome exato, tentar extrair de outras fontes
-    if not nome_peca:
-        for info in informacoes_detalhadas:
-            titulo = info.get("titulo", "")
-            if codigo_peca.upper() in titulo.upper():
-                nome_peca = titulo.split(" - ")[0].strip()
-                fonte_info = "Site especializado"
-                url_fonte = info.get("url", "")
-                break
-    
-    # Se ainda não encontrou, usar um nome genérico
-    if not nome_peca:
-        nome_peca = f"Peça automotiva {codigo_peca}"
-        fonte_info = "Busca online"
-    
-    # Extrair fabricante
-    fabricante = None
-    
-    # Tentar extrair fabricante do nome da peça
-    if nome_peca:
-        fabricante = extrair_fabricante_do_titulo(nome_peca)
-    
-    # Tentar identificar fabricante pelo padrão do código
-    if not fabricante:
-        fabricante_por_padrao = extrair_fabricante_por_padrao(codigo_peca)
-        if fabricante_por_padrao:
-            fabricante = fabricante_por_padrao
-    
-    # Se ainda não tiver fabricante, usar um genérico
-    if not fabricante:
-        fabricante = "Não identificado"
-    
-    # Extrair categoria
-    categoria = None
-    if nome_peca:
-        categoria = extrair_categoria(nome_peca)
-    
-    if not categoria:
-        categoria = "Peças Automotivas"
-    
-    # Extrair preços
-    precos = []
-    for resultado in resultados_ml:
-        if "preco" in resultado and resultado["preco"] > 0:
-            precos.append(resultado["preco"])
-    
-    for resultado in resultados_shopee:
-        if "preco" in resultado and resultado["preco"] > 0:
-            precos.append(resultado["preco"])
-    
-    for info in informacoes_detalhadas:
-        if info.get("preco") and info.get("preco") > 0:
-            precos.append(info["preco"])
-    
-    # Calcular preços se houver dados
-    if precos:
-        preco_medio = sum(precos) / len(precos)
-        preco_min = min(precos)
-    else:
-        # Gerar preços estimados baseados na categoria
-        if categoria == "Motor":
-            preco_medio = round(random.uniform(500, 3000), 2)
-        elif categoria == "Transmissão":
-            preco_medio = round(random.uniform(400, 2500), 2)
-        elif categoria == "Suspensão":
-            preco_medio = round(random.uniform(200, 800), 2)
-        elif categoria == "Freio":
-            preco_medio = round(random.uniform(150, 600), 2)
-        elif categoria == "Carroceria":
-            preco_medio = round(random.uniform(300, 1500), 2)
-        else:
-            preco_medio = round(random.uniform(150, 1000), 2)
-        
-        preco_min = round(preco_medio * 0.8, 2)
-    
-    # Obter NCM com base na categoria
-    ncm = obter_ncm_por_categoria(categoria)
-    
-    # Extrair compatibilidade
-    compatibilidade = []
-    for info in informacoes_detalhadas:
-        if info.get("compatibilidade"):
-            compatibilidade.extend(info["compatibilidade"])
-    
-    # Remover duplicatas e limitar a 5 itens
-    compatibilidade = list(set(compatibilidade))[:5]
-    
-    # Gerar compatibilidade baseada no fabricante se não encontrou
-    if not compatibilidade:
-        if fabricante != "Não identificado":
-            compatibilidade = [
-                f"{fabricante} - Modelos compatíveis (consultar manual)",
-                "Verifique a compatibilidade com seu veículo"
-            ]
-        else:
-            compatibilidade = ["Verifique a compatibilidade com seu veículo"]
-    
-    # Extrair dimensões
-    dimensoes = {}
-    for info in informacoes_detalhadas:
-        if info.get("dimensoes"):
-            for key, value in info["dimensoes"].items():
-                if key not in dimensoes:
-                    dimensoes[key] = value
-    
-    # Gerar dimensões se não encontrou
-    if not dimensoes:
-        dimensoes = {
-            "largura": random.randint(10, 50),
-            "altura": random.randint(10, 50),
-            "comprimento": random.randint(10, 150),
-            "peso": round(random.uniform(0.1, 10), 2)
-        }
-    
-    # Extrair imagem
-    imagem_url = None
-    for info in informacoes_detalhadas:
-        if info.get("imagem_url"):
-            imagem_url = info["imagem_url"]
-            break
-    
-    # Construir descrição
-    descricao = f"{nome_peca.upper()} - CÓDIGO {codigo_peca} - {fabricante.upper()}"
-    
-    # Construir objeto de informações da peça
-    info_peca = {
-        "nome": nome_peca,
-        "fabricante": fabricante,
-        "descricao": descricao,
-        "compatibilidade": compatibilidade,
-        "preco_novo_min": preco_min,
-        "preco_novo_med": preco_medio,
-        "preco_usado_min": round(preco_min * 0.7, 2),
-        "preco_usado_med": round(preco_medio * 0.7, 2),
-        "preco_recond_min": round(preco_min * 0.8, 2),
-        "preco_recond_med": round(preco_medio * 0.8, 2),
-        "dimensoes": dimensoes,
-        "ncm": ncm,
-        "categoria_ml": categoria,
-        "imagem_url": imagem_url,
-        "fonte": fonte_info,
-        "url_fonte": url_fonte,
-        "resultados_debug": resultados_debug,
-        "candidatos_nome": candidatos_nome
-    }
-    
-    # Finalizar
-    status_text.text("Busca concluída!")
-    progress_bar.progress(100)
-    time.sleep(0.3)
+    previa = st.empty()
+    parciais = {"fabricante": None, "precos_ml": [], "anuncios_ml": 0, "sites": []}
+    
+    def ao_progresso(percentual, mensagem):
+        status_text.text(mensagem)
+        progress_bar.progress(percentual)
+    
+    # Guardar cada etapa concluída e redesenhar a prévia
+    def ao_parcial(etapa, dados):
+        if etapa == "fabricante":
+            parciais["fabricante"] = dados["fabricante"]
+        elif etapa == "fonte" and dados["nome"] == "mercado_livre":
+            parciais["anuncios_ml"] = len(dados["resultados"])
+            parciais["precos_ml"] = [resultado["preco"] for resultado in dados["resultados"] if resultado.get("preco", 0) > 0]
+        elif etapa == "site":
+            parciais["sites"].append(dados)
+        mostrar_previa(previa, parciais)
+    
+    # Guardar o tempo de cada etapa para o painel de depuração
+    with rastrear("busca", codigo=codigo_peca, origem="tela") as rastreamento:
+        info_peca = buscar_informacoes_peca(codigo_peca, ao_progresso=ao_progresso, ao_parcial=ao_parcial,
+                                            prazo=PRAZO_TELA)
+    st.session_state.rastreamento_busca = rastreamento.para_dict()
     
     # Limpar elementos temporários
     status_text.empty()
     progress_bar.empty()
+    previa.empty()
     
     return info_peca
 
+# Função para mostrar o que já se sabe da peça enquanto a busca continua
+def mostrar_previa(previa, parciais):
+    with previa.container():
+        st.markdown('<div class="search-results">', unsafe_allow_html=True)
+        st.markdown(f"**Fabricante provável (pelo código):** {parciais['fabricante'] or 'Não identificado'}")
+        
+        precos_ml = parciais["precos_ml"]
+        if precos_ml:
+            st.markdown(
+                f"**Mercado Livre:** {len(precos_ml)} preços em {parciais['anuncios_ml']} anúncios | "
+                f"mínimo R$ {min(precos_ml):.2f} | médio R$ {sum(precos_ml) / len(precos_ml):.2f}"
+            )
+        
+        for info in parciais["sites"]:
+            if not info.get("titulo"):
+                continue
+            detalhes = [info["titulo"][:80]]
+            if info.get("preco"):
+                detalhes.append(f"R$ {info['preco']:.2f}")
+            if info.get("dimensoes"):
+                detalhes.append(", ".join(f"{chave}: {valor}" for chave, valor in info["dimensoes"].items()))
+            st.markdown("- " + " | ".join(detalhes))
+        st.markdown('</div>', unsafe_allow_html=True)
+
 # Formulário de busca
 with st.form(key="search_form"):
     col1, col2 = st.columns([3, 1])
@@ -933,8 +178,30 @@ st.markdown("""
 - `LR006225` - Travessa Dianteira Inferior Land Rover Freelander 2
 """)
 
+# Escolher um código sugerido (ou confirmar a busca na internet) na próxima execução
+def escolher_codigo(codigo):
+    st.session_state.codigo_escolhido = codigo
+
+# Antes de ir à internet, oferecer códigos já conhecidos que começam com o digitado ou
+# que diferem dele em uma letra
+buscar_agora = False
+codigo_escolhido = st.session_state.pop("codigo_escolhido", None)
+if codigo_escolhido:
+    codigo_peca = codigo_escolhido
+    buscar_agora = True
+elif submit_button and codigo_peca:
+    sugestoes = obter_indice_codigos().sugerir(codigo_peca)
+    if sugestoes:
+        st.info(f"O código {codigo_peca} ainda não foi buscado. Você quis dizer:")
+        colunas_sugestoes = st.columns(len(sugestoes) + 1)
+        for coluna, sugestao in zip(colunas_sugestoes, sugestoes):
+            coluna.button(sugestao, key=f"sugestao_{sugestao}", on_click=escolher_codigo, args=(sugestao,))
+        colunas_sugestoes[-1].button("Buscar na internet", on_click=escolher_codigo, args=(codigo_peca,))
+    else:
+        buscar_agora = True
+
 # Processar a busca quando o botão for clicado
-if submit_button and codigo_peca:
+if buscar_agora:
     # Limpar área de resultados anteriores
     if 'resultado_container' in st.session_state:
         st.session_state.resultado_container.empty()
@@ -947,7 +214,18 @@ if submit_button and codigo_peca:
         st.markdown('<h2 class="sub-header">Resultados para ' + codigo_peca + '</h2>', unsafe_allow_html=True)
         
         # Buscar informações da peça
-        info_peca = buscar_informacoes_peca(codigo_peca)
+        info_peca = buscar_com_progresso(codigo_peca)
+        
+        # Avisar quando alguma etapa não terminou (prazo da busca ou fonte que não respondeu a tempo)
+        if info_peca.get("parcial"):
+            campos_parciais = [campo for campo, situacao in info_peca["completude"].items() if situacao == "parcial"]
+            if info_peca.get("motivo_parcial") == "fontes" and info_peca.get("fontes_cortadas"):
+                verbo = "não responderam" if len(info_peca["fontes_cortadas"]) > 1 else "não respondeu"
+                motivo = f"{' e '.join(info_peca['fontes_cortadas'])} {verbo} a tempo"
+            else:
+                motivo = f"A busca foi interrompida pelo prazo de {PRAZO_TELA} s"
+            st.warning(f"{motivo}; estes campos podem estar incompletos: {', '.join(campos_parciais)}. "
+                       f"Busque de novo para completar.")
         
         # Exibir resultados
         col1, col2 = st.columns([2, 1])
@@ -966,6 +244,8 @@ if submit_button and codigo_peca:
             
             # NCM e Categoria
             st.markdown(f"**NCM:** {info_peca['ncm']}")
+            if info_peca.get("gtin"):
+                st.markdown(f"**GTIN/EAN:** {info_peca['gtin']}")
             st.markdown(f"**Categoria Sugerida (Mercado Livre):** {info_peca['categoria_ml']}")
             
             # Fonte da informação
@@ -1005,6 +285,29 @@ if submit_button and codigo_peca:
                 for resultado in info_peca['resultados_debug']:
                     st.markdown(f"- {resultado}")
                 st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Tempos de cada etapa (para debug)
+            rastreamento = st.session_state.get("rastreamento_busca")
+            if rastreamento:
+                with st.expander(f"Tempos de cada etapa ({rastreamento['duracao_ms']:.0f} ms no total)"):
+                    st.dataframe([
+                        {
+                            "Etapa": f"{trecho['tipo']}: {trecho['nome']}",
+                            "Início (ms)": trecho["inicio_ms"],
+                            "Duração (ms)": trecho["duracao_ms"],
+                            "Status": trecho["status"],
+                            "Bytes": trecho["bytes"],
+                            "HTTP": trecho["http_status"],
+                            "Erro": trecho["erro"]
+                        }
+                        for trecho in rastreamento["trechos"]
+                    ], use_container_width=True)
+                    st.download_button(
+                        "Baixar rastreamento (JSON)",
+                        json.dumps(rastreamento, ensure_ascii=False, indent=2),
+                        file_name=f"rastreamento_{codigo_peca}.json",
+                        mime="application/json"
+                    )
         
         with col2:
             # Imagem da peça
@@ -1017,21 +320,120 @@ if submit_button and codigo_peca:
             
             # Peça Nova
             st.markdown("#### Peça Nova")
-            st.markdown(f"**Preço Mínimo:** R$ {info_peca['preco_novo_min']:.2f}")
-            st.markdown(f"**Preço Médio:** R$ {info_peca['preco_novo_med']:.2f}")
+            if info_peca['preco_novo_min'] is not None:
+                st.markdown(f"**Preço Mínimo:** R$ {info_peca['preco_novo_min']:.2f}")
+                st.markdown(f"**Preço Médio:** R$ {info_peca['preco_novo_med']:.2f}")
+            else:
+                st.markdown("Preço não informado")
             
             # Peça Usada
-            if info_peca.get('preco_usado_min', 0) > 0:
+            if (info_peca.get('preco_usado_min') or 0) > 0:
                 st.markdown("#### Peça Usada")
                 st.markdown(f"**Preço Mínimo:** R$ {info_peca['preco_usado_min']:.2f}")
                 st.markdown(f"**Preço Médio:** R$ {info_peca['preco_usado_med']:.2f}")
             
             # Peça Recondicionada
-            if info_peca.get('preco_recond_min', 0) > 0:
+            if (info_peca.get('preco_recond_min') or 0) > 0:
                 st.markdown("#### Peça Recondicionada")
                 st.markdown(f"**Preço Mínimo:** R$ {info_peca['preco_recond_min']:.2f}")
                 st.markdown(f"**Preço Médio:** R$ {info_peca['preco_recond_med']:.2f}")
             st.markdown('</div>', unsafe_allow_html=True)
 
+# Busca por nome no catálogo local
+with st.expander("Busca por nome (catálogo local)"):
+    texto_nome = st.text_input("Nome da peça", placeholder="Ex: travessa freelander",
+                               help="Procura nos catálogos de fornecedores importados com 'procar ingest'")
+    if texto_nome:
+        encontrados = obter_catalogo().buscar_por_nome(texto_nome, limite=20)
+        if encontrados:
+            for registro in encontrados:
+                st.markdown(f"- `{registro['codigo']}` - {registro['nome']} ({registro['fabricante'] or 'fabricante não informado'})")
+        else:
+            st.markdown("Nenhuma peça encontrada no catálogo local.")
+    
+    arquivo_catalogo = st.file_uploader("Importar catálogo de fornecedor", type=["csv", "jsonl", "txt"],
+                                        help="CSV ou JSONL com código, nome, fabricante, dimensões e NCM")
+    if arquivo_catalogo and st.button("Importar catálogo"):
+        contagem = obter_catalogo().ingerir(ler_catalogo(arquivo_catalogo.getvalue()), origem=arquivo_catalogo.name)
+        st.success(f"{contagem['novos']} peças novas, {contagem['alterados']} alteradas, "
+                   f"{contagem['inalterados']} inalteradas.")
+
+# Busca em lote a partir de um arquivo de códigos
+with st.expander("Busca em lote (arquivo CSV)"):
+    arquivo_lote = st.file_uploader("Arquivo com os códigos das peças", type=["csv", "txt"],
+                                    help="CSV com uma coluna 'codigo' ou um código por linha")
+    col_lote1, col_lote2 = st.columns(2)
+    with col_lote1:
+        formato_lote = st.radio("Formato do resultado", ["CSV", "JSONL"], horizontal=True)
+    with col_lote2:
+        workers_lote = st.slider("Buscas simultâneas", 1, 16, WORKERS_PADRAO)
+    
+    if arquivo_lote and st.button("Processar lote"):
+        conteudo_lote = arquivo_lote.getvalue()
+        codigos_lote = ler_codigos(conteudo_lote)
+        
+        # O mesmo arquivo sempre grava na mesma saída, para retomar lotes interrompidos
+        identificador = hashlib.sha1(conteudo_lote).hexdigest()[:12]
+        caminho_saida = caminho_dados(f"lote_{identificador}.{formato_lote.lower()}")
+        
+        barra_lote = st.progress(0)
+        metricas_lote = st.empty()
+        
+        def ao_progresso_lote(estatisticas):
+            barra_lote.progress(int(100 * estatisticas.concluidos / max(estatisticas.total, 1)))
+            metricas_lote.text(
+                f"{estatisticas.concluidos} de {estatisticas.total} peças | "
+                f"{estatisticas.vazao:.2f} peças/s | falhas: {estatisticas.falhas} | "
+                f"tempo restante: {formatar_duracao(estatisticas.eta)}"
+            )
+        
+        estatisticas_lote = processar_lote(codigos_lote, partial(buscar_informacoes_peca, prazo=PRAZO_LOTE),
+                                           caminho_saida, workers=workers_lote, ao_progresso=ao_progresso_lote)
+        st.success(f"Lote concluído: {estatisticas_lote.concluidos} peças em {formatar_duracao(estatisticas_lote.decorrido)}.")
+        st.session_state.lote_saida = caminho_saida
+    
+    if st.session_state.get("lote_saida"):
+        caminho_saida = st.session_state.lote_saida
+        with open(caminho_saida, "rb") as arquivo_saida:
+            st.download_button("Baixar resultado", arquivo_saida.read(),
+                               file_name=os.path.basename(caminho_saida))
+
+# Saúde das fontes de busca e dos sites (para quem opera o buscador)
+with st.expander("Saúde das fontes e sites"):
+    estado_saude = obter_saude().estado()
+    if not estado_saude:
+        st.write("Nenhuma fonte consultada desde que o servidor foi iniciado.")
+    else:
+        st.dataframe([
+            {
+                "Fonte/domínio": chave,
+                "Circuito": saude["estado"],
+                "Consultas": saude["observacoes"],
+                "Sucesso": f"{saude['taxa_sucesso']:.0%}" if saude["taxa_sucesso"] is not None else "-",
+                "Itens (média)": saude["itens_medio"],
+                "Latência p50 (ms)": saude["latencia_p50_ms"],
+                "Nova tentativa em (s)": saude["nova_tentativa_em_s"]
+            }
+            for chave, saude in estado_saude.items()
+        ], use_container_width=True)
+        st.caption("Fontes e sites com o circuito aberto não são consultados até a nova tentativa.")
+        if st.button("Reabrir todas as fontes"):
+            obter_saude().reiniciar()
+            st.rerun()
+    
+    # Fila de cada domínio no agendador de downloads
+    estado_filas = obter_agendador().estado()
+    if estado_filas:
+        st.markdown("**Filas por domínio**")
+        st.dataframe([
+            {
+                "Domínio": dominio,
+                "Pedidos por segundo": fila["taxa_por_s"] or "sem limite",
+                "Esperando": fila["esperando"],
+                "Pausado por (s)": fila["pausado_por_s"]
+            }
+            for dominio, fila in estado_filas.items()
+        ], use_container_width=True)
+
 # Rodapé
 st.markdown('<div class="footer">Procar.net - Buscador de Autopeças © 2025</div>', unsafe_allow_html=True)
@@ -0,0 +1,146 @@
+# Compara o tempo de CPU por página da extração antiga (várias passadas com BeautifulSoup)
+# com a extração em uma única passada de procar.pagina, e confere que o resultado é o mesmo.
+#
+# Uso: python benchmarks/extracao_pagina.py [pagina.html ...] [--codigo 628117709R]
+# Sem arquivos, gera páginas sintéticas com aninhamento crescente.
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from procar.pagina import analisar_pagina
+
+
+# Extração antiga de extrair_informacoes_site, mantida aqui só como referência
+def extrair_legado(html, codigo_peca):
+    soup = BeautifulSoup(html, 'html.parser')
+    titulo = soup.title.text if soup.title else ""
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    descricao = meta_desc.get('content', '') if meta_desc else ""
+
+    texto_relevante = ""
+    for tag in soup.find_all(['h1', 'h2', 'h3', 'p', 'li', 'td']):
+        if codigo_peca.upper() in tag.text.upper():
+            texto_relevante += tag.text.strip() + " "
+
+    preco = None
+    for elem in soup.find_all(string=re.compile(r'R\$\s*\d+[,.]\d+')):
+        # Preços dentro de <script>/<style> deixaram de contar também na extração nova
+        if elem.parent is not None and elem.parent.name in ("script", "style"):
+            continue
+        match = re.search(r'R\$\s*(\d+[,.]\d+)', elem)
+        if match:
+            try:
+                preco = float(match.group(1).replace('.', '').replace(',', '.'))
+                break
+            except ValueError:
+                continue
+
+    compatibilidade = []
+    for tag in soup.find_all(['li', 'p', 'div']):
+        if any(palavra in tag.text.lower() for palavra in ['compatível', 'compatibilidade', 'aplicação', 'serve para']):
+            compatibilidade.append(tag.text.strip())
+
+    dimensoes = {}
+    for tag in soup.find_all(['li', 'p', 'div', 'td']):
+        if any(palavra in tag.text.lower() for palavra in ['dimensão', 'dimensões', 'medida', 'medidas', 'peso']):
+            texto = tag.text.lower()
+            match_largura = re.search(r'largura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
+            if match_largura:
+                dimensoes['largura'] = float(match_largura.group(1).replace(',', '.'))
+            match_altura = re.search(r'altura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
+            if match_altura:
+                dimensoes['altura'] = float(match_altura.group(1).replace(',', '.'))
+            match_comp = re.search(r'(?:comprimento|profundidade)[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)', texto)
+            if match_comp:
+                dimensoes['comprimento'] = float(match_comp.group(1).replace(',', '.'))
+            match_peso = re.search(r'peso[:\s]*(\d+(?:[,.]\d+)?)\s*(?:kg|g)', texto)
+            if match_peso:
+                peso = float(match_peso.group(1).replace(',', '.'))
+                unidade = re.search(r'peso[:\s]*\d+(?:[,.]\d+)?\s*(kg|g)', texto)
+                if unidade and unidade.group(1) == 'g':
+                    peso = peso / 1000
+                dimensoes['peso'] = peso
+
+    imagem_url = None
+    for img in soup.find_all('img'):
+        src = img.get('src', '')
+        if src and (codigo_peca.upper() in src.upper() or
+                    (img.get('alt', '') and codigo_peca.upper() in img.get('alt', '').upper())):
+            imagem_url = src
+            break
+
+    return {
+        "titulo": titulo,
+        "descricao": descricao,
+        "texto_relevante": texto_relevante,
+        "preco": preco,
+        "compatibilidade": compatibilidade,
+        "dimensoes": dimensoes,
+        "imagem_url": imagem_url
+    }
+
+
+# Página sintética parecida com um anúncio de marketplace, com "profundidade" divs aninhadas
+def pagina_sintetica(codigo_peca, profundidade, itens=40):
+    partes = [
+        "<html><head><title>Defletor Radiador %s - Loja</title>" % codigo_peca,
+        '<meta name="description" content="Defletor de ar original %s">' % codigo_peca,
+        "<script>window.__ESTADO__ = {\"preco\": 1};</script></head><body>"
+    ]
+    partes.append("<div class='nivel'>" * profundidade)
+    partes.append("<h1>Defletor Ar Esquerdo Radiador %s</h1>" % codigo_peca)
+    partes.append("<span class='preco'>R$ 189,90</span>")
+    partes.append('<img src="https://img.exemplo.com/%s.webp" alt="foto">' % codigo_peca)
+    partes.append("<ul>")
+    for i in range(itens):
+        partes.append("<li>Item %d da descrição da peça com texto de preenchimento</li>" % i)
+    partes.append("<li>Compatível com Renault Sandero 2015</li>")
+    partes.append("</ul><table><tr><td>Dimensões: largura 40 cm, altura 10 cm</td></tr>")
+    partes.append("<tr><td>Peso: 350 g</td></tr></table>")
+    partes.append("</div>" * profundidade)
+    partes.append("</body></html>")
+    return "".join(partes)
+
+
+def medir(funcao, html, codigo_peca, repeticoes):
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        resultado = funcao(html, codigo_peca)
+    return (time.process_time() - inicio) / repeticoes, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de CPU por página: extração antiga x passada única")
+    parser.add_argument("arquivos", nargs="*")
+    parser.add_argument("--codigo", default="628117709R")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.arquivos:
+        paginas = [(os.path.basename(caminho), open(caminho, encoding="utf-8", errors="replace").read())
+                   for caminho in args.arquivos]
+    else:
+        paginas = [(f"sintetica_profundidade_{p}", pagina_sintetica(args.codigo, p)) for p in (5, 50, 200, 500)]
+
+    for nome, html in paginas:
+        tempo_antigo, antigo = medir(extrair_legado, html, args.codigo, args.repeticoes)
+        tempo_novo, novo = medir(analisar_pagina, html, args.codigo, args.repeticoes)
+        print(json.dumps({
+            "pagina": nome,
+            "bytes": len(html.encode("utf-8")),
+            "cpu_ms_antigo": round(tempo_antigo * 1000, 2),
+            "cpu_ms_novo": round(tempo_novo * 1000, 2),
+            "ganho": round(tempo_antigo / tempo_novo, 1) if tempo_novo else None,
+            "resultado_igual": antigo == novo
+        }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Gera o corpus de páginas usado pelos benchmarks.
+#
+# As páginas reproduzem a marcação que os buscadores procuram (div.g do Google,
+# .ui-search-result__content-wrapper do Mercado Livre, .shopee-search-item-result__item da Shopee
+# e páginas de produto com preço, compatibilidade e ficha técnica), com o volume de scripts,
+# estilos e aninhamento típico dessas páginas. Páginas reais salvas do navegador podem ser
+# colocadas no mesmo diretório (como .html ou .html.gz) seguindo o mesmo padrão de nomes.
+import gzip
+import os
+import random
+
+CODIGO = "628117709R"
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+PALAVRAS = ("defletor ar radiador esquerdo renault sandero logan duster original peça "
+            "frete grátis garantia envio imediato novo usado lado motorista kit").split()
+
+
+def frase(aleatorio, tamanho):
+    return " ".join(aleatorio.choice(PALAVRAS) for _ in range(tamanho))
+
+
+def cabecalho(aleatorio, titulo, descricao=None, scripts=40):
+    partes = ["<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>", f"<title>{titulo}</title>"]
+    if descricao:
+        partes.append(f'<meta name="description" content="{descricao}">')
+    partes.append("<style>" + "".join(f".c{i}{{margin:{i}px;padding:{i % 7}px}}" for i in range(800)) + "</style>")
+    for i in range(scripts):
+        partes.append("<script>window.__D%d = %s;</script>" % (i, [aleatorio.randint(0, 10 ** 6) for _ in range(60)]))
+    partes.append("</head><body>")
+    partes.append("<header><nav>" + "".join(f"<a href='/c/{i}' class='menu'>{frase(aleatorio, 2)}</a>" for i in range(120)) + "</nav></header>")
+    return "".join(partes)
+
+
+def rodape(aleatorio):
+    return "<footer>" + "".join(f"<p class='c{i}'>{frase(aleatorio, 12)}</p>" for i in range(80)) + "</footer></body></html>"
+
+
+def aninhar(conteudo, profundidade, classe="wrap"):
+    return f"<div class='{classe}'>" * profundidade + conteudo + "</div>" * profundidade
+
+
+def pagina_google(aleatorio):
+    resultados = []
+    sites = ["produto.mercadolivre.com.br", "www.pecaagora.com.br", "www.autodoc.com.br", "forum.exemplo.com",
+             "www.webpecas.com.br", "blog.exemplo.net"]
+    for i in range(20):
+        site = sites[i % len(sites)]
+        resultados.append(aninhar(
+            f"<div class='g'><div class='yuRUbf'><a href='https://{site}/p/{CODIGO}-{i}'><h3>Defletor Ar Radiador "
+            f"{CODIGO} Renault {frase(aleatorio, 3)}</h3></a></div><div class='VwiC3b'>Peça original {CODIGO}: "
+            f"{frase(aleatorio, 25)}.</div></div>", 6, "MjjYud"))
+    return (cabecalho(aleatorio, f"{CODIGO} peça automotiva - Pesquisa Google", scripts=60)
+            + aninhar("".join(resultados), 8, "rso") + rodape(aleatorio))
+
+
+def pagina_mercado_livre(aleatorio):
+    itens = []
+    for i in range(48):
+        preco = aleatorio.randint(80, 400)
+        itens.append(
+            f"<li class='ui-search-layout__item'><div class='ui-search-result'>"
+            f"<a class='ui-search-link' href='https://produto.mercadolivre.com.br/MLB-{1000 + i}-defletor'>"
+            + aninhar(
+                f"<div class='ui-search-result__content-wrapper'><h2 class='ui-search-item__title'>Defletor Ar "
+                f"Radiador Esquerdo {CODIGO if i % 3 == 0 else ''} Renault {frase(aleatorio, 4)}</h2>"
+                f"<div class='ui-search-price'><span class='price-tag-symbol'>R$</span>"
+                f"<span class='price-tag-fraction'>{preco}</span></div>"
+                f"<p class='ui-search-item__shipping'>{frase(aleatorio, 6)}</p></div>", 5, "ui-search-result__wrapper")
+            + "</a></div></li>")
+    return (cabecalho(aleatorio, f"{CODIGO} | MercadoLivre", scripts=120)
+            + aninhar("<ol class='ui-search-layout'>" + "".join(itens) + "</ol>", 10, "ui-search-main")
+            + rodape(aleatorio))
+
+
+def pagina_shopee(aleatorio):
+    itens = []
+    for i in range(60):
+        itens.append(aninhar(
+            f"<div class='shopee-search-item-result__item'><a href='/Defletor-{CODIGO}-i.{i}'>"
+            f"<div class='shopee-item-card__text-name'>Defletor Radiador {CODIGO} {frase(aleatorio, 5)}</div>"
+            f"<div class='shopee-item-card__current-price'>R$ {aleatorio.randint(60, 300)},{aleatorio.randint(10, 99)}</div>"
+            f"</a></div>", 4, "col-xs-2-4"))
+    return (cabecalho(aleatorio, f"{CODIGO} | Shopee Brasil", scripts=150)
+            + aninhar("".join(itens), 12, "shopee-search-item-result") + rodape(aleatorio))
+
+
+def pagina_detalhe(aleatorio, profundidade, com_dados_estruturados):
+    ficha = (
+        "<table class='andes-table'>"
+        "<tr><td>Dimensões da embalagem</td><td>Largura: 40 cm</td></tr>"
+        "<tr><td>Medidas</td><td>Altura: 10 cm, Comprimento: 60 cm</td></tr>"
+        "<tr><td>Peso: 350 g</td></tr></table>")
+    corpo = (
+        f"<h1 class='ui-pdp-title'>Defletor Ar Esquerdo Radiador Renault Sandero {CODIGO}</h1>"
+        f"<div class='ui-pdp-price'><span>R$ 189,90</span></div>"
+        f"<img src='https://http2.mlstatic.com/D_NQ_NP_{CODIGO}-F.webp' alt='Defletor {CODIGO}'>"
+        "<ul>" + "".join(f"<li>{frase(aleatorio, 14)}</li>" for _ in range(60)) + "</ul>"
+        "<p>Compatível com Renault Sandero 2015 a 2020 e Logan 2014 a 2019</p>"
+        f"<p>Código original {CODIGO}</p>" + ficha
+        + "".join(f"<div class='q'><p>{frase(aleatorio, 20)}</p></div>" for _ in range(150)))
+    html = cabecalho(aleatorio, f"Defletor Ar Esquerdo Radiador {CODIGO} - Renault", f"Defletor de ar original {CODIGO}", scripts=100)
+    if com_dados_estruturados:
+        html = html.replace("</head>", (
+            '<meta property="og:title" content="Defletor Ar Esquerdo Radiador Renault ' + CODIGO + '">'
+            '<meta property="og:image" content="https://http2.mlstatic.com/D_NQ_NP_' + CODIGO + '-F.webp">'
+            '<meta property="product:price:amount" content="189.90">'
+            '<script type="application/ld+json">{"@context":"https://schema.org","@type":"Product",'
+            '"name":"Defletor Ar Esquerdo Radiador Renault Sandero","sku":"' + CODIGO + '","mpn":"' + CODIGO + '",'
+            '"gtin13":"7891234567895","brand":{"@type":"Brand","name":"Renault"},'
+            '"image":"https://http2.mlstatic.com/D_NQ_NP_' + CODIGO + '-F.webp",'
+            '"width":{"@type":"QuantitativeValue","value":40,"unitCode":"CMT"},'
+            '"height":{"@type":"QuantitativeValue","value":10,"unitCode":"CMT"},'
+            '"depth":{"@type":"QuantitativeValue","value":60,"unitCode":"CMT"},'
+            '"weight":{"@type":"QuantitativeValue","value":0.35,"unitCode":"KGM"},'
+            '"offers":{"@type":"Offer","price":"189.90","priceCurrency":"BRL"}}</script></head>'))
+    return html + aninhar(corpo, profundidade, "ui-pdp-container") + rodape(aleatorio)
+
+
+def main():
+    aleatorio = random.Random(42)
+    paginas = {
+        "google": pagina_google(aleatorio),
+        "mercado_livre": pagina_mercado_livre(aleatorio),
+        "shopee": pagina_shopee(aleatorio),
+        "detalhe_mercado_livre": pagina_detalhe(aleatorio, 40, True),
+        "detalhe_loja": pagina_detalhe(aleatorio, 15, False),
+    }
+    for nome, html in paginas.items():
+        caminho = os.path.join(DIRETORIO, f"{nome}.html.gz")
+        with gzip.GzipFile(caminho, "wb", mtime=0) as arquivo:
+            arquivo.write(html.encode("utf-8"))
+        print(f"{caminho}: {len(html) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
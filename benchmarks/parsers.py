@@ -0,0 +1,99 @@
+# Compara os backends de parsing (selectolax, lxml, html.parser) nas páginas salvas em
+# benchmarks/paginas, com e sem parsing parcial, e confere se os resultados batem.
+#
+# Uso: python benchmarks/parsers.py [--repeticoes 5]
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procar import fontes
+from procar.pagina import analisar_pagina
+from procar.parser_html import backends_disponiveis
+
+DIRETORIO_PAGINAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paginas")
+CODIGO = "628117709R"
+
+
+# Função para carregar as páginas salvas (.html ou .html.gz), agrupadas pelo nome do arquivo
+def carregar_paginas(diretorio=DIRETORIO_PAGINAS):
+    paginas = {}
+    for caminho in sorted(glob.glob(os.path.join(diretorio, "*.html*"))):
+        nome = os.path.basename(caminho).split(".")[0]
+        abrir = gzip.open if caminho.endswith(".gz") else open
+        with abrir(caminho, "rb") as arquivo:
+            paginas[nome] = arquivo.read().decode("utf-8", errors="replace")
+    return paginas
+
+
+# Extratores por tipo de página: recebem (html, backend, parcial)
+def extrator_google(html, backend, parcial):
+    return _com_filtro("SOMENTE_GOOGLE", parcial, lambda: fontes.extrair_resultados_google(html, backend))
+
+
+def extrator_mercado_livre(html, backend, parcial):
+    return _com_filtro("SOMENTE_MERCADO_LIVRE", parcial,
+                       lambda: fontes.extrair_resultados_mercado_livre(html, CODIGO, backend))
+
+
+def extrator_shopee(html, backend, parcial):
+    return _com_filtro("SOMENTE_SHOPEE", parcial, lambda: fontes.extrair_resultados_shopee(html, CODIGO, backend))
+
+
+def extrator_detalhe(html, backend, parcial):
+    return analisar_pagina(html, CODIGO, backend)
+
+
+# Desliga temporariamente o parsing parcial de uma fonte
+def _com_filtro(nome, parcial, funcao):
+    original = getattr(fontes, nome)
+    if not parcial:
+        setattr(fontes, nome, None)
+    try:
+        return funcao()
+    finally:
+        setattr(fontes, nome, original)
+
+
+def extrator_para(nome_pagina):
+    if nome_pagina.startswith("google"):
+        return extrator_google
+    if nome_pagina.startswith("mercado_livre"):
+        return extrator_mercado_livre
+    if nome_pagina.startswith("shopee"):
+        return extrator_shopee
+    return extrator_detalhe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os backends de parsing nas páginas salvas")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    for nome, html in carregar_paginas().items():
+        extrator = extrator_para(nome)
+        referencia = extrator(html, "html.parser", False)
+        variantes = [(backend, parcial) for backend in backends_disponiveis() for parcial in (False, True)
+                     if not (parcial and (backend == "selectolax" or extrator is extrator_detalhe))]
+        for backend, parcial in variantes:
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                resultado = extrator(html, backend, parcial)
+            tempo = (time.perf_counter() - inicio) / args.repeticoes
+            print(json.dumps({
+                "pagina": nome,
+                "backend": backend,
+                "parcial": parcial,
+                "ms": round(tempo * 1000, 2),
+                "itens": len(resultado) if isinstance(resultado, list) else None,
+                "igual_html_parser": resultado == referencia
+            }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# Mede cada etapa da busca de uma peça sem acessar a internet: as páginas salvas em
+# benchmarks/paginas fazem o papel do Google, do Mercado Livre, da Shopee e das páginas de detalhe.
+#
+# Para cada etapa informa a vazão, os percentis de latência e o pico de memória, em JSON, para
+# comparar revisões:
+#
+#   python benchmarks/pipeline.py -o antes.json
+#   (alterar o código)
+#   python benchmarks/pipeline.py -o depois.json --comparar antes.json
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caches e históricos vão para um diretório temporário, para não misturar com os dados reais
+os.environ["PROCAR_DADOS"] = tempfile.mkdtemp(prefix="procar_benchmark_")
+atexit.register(shutil.rmtree, os.environ["PROCAR_DADOS"], ignore_errors=True)
+
+from benchmarks.parsers import CODIGO, carregar_paginas  # noqa: E402
+from procar import busca, extracao, fontes  # noqa: E402
+from procar.cache import obter_cache_pecas  # noqa: E402
+from procar.parser_html import escolher_backend  # noqa: E402
+
+ETAPAS = (
+    "buscar_google",
+    "buscar_mercado_livre",
+    "buscar_shopee",
+    "extrair_informacoes_site",
+    "extrair_nome_exato_peca",
+    "consolidacao"
+)
+
+
+# Resposta HTTP mínima (o pipeline só usa .text, .content e .status_code)
+class RespostaGravada:
+    def __init__(self, url, html):
+        self.url = url
+        self.text = html
+        self.content = html.encode("utf-8")
+        self.status_code = 200
+
+
+# Função que substitui rede.baixar: escolhe a página salva de acordo com a URL
+def criar_baixar_offline(paginas):
+    def baixar(url, headers=None, timeout=10, usar_cache=True, max_bytes=None):
+        dominio = urlparse(url).netloc
+        if "google." in dominio:
+            nome = "google"
+        elif dominio.startswith("lista.mercadolivre"):
+            nome = "mercado_livre"
+        elif "shopee" in dominio and "/search" in url:
+            nome = "shopee"
+        elif "mercadolivre" in dominio:
+            nome = "detalhe_mercado_livre"
+        else:
+            nome = "detalhe_loja"
+        return RespostaGravada(url, paginas[nome])
+    return baixar
+
+
+# Função para calcular um percentil (posição mais próxima) de uma lista ordenada
+def percentil(ordenados, fracao):
+    if not ordenados:
+        return None
+    indice = min(len(ordenados) - 1, max(0, int(round(fracao * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+# Função para medir uma etapa: latência de cada execução e pico de memória de uma execução extra
+def medir(funcao, repeticoes, aquecimento=1):
+    for _ in range(aquecimento):
+        funcao()
+
+    latencias = []
+    inicio_total = time.perf_counter()
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        latencias.append(time.perf_counter() - inicio)
+    total = time.perf_counter() - inicio_total
+
+    # A memória é medida à parte, porque o tracemalloc deixa tudo mais lento
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias.sort()
+    return {
+        "execucoes": repeticoes,
+        "vazao_por_s": round(repeticoes / total, 2) if total else None,
+        "latencia_ms": {
+            "p50": round(percentil(latencias, 0.50) * 1000, 3),
+            "p90": round(percentil(latencias, 0.90) * 1000, 3),
+            "p99": round(percentil(latencias, 0.99) * 1000, 3),
+            "max": round(latencias[-1] * 1000, 3),
+            "media": round(sum(latencias) / len(latencias) * 1000, 3)
+        },
+        "pico_memoria_kb": round(pico / 1024, 1)
+    }
+
+
+# Função para montar as funções de cada etapa, já com as entradas prontas
+def montar_etapas(paginas):
+    resultados_google = fontes.buscar_google(f"{CODIGO} peça automotiva")
+    resultados_ml = fontes.buscar_mercado_livre(CODIGO)
+    resultados_shopee = fontes.buscar_shopee(CODIGO)
+    url_detalhe = next((resultado["link"] for resultado in resultados_ml if resultado.get("link")),
+                       "https://produto.mercadolivre.com.br/MLB-1")
+
+    def consolidacao():
+        # Sem cache de peças: cada execução faz a busca completa
+        obter_cache_pecas().remover(CODIGO)
+        return busca.buscar_informacoes_peca(CODIGO)
+
+    return {
+        "buscar_google": lambda: fontes.buscar_google(f"{CODIGO} peça automotiva"),
+        "buscar_mercado_livre": lambda: fontes.buscar_mercado_livre(CODIGO),
+        "buscar_shopee": lambda: fontes.buscar_shopee(CODIGO),
+        "extrair_informacoes_site": lambda: extracao.extrair_informacoes_site(url_detalhe, CODIGO),
+        "extrair_nome_exato_peca": lambda: extracao.extrair_nome_exato_peca(
+            resultados_google, resultados_ml, resultados_shopee, CODIGO),
+        "consolidacao": consolidacao
+    }, {
+        "google": len(resultados_google),
+        "mercado_livre": len(resultados_ml),
+        "shopee": len(resultados_shopee)
+    }
+
+
+# Função para identificar a revisão medida
+def revisao_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Função para comparar com um relatório anterior: razão entre as latências p50 (< 1 = mais rápido)
+def comparar(atual, anterior):
+    comparacao = {}
+    for etapa, medidas in atual["etapas"].items():
+        antes = anterior.get("etapas", {}).get(etapa)
+        if not antes:
+            continue
+        comparacao[etapa] = {
+            "p50_razao": round(medidas["latencia_ms"]["p50"] / antes["latencia_ms"]["p50"], 3)
+            if antes["latencia_ms"]["p50"] else None,
+            "vazao_razao": round(medidas["vazao_por_s"] / antes["vazao_por_s"], 3) if antes["vazao_por_s"] else None,
+            "pico_memoria_razao": round(medidas["pico_memoria_kb"] / antes["pico_memoria_kb"], 3)
+            if antes["pico_memoria_kb"] else None
+        }
+    return comparacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede as etapas da busca de uma peça com as páginas salvas")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=list(ETAPAS))
+    parser.add_argument("-o", "--saida", help="gravar o relatório JSON neste arquivo (além de imprimir)")
+    parser.add_argument("--comparar", help="relatório JSON de uma revisão anterior")
+    args = parser.parse_args()
+
+    paginas = carregar_paginas()
+    baixar_offline = criar_baixar_offline(paginas)
+    with mock.patch.object(fontes, "baixar", baixar_offline), mock.patch.object(extracao, "baixar", baixar_offline):
+        funcoes, itens = montar_etapas(paginas)
+        etapas = {etapa: medir(funcoes[etapa], args.repeticoes) for etapa in args.etapas}
+
+    relatorio = {
+        "revisao": revisao_atual(),
+        "python": platform.python_version(),
+        "backend": escolher_backend(),
+        "itens_por_fonte": itens,
+        "etapas": etapas
+    }
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            relatorio["comparacao"] = comparar(relatorio, json.load(arquivo))
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    print(texto)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Procar.net - núcleo do buscador de autopeças (sem dependência do Streamlit)
@@ -0,0 +1,5 @@
+import sys
+
+from procar.cli import main
+
+sys.exit(main())
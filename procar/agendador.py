@@ -0,0 +1,206 @@
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Prioridades da fila de cada domínio (menor passa na frente): a busca de quem está olhando a
+# tela não espera atrás de um lote de milhares de códigos
+PRIORIDADE_INTERATIVA = 0
+PRIORIDADE_LOTE = 10
+
+# Pedidos por segundo e rajada máxima de cada domínio (balde de fichas)
+TAXAS_POR_DOMINIO = {
+    "www.google.com": (0.5, 2),
+    "lista.mercadolivre.com.br": (2, 4),
+    "produto.mercadolivre.com.br": (2, 4),
+    "shopee.com.br": (1, 2)
+}
+TAXA_PADRAO = (2, 4)
+
+# Pausa do domínio depois de um 429/503 sem Retry-After (dobra a cada nova recusa, até PAUSA_MAXIMA)
+PAUSA_INICIAL = 5
+PAUSA_MAXIMA = 5 * 60
+STATUS_RECUSA = (429, 503)
+
+# Intervalo (em segundos) entre as consultas a "desistir" de quem espera na fila
+INTERVALO_DESISTENCIA = 0.1
+
+# Prioridade dos pedidos da thread (ou tarefa) atual
+_prioridade_atual = contextvars.ContextVar("prioridade_atual", default=PRIORIDADE_INTERATIVA)
+
+
+# Erro de um pedido que não conseguiu vez na fila do domínio dentro do prazo
+class FilaEsgotada(Exception):
+    pass
+
+
+# Função para ler as taxas da variável de ambiente PROCAR_TAXAS, no formato
+# "www.google.com=0.5,shopee.com.br=1,*=2" (pedidos por segundo; 0 = sem limite). Itens mal
+# formados (sem domínio, taxa que não é número, negativa ou infinita) são ignorados.
+def taxas_do_ambiente():
+    taxas = {}
+    for item in os.environ.get("PROCAR_TAXAS", "").split(","):
+        if "=" not in item:
+            continue
+        dominio, taxa = item.split("=", 1)
+        try:
+            taxa = float(taxa)
+        except ValueError:
+            continue
+        if not dominio.strip() or not 0 <= taxa < float("inf"):
+            continue
+        taxas[dominio.strip()] = (taxa, max(1, round(taxa * 2)))
+    return taxas
+
+
+# Função para ler o cabeçalho Retry-After (segundos ou data HTTP) como segundos de espera
+def ler_retry_after(valor):
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Fila de um domínio: balde de fichas, pedidos esperando por prioridade e pausa depois de recusas
+class FilaDominio:
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self.atualizado_em = time.monotonic()
+        self.esperando = []
+        self.pausado_ate = 0.0
+        self.pausa = 0.0
+        self.condicao = threading.Condition()
+
+    # Segundos até o próximo pedido poder sair (0 = já pode)
+    def tempo_ate_liberar(self, agora):
+        if self.taxa:
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado_em) * self.taxa)
+            self.atualizado_em = agora
+        espera = self.pausado_ate - agora
+        if self.taxa and self.fichas < 1:
+            espera = max(espera, (1 - self.fichas) / self.taxa)
+        return max(0.0, espera)
+
+
+# Agendador central dos downloads: cada domínio tem a sua taxa (balde de fichas) e uma fila por
+# prioridade; recusas (429/503) pausam o domínio com espera crescente.
+class Agendador:
+    def __init__(self, taxas=None, taxa_padrao=TAXA_PADRAO):
+        self.taxas = dict(TAXAS_POR_DOMINIO if taxas is None else taxas)
+        self.taxa_padrao = self.taxas.pop("*", taxa_padrao)
+        self._filas = {}
+        self._lock = threading.Lock()
+        self._sequencia = itertools.count()
+
+    def _fila(self, dominio):
+        with self._lock:
+            if dominio not in self._filas:
+                self._filas[dominio] = FilaDominio(*self.taxas.get(dominio, self.taxa_padrao))
+            return self._filas[dominio]
+
+    # Esperar a vez de fazer um pedido ao domínio. Pedidos de prioridade menor passam na frente;
+    # empatados, vale a ordem de chegada. Devolve quantos segundos esperou.
+    # "desistir()" é consultada durante a espera: quando devolve True, o pedido sai da fila sem
+    # gastar ficha (FilaEsgotada).
+    def aguardar(self, dominio, prioridade=None, limite=None, desistir=None):
+        fila = self._fila(dominio)
+        prioridade = _prioridade_atual.get() if prioridade is None else prioridade
+        item = (prioridade, next(self._sequencia))
+        inicio = time.monotonic()
+        fim = inicio + limite if limite is not None else None
+
+        with fila.condicao:
+            heapq.heappush(fila.esperando, item)
+            try:
+                while True:
+                    if desistir and desistir():
+                        raise FilaEsgotada(dominio)
+                    agora = time.monotonic()
+                    espera = None
+                    if fila.esperando[0] == item:
+                        espera = fila.tempo_ate_liberar(agora)
+                        if espera <= 0:
+                            heapq.heappop(fila.esperando)
+                            if fila.taxa:
+                                fila.fichas -= 1
+                            fila.condicao.notify_all()
+                            return agora - inicio
+                    if fim is not None:
+                        if agora >= fim:
+                            raise FilaEsgotada(dominio)
+                        espera = fim - agora if espera is None else min(espera, fim - agora)
+                    if desistir:
+                        espera = INTERVALO_DESISTENCIA if espera is None else min(espera, INTERVALO_DESISTENCIA)
+                    fila.condicao.wait(espera)
+            except BaseException:
+                # Desistiu (prazo ou interrupção): sair da fila e dar a vez ao próximo
+                if item in fila.esperando:
+                    fila.esperando.remove(item)
+                    heapq.heapify(fila.esperando)
+                fila.condicao.notify_all()
+                raise
+
+    # Informar a resposta do domínio: recusas (429/503) pausam o domínio pelo Retry-After (ou
+    # por uma pausa crescente) e esvaziam o balde; qualquer outra resposta zera a pausa acumulada
+    def registrar_resposta(self, dominio, status_code, retry_after=None):
+        fila = self._fila(dominio)
+        with fila.condicao:
+            if status_code in STATUS_RECUSA:
+                fila.pausa = min(max(fila.pausa * 2, PAUSA_INICIAL), PAUSA_MAXIMA)
+                espera = ler_retry_after(retry_after)
+                espera = min(fila.pausa if espera is None else espera, PAUSA_MAXIMA)
+                fila.pausado_ate = max(fila.pausado_ate, time.monotonic() + espera)
+                fila.fichas = 0
+            else:
+                fila.pausa = 0.0
+            fila.condicao.notify_all()
+
+    # Situação de cada domínio, para exibição
+    def estado(self):
+        agora = time.monotonic()
+        with self._lock:
+            filas = dict(self._filas)
+        estado = {}
+        for dominio, fila in sorted(filas.items()):
+            with fila.condicao:
+                estado[dominio] = {
+                    "taxa_por_s": fila.taxa or None,
+                    "esperando": len(fila.esperando),
+                    "pausado_por_s": max(0, round(fila.pausado_ate - agora, 1))
+                }
+        return estado
+
+
+# Função para definir a prioridade dos downloads feitos dentro do bloco
+@contextmanager
+def prioridade(valor):
+    marcador = _prioridade_atual.set(valor)
+    try:
+        yield
+    finally:
+        _prioridade_atual.reset(marcador)
+
+
+_agendador = None
+_lock_agendador = threading.Lock()
+
+
+# Função para obter o agendador compartilhado pelo processo (taxas de PROCAR_TAXAS, se houver)
+def obter_agendador():
+    global _agendador
+    with _lock_agendador:
+        if _agendador is None:
+            _agendador = Agendador({**TAXAS_POR_DOMINIO, **taxas_do_ambiente()})
+        return _agendador
@@ -0,0 +1,433 @@
+import random
+from urllib.parse import urlparse
+
+from procar.cache import chave_cache, obter_cache_pecas
+from procar.catalogo import obter_catalogo, registro_para_info_peca
+from procar.classificacao import (
+    extrair_categoria,
+    extrair_fabricante_do_titulo,
+    extrair_fabricante_por_padrao,
+    obter_ncm_por_categoria
+)
+from procar.codigos import contem_codigo, normalizar_codigo
+from procar.confianca import ConfiancaCampos
+from procar.extracao import extrair_informacoes_sites, extrair_nome_exato_peca
+from procar.fontes import buscar_fontes_em_paralelo
+from procar.metricas import medir, rastrear
+from procar.prazo import definir_prazo, esgotado, restante
+from procar.precos import obter_historico_precos
+from procar.unico import ChamadaUnica
+
+# Prazos totais sugeridos (em segundos): quem está olhando a tela e quem processa lotes
+PRAZO_TELA = 8
+PRAZO_LOTE = 30
+
+# Campos do resultado e as etapas de onde eles vêm: se alguma não terminou dentro do prazo,
+# o campo é marcado como parcial
+ETAPAS_POR_CAMPO = {
+    "nome": ("google", "mercado_livre", "shopee", "paginas"),
+    "fabricante": ("google", "mercado_livre", "shopee", "paginas"),
+    "categoria_ml": ("google", "mercado_livre", "shopee", "paginas"),
+    "precos": ("mercado_livre", "shopee", "paginas"),
+    "compatibilidade": ("paginas",),
+    "dimensoes": ("paginas",),
+    "imagem_url": ("paginas",)
+}
+
+NOMES_FONTES = {"google": "Google", "mercado_livre": "Mercado Livre", "shopee": "Shopee"}
+
+# Buscas em andamento no processo: a mesma peça pedida ao mesmo tempo (por várias sessões ou por
+# um clique duplo) é buscada uma única vez
+_buscas = ChamadaUnica()
+
+
+# Função para buscar informações da peça.
+# "ao_parcial(etapa, dados)" recebe os resultados de cada etapa assim que ficam prontos, para a tela
+# mostrar algo útil antes do fim: "fabricante" (palpite pelo código), "fonte" (cada busca que
+# responde, com o nome da fonte e os resultados) e "site" (cada página de detalhe analisada).
+# Se a mesma peça já estiver sendo buscada, espera por aquela busca em vez de repetir o scraping
+# (quem espera recebe só o resultado final, sem os avisos de progresso da outra busca).
+# O tempo de cada etapa fica no rastreamento ativo (veja procar.metricas); sem um, a busca abre o seu.
+# "prazo" limita a busca inteira (em segundos): cada download recebe só o tempo que resta e, quando
+# ele acaba, a busca devolve o que já conseguiu consolidar, com "completude" indicando quais
+# campos ficaram parciais (resultados parciais não vão para o cache).
+def buscar_informacoes_peca(codigo_peca, ao_progresso=None, ao_parcial=None, prazo=None):
+    with rastrear("busca", codigo=chave_cache(codigo_peca)) as rastreamento, definir_prazo(prazo):
+        esperou = []
+
+        def ao_esperar():
+            esperou.append(True)
+            rastreamento.atributos["aguardou_outra_busca"] = True
+            if ao_progresso:
+                ao_progresso(50, "Esta peça já está sendo buscada; aguardando o resultado...")
+
+        try:
+            return _buscas.executar(
+                chave_cache(codigo_peca),
+                lambda: _buscar_informacoes_peca(codigo_peca, ao_progresso, ao_parcial),
+                ao_esperar=ao_esperar,
+                limite=restante()
+            )
+        except TimeoutError:
+            if not esperou:
+                raise
+            # A outra busca não terminou dentro do nosso prazo, que já acabou: não há tempo para
+            # repetir a busca, e o resultado volta parcial na hora
+            if ao_progresso:
+                ao_progresso(100, "Busca concluída (parcial: o prazo acabou antes de algumas etapas)!")
+            return _resultado_sem_tempo(codigo_peca)
+
+
+# Função que faz a busca completa da peça
+def _buscar_informacoes_peca(codigo_peca, ao_progresso=None, ao_parcial=None):
+    def progresso(percentual, mensagem):
+        if ao_progresso:
+            ao_progresso(percentual, mensagem)
+    
+    def parcial(etapa, dados):
+        if ao_parcial:
+            ao_parcial(etapa, dados)
+    
+    # Uma única grafia do código para fontes, URLs, casamento de títulos, cache e histórico
+    codigo_peca = normalizar_codigo(codigo_peca) or codigo_peca.strip()
+    
+    # Iniciar busca
+    progresso(10, "Iniciando busca...")
+    
+    # Verificar se o código já está no cache (peças validadas ou buscas recentes)
+    cache_pecas = obter_cache_pecas()
+    with medir("etapa", "cache_pecas") as trecho:
+        info_cache = cache_pecas.obter(codigo_peca)
+        trecho.status = "encontrada" if info_cache else "ausente"
+    if info_cache:
+        progresso(100, "Peça encontrada no cache!")
+        return info_cache
+    
+    # Verificar o catálogo local (arquivos de fornecedores importados)
+    with medir("etapa", "catalogo") as trecho:
+        registro_catalogo = obter_catalogo().obter(codigo_peca)
+        trecho.status = "encontrada" if registro_catalogo else "ausente"
+    if registro_catalogo:
+        progresso(100, "Peça encontrada no catálogo local!")
+        return registro_para_info_peca(registro_catalogo)
+    
+    # Palpite imediato do fabricante pelo padrão do código
+    parcial("fabricante", {"fabricante": extrair_fabricante_por_padrao(codigo_peca)})
+    
+    # Buscar no Google, Mercado Livre e Shopee ao mesmo tempo
+    progresso(15, "Buscando no Google, Mercado Livre e Shopee...")
+
+    fontes_concluidas = []
+
+    def ao_concluir_fonte(nome, resultados):
+        fontes_concluidas.append(nome)
+        progresso(15 + 10 * len(fontes_concluidas), f"{NOMES_FONTES[nome]} respondeu ({len(resultados)} resultados)...")
+        parcial("fonte", {"nome": nome, "resultados": resultados})
+
+    with medir("etapa", "fontes"):
+        resultados_fontes = buscar_fontes_em_paralelo(codigo_peca, ao_concluir=ao_concluir_fonte)
+    resultados_google = resultados_fontes["google"]
+    resultados_ml = resultados_fontes["mercado_livre"]
+    resultados_shopee = resultados_fontes["shopee"]
+
+    # Extrair o nome exato da peça
+    progresso(45, "Extraindo nome exato da peça...")
+    with medir("etapa", "nome_exato"):
+        info_nome_exato = extrair_nome_exato_peca(resultados_google, resultados_ml, resultados_shopee, codigo_peca)
+    
+    # Mostrar os resultados do Google para debug
+    resultados_debug = []
+    for i, resultado in enumerate(resultados_google[:5]):
+        resultados_debug.append(f"{i+1}. {resultado.get('titulo', 'Sem título')} - {resultado.get('snippet', 'Sem descrição')[:100]}...")
+    
+    # Extrair informações detalhadas dos melhores resultados
+    progresso(55, "Extraindo informações detalhadas...")
+    
+    # Coletar URLs para análise detalhada
+    urls_para_analise = []
+    
+    # Adicionar URLs do Mercado Livre (alta prioridade)
+    for resultado in resultados_ml[:3]:
+        if "link" in resultado and resultado["link"]:
+            urls_para_analise.append(resultado["link"])
+    
+    # Adicionar URLs da Shopee
+    for resultado in resultados_shopee[:2]:
+        if "link" in resultado and resultado["link"]:
+            urls_para_analise.append(resultado["link"])
+    
+    # Adicionar URLs do Google (priorizar sites confiáveis)
+    for resultado in resultados_google:
+        if "link" in resultado and resultado["link"] and resultado.get("confiavel", False):
+            urls_para_analise.append(resultado["link"])
+    
+    # Adicionar mais alguns resultados do Google não confiáveis
+    for resultado in resultados_google:
+        if "link" in resultado and resultado["link"] and not resultado.get("confiavel", False):
+            urls_para_analise.append(resultado["link"])
+            if len(urls_para_analise) >= 10:  # Limitar a 10 URLs no total
+                break
+    
+    # Remover duplicatas (mantendo a ordem de prioridade)
+    urls_para_analise = list(dict.fromkeys(urls_para_analise))
+    
+    # Confiança de cada campo com o que as fontes já trouxeram; as páginas só são analisadas
+    # até todos os campos atingirem a confiança mínima
+    confianca = ConfiancaCampos(codigo_peca)
+    confianca.registrar_nome(max((candidato["pontuacao"] for candidato in info_nome_exato.get("todos_candidatos", [])), default=0))
+    confianca.registrar_precos(sum(1 for resultado in resultados_ml + resultados_shopee if resultado.get("preco", 0) > 0))
+    
+    # Extrair informações detalhadas
+    sites_concluidos = [0]
+
+    def ao_concluir_site(concluidas, total_urls, info):
+        sites_concluidos[0] = concluidas
+        confianca.registrar_pagina(info)
+        progresso(55 + int((concluidas / total_urls) * 25), f"Site {concluidas} de {total_urls} analisado ({urlparse(info['url']).netloc})...")
+        parcial("site", info)
+
+    with medir("etapa", "paginas") as trecho:
+        informacoes_detalhadas = extrair_informacoes_sites(urls_para_analise, codigo_peca, ao_concluir=ao_concluir_site,
+                                                           basta=confianca.atingida)
+        trecho.extras["itens"] = len(urls_para_analise)
+        trecho.extras["analisadas"] = sites_concluidos[0]
+        trecho.extras["confianca"] = {campo: round(valor, 2) for campo, valor in confianca.confianca().items()}
+        if confianca.atingida() and sites_concluidos[0] < len(urls_para_analise):
+            trecho.status = "confianca_atingida"
+    
+    # Processar e consolidar resultados
+    progresso(80, "Processando e consolidando informações...")
+    
+    info_peca = _consolidar(codigo_peca, info_nome_exato, resultados_ml, resultados_shopee, informacoes_detalhadas,
+                            resultados_debug)
+    
+    # Marcar os campos que dependem de etapas interrompidas pelo prazo (ou pelo limite de uma fonte)
+    # (sem todas as fontes, a lista de páginas de detalhe também ficou incompleta; páginas puladas
+    # porque os campos já tinham a confiança mínima não contam)
+    etapas_cortadas = {nome for nome in NOMES_FONTES if nome not in fontes_concluidas}
+    if etapas_cortadas or (sites_concluidos[0] < len(urls_para_analise) and not confianca.atingida()):
+        etapas_cortadas.add("paginas")
+    # Motivo do resultado parcial: o prazo da busca acabou ("prazo") ou só algumas fontes não
+    # responderam dentro do próprio limite ("fontes", listadas em "fontes_cortadas")
+    fontes_cortadas = [NOMES_FONTES[nome] for nome in NOMES_FONTES if nome not in fontes_concluidas]
+    _marcar_completude(info_peca, etapas_cortadas, ("prazo" if esgotado() else "fontes") if etapas_cortadas else None,
+                       fontes_cortadas)
+    
+    # Guardar no cache para as próximas buscas (só resultados completos)
+    if not etapas_cortadas:
+        cache_pecas.gravar(codigo_peca, info_peca)
+    
+    # Finalizar
+    if info_peca["motivo_parcial"] == "prazo":
+        progresso(100, "Busca concluída (parcial: o prazo acabou antes de algumas etapas)!")
+    elif info_peca["motivo_parcial"] == "fontes":
+        progresso(100, f"Busca concluída (parcial: sem resposta de {', '.join(fontes_cortadas)})!")
+    else:
+        progresso(100, "Busca concluída!")
+    
+    return info_peca
+
+
+# Função para consolidar nome, fabricante, categoria, preços, compatibilidade, dimensões e imagem
+# a partir do que as fontes e as páginas de detalhe trouxeram
+def _consolidar(codigo_peca, info_nome_exato, resultados_ml, resultados_shopee, informacoes_detalhadas,
+                resultados_debug):
+    with medir("etapa", "consolidacao"):
+        # Usar o nome exato da peça se disponível
+        nome_peca = info_nome_exato.get("nome")
+        fonte_info = info_nome_exato.get("fonte")
+        url_fonte = info_nome_exato.get("url")
+        candidatos_nome = info_nome_exato.get("todos_candidatos", [])
+    
+        # Se não encontrou nome exato, tentar extrair de outras fontes
+        if not nome_peca:
+            for info in informacoes_detalhadas:
+                titulo = info.get("titulo", "")
+                if contem_codigo(titulo, codigo_peca):
+                    nome_peca = titulo.split(" - ")[0].strip()
+                    fonte_info = "Site especializado"
+                    url_fonte = info.get("url", "")
+                    break
+    
+        # Se ainda não encontrou, usar um nome genérico
+        if not nome_peca:
+            nome_peca = f"Peça automotiva {codigo_peca}"
+            fonte_info = "Busca online"
+    
+        # Extrair fabricante
+        fabricante = None
+    
+        # Tentar extrair fabricante do nome da peça
+        if nome_peca:
+            fabricante = extrair_fabricante_do_titulo(nome_peca)
+    
+        # Tentar a marca declarada nos dados estruturados das páginas (só marcas conhecidas)
+        if not fabricante:
+            for info in informacoes_detalhadas:
+                if info.get("marca"):
+                    fabricante = extrair_fabricante_do_titulo(info["marca"])
+                    if fabricante:
+                        break
+    
+        # Tentar identificar fabricante pelo padrão do código
+        if not fabricante:
+            fabricante_por_padrao = extrair_fabricante_por_padrao(codigo_peca)
+            if fabricante_por_padrao:
+                fabricante = fabricante_por_padrao
+    
+        # Se ainda não tiver fabricante, usar um genérico
+        if not fabricante:
+            fabricante = "Não identificado"
+    
+        # Extrair categoria
+        categoria = None
+        if nome_peca:
+            categoria = extrair_categoria(nome_peca)
+    
+        if not categoria:
+            categoria = "Peças Automotivas"
+    
+        # Extrair preços (guardando a origem de cada um para o histórico)
+        precos_observados = []
+        for resultado in resultados_ml:
+            if "preco" in resultado and resultado["preco"] > 0:
+                precos_observados.append(("mercado_livre", resultado["preco"]))
+    
+        for resultado in resultados_shopee:
+            if "preco" in resultado and resultado["preco"] > 0:
+                precos_observados.append(("shopee", resultado["preco"]))
+    
+        for info in informacoes_detalhadas:
+            if info.get("preco") and info.get("preco") > 0:
+                precos_observados.append(("site", info["preco"]))
+    
+        precos = [preco for fonte, preco in precos_observados]
+    
+        # Guardar as observações no histórico de preços
+        historico_precos = obter_historico_precos()
+        historico_precos.registrar(codigo_peca, precos_observados, categoria=categoria)
+    
+        # Calcular preços se houver dados
+        if precos:
+            preco_medio = sum(precos) / len(precos)
+            preco_min = min(precos)
+        else:
+            # Sem preços nesta busca: usar o histórico da peça ou, na falta dele, o da categoria
+            agregado = historico_precos.agregado_codigo(codigo_peca) or historico_precos.agregado_categoria(categoria)
+            if agregado:
+                preco_medio = round(agregado["mediana"], 2)
+                preco_min = round(agregado["minimo"], 2)
+            # Gerar preços estimados baseados na categoria
+            elif categoria == "Motor":
+                preco_medio = round(random.uniform(500, 3000), 2)
+            elif categoria == "Transmissão":
+                preco_medio = round(random.uniform(400, 2500), 2)
+            elif categoria == "Suspensão":
+                preco_medio = round(random.uniform(200, 800), 2)
+            elif categoria == "Freio":
+                preco_medio = round(random.uniform(150, 600), 2)
+            elif categoria == "Carroceria":
+                preco_medio = round(random.uniform(300, 1500), 2)
+            else:
+                preco_medio = round(random.uniform(150, 1000), 2)
+        
+            if not agregado:
+                preco_min = round(preco_medio * 0.8, 2)
+    
+        # Obter NCM com base na categoria
+        ncm = obter_ncm_por_categoria(categoria)
+    
+        # Extrair compatibilidade
+        compatibilidade = []
+        for info in informacoes_detalhadas:
+            if info.get("compatibilidade"):
+                compatibilidade.extend(info["compatibilidade"])
+    
+        # Remover duplicatas e limitar a 5 itens
+        compatibilidade = list(set(compatibilidade))[:5]
+    
+        # Gerar compatibilidade baseada no fabricante se não encontrou
+        if not compatibilidade:
+            if fabricante != "Não identificado":
+                compatibilidade = [
+                    f"{fabricante} - Modelos compatíveis (consultar manual)",
+                    "Verifique a compatibilidade com seu veículo"
+                ]
+            else:
+                compatibilidade = ["Verifique a compatibilidade com seu veículo"]
+    
+        # Extrair dimensões
+        dimensoes = {}
+        for info in informacoes_detalhadas:
+            if info.get("dimensoes"):
+                for key, value in info["dimensoes"].items():
+                    if key not in dimensoes:
+                        dimensoes[key] = value
+    
+        # Gerar dimensões se não encontrou
+        if not dimensoes:
+            dimensoes = {
+                "largura": random.randint(10, 50),
+                "altura": random.randint(10, 50),
+                "comprimento": random.randint(10, 150),
+                "peso": round(random.uniform(0.1, 10), 2)
+            }
+    
+        # Extrair imagem
+        imagem_url = None
+        for info in informacoes_detalhadas:
+            if info.get("imagem_url"):
+                imagem_url = info["imagem_url"]
+                break
+    
+        # Código de barras (GTIN/EAN) declarado nos dados estruturados das páginas
+        gtin = next((info["gtin"] for info in informacoes_detalhadas if info.get("gtin")), None)
+    
+        # Construir descrição
+        descricao = f"{nome_peca.upper()} - CÓDIGO {codigo_peca} - {fabricante.upper()}"
+    
+        # Construir objeto de informações da peça
+        info_peca = {
+            "nome": nome_peca,
+            "fabricante": fabricante,
+            "descricao": descricao,
+            "compatibilidade": compatibilidade,
+            "preco_novo_min": preco_min,
+            "preco_novo_med": preco_medio,
+            "preco_usado_min": round(preco_min * 0.7, 2),
+            "preco_usado_med": round(preco_medio * 0.7, 2),
+            "preco_recond_min": round(preco_min * 0.8, 2),
+            "preco_recond_med": round(preco_medio * 0.8, 2),
+            "dimensoes": dimensoes,
+            "ncm": ncm,
+            "categoria_ml": categoria,
+            "imagem_url": imagem_url,
+            "gtin": gtin,
+            "fonte": fonte_info,
+            "url_fonte": url_fonte,
+            "resultados_debug": resultados_debug,
+            "candidatos_nome": candidatos_nome
+        }
+
+    return info_peca
+
+
+# Função para marcar os campos que dependem de etapas interrompidas, com o motivo ("prazo" ou
+# "fontes") e as fontes que não responderam
+def _marcar_completude(info_peca, etapas_cortadas, motivo_parcial, fontes_cortadas):
+    info_peca["completude"] = {
+        campo: "parcial" if etapas_cortadas.intersection(etapas) else "completo"
+        for campo, etapas in ETAPAS_POR_CAMPO.items()
+    }
+    info_peca["parcial"] = bool(etapas_cortadas)
+    info_peca["motivo_parcial"] = motivo_parcial
+    info_peca["fontes_cortadas"] = fontes_cortadas
+    return info_peca
+
+
+# Função para montar, sem nenhuma consulta, o resultado de uma busca que ficou sem tempo antes de
+# qualquer etapa: todos os campos parciais pelo prazo
+def _resultado_sem_tempo(codigo_peca):
+    codigo_peca = normalizar_codigo(codigo_peca) or codigo_peca.strip()
+    info_peca = _consolidar(codigo_peca, {}, [], [], [], [])
+    return _marcar_completude(info_peca, set(NOMES_FONTES) | {"paginas"}, "prazo", list(NOMES_FONTES.values()))
@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from procar.codigos import descartar_codigos, normalizar_codigo, registrar_codigos
+from procar.config import caminho_dados
+from procar.dados import CACHE_PECAS
+
+# Tempo de vida padrão de uma peça no cache (7 dias)
+TTL_PADRAO = 7 * 24 * 3600
+
+# Quantidade de peças mantidas na memória do processo
+CAPACIDADE_MEMORIA = 512
+
+
+# Função para normalizar o código usado como chave do cache
+def chave_cache(codigo_peca):
+    return normalizar_codigo(codigo_peca)
+
+
+# Cache de peças em dois níveis: LRU em memória + SQLite em disco
+class CachePecas:
+    def __init__(self, caminho=None, capacidade=CAPACIDADE_MEMORIA, ttl=TTL_PADRAO):
+        self.caminho = caminho or caminho_dados("pecas.sqlite")
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._memoria = OrderedDict()  # chave -> (expira_em, info_peca)
+        self._fixas = {}  # chave -> info_peca (nunca expiram nem são removidas)
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS pecas (
+                codigo TEXT PRIMARY KEY,
+                dados TEXT NOT NULL,
+                gravado_em REAL NOT NULL,
+                expira_em REAL,
+                fixa INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conexao.commit()
+
+    # Buscar uma peça: fixas, depois memória, depois disco
+    def obter(self, codigo_peca):
+        chave = chave_cache(codigo_peca)
+        agora = time.time()
+
+        with self._lock:
+            if chave in self._fixas:
+                return self._fixas[chave]
+
+            if chave in self._memoria:
+                expira_em, info_peca = self._memoria[chave]
+                if expira_em is None or expira_em > agora:
+                    self._memoria.move_to_end(chave)
+                    return info_peca
+                del self._memoria[chave]
+
+            linha = self._conexao.execute(
+                "SELECT dados, expira_em, fixa FROM pecas WHERE codigo = ?", (chave,)
+            ).fetchone()
+
+        if not linha:
+            return None
+
+        dados, expira_em, fixa = linha
+        if not fixa and expira_em is not None and expira_em <= agora:
+            return None
+
+        info_peca = json.loads(dados)
+        with self._lock:
+            if fixa:
+                self._fixas[chave] = info_peca
+            else:
+                self._guardar_na_memoria(chave, expira_em, info_peca)
+        return info_peca
+
+    # Gravar uma peça nos dois níveis
+    def gravar(self, codigo_peca, info_peca, ttl=None):
+        chave = chave_cache(codigo_peca)
+        agora = time.time()
+        expira_em = agora + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            if chave in self._fixas:
+                return
+            self._guardar_na_memoria(chave, expira_em, info_peca)
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO pecas (codigo, dados, gravado_em, expira_em, fixa) "
+                "VALUES (?, ?, ?, ?, 0)",
+                (chave, json.dumps(info_peca, ensure_ascii=False), agora, expira_em)
+            )
+            self._conexao.commit()
+        registrar_codigos([chave])
+
+    # Fixar peças validadas: nunca expiram e nunca saem da memória
+    def fixar(self, pecas):
+        agora = time.time()
+        with self._lock:
+            for codigo_peca, info_peca in pecas.items():
+                chave = chave_cache(codigo_peca)
+                if self._fixas.get(chave) == info_peca:
+                    continue
+                self._fixas[chave] = info_peca
+                self._memoria.pop(chave, None)
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO pecas (codigo, dados, gravado_em, expira_em, fixa) "
+                    "VALUES (?, ?, ?, NULL, 1)",
+                    (chave, json.dumps(info_peca, ensure_ascii=False), agora)
+                )
+            self._conexao.commit()
+        registrar_codigos(pecas)
+
+    # Remover uma peça (exceto fixas)
+    def remover(self, codigo_peca):
+        chave = chave_cache(codigo_peca)
+        with self._lock:
+            self._memoria.pop(chave, None)
+            if chave in self._fixas:
+                return
+            self._conexao.execute("DELETE FROM pecas WHERE codigo = ? AND fixa = 0", (chave,))
+            self._conexao.commit()
+        descartar_codigos([chave])
+
+    # Códigos de todas as peças ainda válidas
+    def codigos(self):
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT codigo FROM pecas WHERE fixa = 1 OR expira_em IS NULL OR expira_em > ?", (time.time(),)
+            ).fetchall()
+        return [linha[0] for linha in linhas]
+
+    # Apagar do disco as peças vencidas
+    def limpar_expiradas(self):
+        with self._lock:
+            cursor = self._conexao.execute(
+                "DELETE FROM pecas WHERE fixa = 0 AND expira_em <= ?", (time.time(),)
+            )
+            self._conexao.commit()
+            return cursor.rowcount
+
+    def _guardar_na_memoria(self, chave, expira_em, info_peca):
+        self._memoria[chave] = (expira_em, info_peca)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.capacidade:
+            self._memoria.popitem(last=False)
+
+
+_cache_pecas = None
+_lock_cache_pecas = threading.Lock()
+
+
+# Função para obter o cache de peças compartilhado pelo processo (peças validadas ficam fixas)
+def obter_cache_pecas():
+    global _cache_pecas
+    with _lock_cache_pecas:
+        if _cache_pecas is None:
+            _cache_pecas = CachePecas()
+            _cache_pecas.fixar(CACHE_PECAS)
+        return _cache_pecas
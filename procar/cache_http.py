@@ -0,0 +1,148 @@
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+from procar.config import caminho_dados
+
+# Tempo de vida (em segundos) das respostas por domínio
+TTLS_POR_DOMINIO = {
+    "google.com": 6 * 3600,
+    "lista.mercadolivre.com.br": 2 * 3600,
+    "mercadolivre.com.br": 24 * 3600,
+    "shopee.com.br": 2 * 3600
+}
+TTL_PADRAO = 12 * 3600
+
+# Respostas vencidas continuam guardadas por este tempo para revalidação (ETag/Last-Modified)
+RETENCAO_REVALIDACAO = 7 * 24 * 3600
+
+
+# Função para descobrir o TTL de uma URL (o sufixo de domínio mais específico vence)
+def ttl_para_url(url):
+    dominio = urlparse(url).netloc.lower()
+    melhor = None
+    for sufixo in TTLS_POR_DOMINIO:
+        if dominio == sufixo or dominio.endswith("." + sufixo):
+            if melhor is None or len(sufixo) > len(melhor):
+                melhor = sufixo
+    return TTLS_POR_DOMINIO[melhor] if melhor else TTL_PADRAO
+
+
+# Resposta HTTP guardada no cache. "limite_bytes" é o limite com que o corpo foi cortado no
+# download (None = corpo inteiro).
+class RespostaCache:
+    def __init__(self, url, status_code, conteudo, encoding, etag=None, last_modified=None,
+                 expira_em=None, do_cache=False, limite_bytes=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = conteudo
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expira_em = expira_em
+        self.do_cache = do_cache
+        self.limite_bytes = limite_bytes
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def vencida(self):
+        return self.expira_em is not None and self.expira_em <= time.time()
+
+    # Saber se o corpo guardado serve para um pedido de até max_bytes (None = corpo inteiro)
+    def atende(self, max_bytes):
+        return self.limite_bytes is None or (max_bytes is not None and max_bytes <= self.limite_bytes)
+
+
+# Cache de respostas HTTP em disco, com corpo comprimido
+class CacheHttp:
+    def __init__(self, caminho=None):
+        self.caminho = caminho or caminho_dados("http.sqlite")
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                corpo BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                gravado_em REAL NOT NULL,
+                expira_em REAL NOT NULL,
+                limite_bytes INTEGER
+            )
+        """)
+        # Caches criados antes da coluna limite_bytes (corpos inteiros ou de limite desconhecido)
+        colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(respostas)")}
+        if "limite_bytes" not in colunas:
+            self._conexao.execute("ALTER TABLE respostas ADD COLUMN limite_bytes INTEGER")
+        self._conexao.commit()
+
+    # Buscar uma resposta guardada (mesmo vencida, para permitir revalidação)
+    def obter(self, url):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT status, corpo, encoding, etag, last_modified, expira_em, limite_bytes "
+                "FROM respostas WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if not linha:
+            return None
+
+        status, corpo, encoding, etag, last_modified, expira_em, limite_bytes = linha
+        return RespostaCache(url, status, zlib.decompress(corpo), encoding, etag, last_modified,
+                             expira_em, do_cache=True, limite_bytes=limite_bytes)
+
+    # Guardar uma resposta ("limite_bytes": limite com que o corpo foi cortado, se foi)
+    def gravar(self, url, status, conteudo, encoding, etag=None, last_modified=None, ttl=None,
+               limite_bytes=None):
+        agora = time.time()
+        expira_em = agora + (ttl if ttl is not None else ttl_para_url(url))
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO respostas "
+                "(url, status, corpo, encoding, etag, last_modified, gravado_em, expira_em, limite_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, zlib.compress(conteudo, 6), encoding, etag, last_modified, agora, expira_em,
+                 limite_bytes)
+            )
+            self._conexao.commit()
+        return expira_em
+
+    # Renovar a validade de uma resposta revalidada pelo servidor (304)
+    def renovar(self, url, ttl=None):
+        expira_em = time.time() + (ttl if ttl is not None else ttl_para_url(url))
+        with self._lock:
+            self._conexao.execute("UPDATE respostas SET expira_em = ? WHERE url = ?", (expira_em, url))
+            self._conexao.commit()
+        return expira_em
+
+    # Apagar respostas vencidas há mais tempo que a janela de revalidação
+    def limpar_expiradas(self):
+        with self._lock:
+            cursor = self._conexao.execute(
+                "DELETE FROM respostas WHERE expira_em <= ?", (time.time() - RETENCAO_REVALIDACAO,)
+            )
+            self._conexao.commit()
+            return cursor.rowcount
+
+
+_cache_http = None
+_lock_cache_http = threading.Lock()
+
+
+# Função para obter o cache HTTP compartilhado pelo processo
+def obter_cache_http():
+    global _cache_http
+    with _lock_cache_http:
+        if _cache_http is None:
+            _cache_http = CacheHttp()
+        return _cache_http
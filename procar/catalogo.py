@@ -0,0 +1,285 @@
+import csv
+import hashlib
+import io
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from procar.cache import chave_cache
+from procar.classificacao import extrair_categoria, obter_ncm_por_categoria
+from procar.codigos import COLUNAS_CODIGO, normalizar_codigo, registrar_codigos
+from procar.config import caminho_dados
+
+# Nomes de coluna aceitos nos arquivos de catálogo dos fornecedores, por campo
+COLUNAS_CATALOGO = {
+    "codigo": COLUNAS_CODIGO,
+    "nome": ("nome", "name", "descricao", "descrição", "description", "titulo", "título"),
+    "fabricante": ("fabricante", "manufacturer", "marca", "brand", "montadora"),
+    "ncm": ("ncm",),
+    "categoria": ("categoria", "categoria_ml", "category"),
+    "largura": ("largura", "width"),
+    "altura": ("altura", "height"),
+    "comprimento": ("comprimento", "length", "profundidade"),
+    "peso": ("peso", "weight"),
+    "preco_novo_min": ("preco_novo_min", "preco_min", "preco", "preço", "price"),
+    "preco_novo_med": ("preco_novo_med", "preco_med", "preco_medio"),
+    "imagem_url": ("imagem_url", "imagem", "image", "image_url")
+}
+
+DIMENSOES = ("largura", "altura", "comprimento", "peso")
+
+# Registros gravados por transação durante a importação
+TAMANHO_LOTE_INGESTAO = 1000
+
+
+# Função para ler um número de catálogo ("1.234,56", "12,5", "80") ou None
+def _numero(valor):
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor).strip().replace("R$", "").strip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+# Função para padronizar uma linha de catálogo (CSV ou JSON) nos campos do índice
+def normalizar_registro(linha):
+    campos = {chave.strip().lower(): valor for chave, valor in linha.items() if chave}
+
+    def valor(campo):
+        for nome in COLUNAS_CATALOGO[campo]:
+            if campos.get(nome) not in (None, ""):
+                return campos[nome]
+        return None
+
+    codigo = valor("codigo")
+    if not codigo or not normalizar_codigo(str(codigo)):
+        return None
+
+    dimensoes = {}
+    if isinstance(campos.get("dimensoes"), dict):
+        dimensoes.update({chave: _numero(numero) for chave, numero in campos["dimensoes"].items() if chave in DIMENSOES})
+    for chave in DIMENSOES:
+        if valor(chave) is not None:
+            dimensoes[chave] = _numero(valor(chave))
+
+    return {
+        "codigo": str(codigo).strip(),
+        "nome": (valor("nome") or "").strip(),
+        "fabricante": (valor("fabricante") or "").strip(),
+        "ncm": re.sub(r"\D", "", str(valor("ncm") or "")),
+        "categoria": (valor("categoria") or "").strip(),
+        "dimensoes": {chave: numero for chave, numero in dimensoes.items() if numero is not None},
+        "preco_novo_min": _numero(valor("preco_novo_min")),
+        "preco_novo_med": _numero(valor("preco_novo_med")),
+        "imagem_url": valor("imagem_url")
+    }
+
+
+# Função para ler os registros de um arquivo de catálogo (CSV ou JSONL)
+def ler_catalogo(conteudo, formato=None):
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode("utf-8-sig", errors="replace")
+    formato = formato or ("jsonl" if conteudo.lstrip().startswith("{") else "csv")
+
+    if formato == "jsonl":
+        for linha in conteudo.splitlines():
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                continue
+    else:
+        amostra = conteudo[:4096]
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t|")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.DictReader(io.StringIO(conteudo), dialect=dialeto)
+
+
+# Catálogo local de peças (SQLite com índice de texto completo FTS5).
+# Códigos exatos e nomes são respondidos direto do índice, antes de qualquer busca na internet.
+class Catalogo:
+    def __init__(self, caminho=None):
+        self.caminho = caminho or caminho_dados("catalogo.sqlite")
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS catalogo (
+                codigo TEXT PRIMARY KEY,
+                nome TEXT NOT NULL,
+                fabricante TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                assinatura TEXT NOT NULL,
+                origem TEXT,
+                atualizado_em REAL NOT NULL
+            );
+
+            -- Índice de texto sobre a própria tabela (sem duplicar os dados), mantido pelos gatilhos
+            CREATE VIRTUAL TABLE IF NOT EXISTS catalogo_fts USING fts5(
+                codigo, nome, fabricante,
+                content='catalogo', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS catalogo_inserido AFTER INSERT ON catalogo BEGIN
+                INSERT INTO catalogo_fts (rowid, codigo, nome, fabricante)
+                VALUES (new.rowid, new.codigo, new.nome, new.fabricante);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS catalogo_removido AFTER DELETE ON catalogo BEGIN
+                INSERT INTO catalogo_fts (catalogo_fts, rowid, codigo, nome, fabricante)
+                VALUES ('delete', old.rowid, old.codigo, old.nome, old.fabricante);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS catalogo_alterado AFTER UPDATE ON catalogo BEGIN
+                INSERT INTO catalogo_fts (catalogo_fts, rowid, codigo, nome, fabricante)
+                VALUES ('delete', old.rowid, old.codigo, old.nome, old.fabricante);
+                INSERT INTO catalogo_fts (rowid, codigo, nome, fabricante)
+                VALUES (new.rowid, new.codigo, new.nome, new.fabricante);
+            END;
+        """)
+        self._conexao.commit()
+
+    # Importar registros de catálogo. Reimportar um arquivo só grava as linhas novas ou alteradas.
+    # Devolve a contagem de {"novos", "alterados", "inalterados", "ignorados"}.
+    def ingerir(self, linhas, origem=None):
+        contagem = {"novos": 0, "alterados": 0, "inalterados": 0, "ignorados": 0}
+        lote = []
+        for linha in linhas:
+            registro = normalizar_registro(linha)
+            if registro is None:
+                contagem["ignorados"] += 1
+                continue
+            lote.append(registro)
+            if len(lote) >= TAMANHO_LOTE_INGESTAO:
+                self._gravar_lote(lote, origem, contagem)
+                lote = []
+        if lote:
+            self._gravar_lote(lote, origem, contagem)
+        return contagem
+
+    # Importar um arquivo CSV ou JSONL
+    def ingerir_arquivo(self, caminho_arquivo):
+        formato = "jsonl" if caminho_arquivo.lower().endswith((".jsonl", ".json")) else None
+        with open(caminho_arquivo, "rb") as arquivo:
+            return self.ingerir(ler_catalogo(arquivo.read(), formato), origem=caminho_arquivo)
+
+    def _gravar_lote(self, registros, origem, contagem):
+        # A última linha de um mesmo código vale (o arquivo pode trazer correções no fim)
+        por_chave = {chave_cache(registro["codigo"]): registro for registro in registros}
+        agora = time.time()
+
+        with self._lock:
+            marcadores = ",".join("?" * len(por_chave))
+            existentes = dict(self._conexao.execute(
+                f"SELECT codigo, assinatura FROM catalogo WHERE codigo IN ({marcadores})", list(por_chave)
+            ).fetchall())
+
+            for chave, registro in por_chave.items():
+                dados = json.dumps(registro, ensure_ascii=False, sort_keys=True)
+                assinatura = hashlib.sha1(dados.encode("utf-8")).hexdigest()
+                if existentes.get(chave) == assinatura:
+                    contagem["inalterados"] += 1
+                    continue
+                contagem["alterados" if chave in existentes else "novos"] += 1
+                self._conexao.execute(
+                    "INSERT INTO catalogo (codigo, nome, fabricante, dados, assinatura, origem, atualizado_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(codigo) DO UPDATE SET nome = excluded.nome, fabricante = excluded.fabricante, "
+                    "dados = excluded.dados, assinatura = excluded.assinatura, origem = excluded.origem, "
+                    "atualizado_em = excluded.atualizado_em",
+                    (chave, registro["nome"], registro["fabricante"], dados, assinatura, origem, agora)
+                )
+            self._conexao.commit()
+        registrar_codigos(por_chave)
+
+    # Buscar uma peça pelo código exato
+    def obter(self, codigo_peca):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT dados FROM catalogo WHERE codigo = ?", (chave_cache(codigo_peca),)
+            ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    # Buscar peças pelo nome (ou parte do código/fabricante), das mais relevantes para as menos
+    def buscar_por_nome(self, texto, limite=10):
+        termos = re.findall(r"\w+", texto.lower())
+        if not termos:
+            return []
+        # Cada termo vira um prefixo entre aspas: "trav" acha "travessa" e nada é lido como operador
+        consulta = " ".join(f'"{termo}"*' for termo in termos)
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT catalogo.dados FROM catalogo_fts JOIN catalogo ON catalogo.rowid = catalogo_fts.rowid "
+                "WHERE catalogo_fts MATCH ? ORDER BY bm25(catalogo_fts, 5.0, 1.0, 2.0) LIMIT ?",
+                (consulta, limite)
+            ).fetchall()
+        return [json.loads(linha[0]) for linha in linhas]
+
+    # Códigos de todas as peças do catálogo
+    def codigos(self):
+        with self._lock:
+            return [linha[0] for linha in self._conexao.execute("SELECT codigo FROM catalogo").fetchall()]
+
+    # Quantidade de peças no catálogo
+    def tamanho(self):
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM catalogo").fetchone()[0]
+
+
+# Função para transformar um registro do catálogo no formato de resultado da busca
+def registro_para_info_peca(registro):
+    nome = registro["nome"] or f"Peça automotiva {registro['codigo']}"
+    fabricante = registro["fabricante"] or "Não identificado"
+    categoria = registro["categoria"] or extrair_categoria(nome) or "Peças Automotivas"
+    preco_min = registro.get("preco_novo_min")
+    preco_med = registro.get("preco_novo_med") or preco_min
+    if preco_min is None:
+        preco_min = preco_med
+
+    def proporcao(preco, fator):
+        return round(preco * fator, 2) if preco is not None else None
+
+    return {
+        "nome": nome,
+        "fabricante": fabricante,
+        "descricao": f"{nome.upper()} - CÓDIGO {registro['codigo']} - {fabricante.upper()}",
+        "compatibilidade": ["Verifique a compatibilidade com seu veículo"],
+        "preco_novo_min": preco_min,
+        "preco_novo_med": preco_med,
+        "preco_usado_min": proporcao(preco_min, 0.7),
+        "preco_usado_med": proporcao(preco_med, 0.7),
+        "preco_recond_min": proporcao(preco_min, 0.8),
+        "preco_recond_med": proporcao(preco_med, 0.8),
+        "dimensoes": registro["dimensoes"],
+        "ncm": registro["ncm"] or obter_ncm_por_categoria(categoria),
+        "categoria_ml": categoria,
+        "imagem_url": registro.get("imagem_url"),
+        "fonte": "Catálogo local",
+        "url_fonte": None
+    }
+
+
+_catalogo = None
+_lock_catalogo = threading.Lock()
+
+
+# Função para obter o catálogo local compartilhado pelo processo
+def obter_catalogo():
+    global _catalogo
+    with _lock_catalogo:
+        if _catalogo is None:
+            _catalogo = Catalogo()
+        return _catalogo
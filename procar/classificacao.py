@@ -0,0 +1,189 @@
+import re
+
+from procar.codigos import normalizar_codigo
+from procar.palavras import BuscadorPalavras
+
+
+# Padrões de código de cada fabricante, em ordem de prioridade: (prioridade, fabricante, forma, prefixos).
+# A forma é testada contra a "forma" do código (dígitos viram "9" e letras viram "A"), então cada
+# regex roda uma única vez por forma de código, e não por código; os prefixos, quando existem,
+# são conferidos no próprio código.
+REGRAS_CODIGO = [
+    (1, "Land Rover", None, ("LR", "JLR")),                      # Land Rover / Jaguar
+    (2, "Nissan", r'^[0-9]{6}[A-Z]{2}[0-9]?[A-Z]?$', None),
+    (3, "Hyundai/Kia", r'^[0-9]{5,6}[A-Z][0-9]{4}[A-Z]$', None),
+    (4, "Toyota", r'^[0-9]{10}$', None),
+    (5, "Renault", r'^[0-9]{7}[A-Z][0-9]?[A-Z]?$', None),
+    (6, "Volkswagen", r'^[A-Z]{2}[0-9]{6}$', None),
+    (6, "Volkswagen", r'^[0-9]{3}[A-Z]{3}[0-9]{3}[A-Z]?$', None),
+    (7, "Honda", r'^[0-9]{10}[A-Z]{2}$', None),
+    (8, "Fiat", r'^[0-9]{7}$', None),
+    (9, "Ford", r'^[A-Z][0-9]{9,10}$', None),
+    (10, "Chevrolet", r'^[0-9]{8}$', None),
+    (11, "BMW", r'^[0-9]{11}$', None),
+    # Mesma forma da Fiat, que tem prioridade: esta regra nunca decide o fabricante, só coloca a
+    # BMW entre os candidatos (candidatos_fabricante, classificar_codigos com todos=True)
+    (11, "BMW", r'^[0-9]{7}$', None),
+    (12, "Mercedes-Benz", r'^[A-Z][0-9]{10}$', ("A",)),
+    (12, "Mercedes-Benz", r'^[0-9]{3}[A-Z]{3}[0-9]{2}$', None)
+]
+
+_REGRAS_COMPILADAS = [
+    (prioridade, fabricante, re.compile(forma) if forma else None, prefixos)
+    for prioridade, fabricante, forma, prefixos in REGRAS_CODIGO
+]
+
+# Tabela de tradução que gera a forma do código (os demais caracteres ficam como estão)
+_TRADUCAO_FORMA = str.maketrans({**{c: "9" for c in "0123456789"}, **{c: "A" for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}})
+
+# Índice forma -> regras que casam com ela, preenchido conforme aparecem formas novas
+_REGRAS_POR_FORMA = {}
+MAX_FORMAS_INDEXADAS = 10000
+
+
+# Função para obter a forma do código: "628117709R" -> "999999999A"
+def forma_codigo(codigo_normalizado):
+    return codigo_normalizado.translate(_TRADUCAO_FORMA)
+
+
+# Função para listar as regras que casam com uma forma (consultando o índice)
+def _regras_da_forma(forma):
+    regras = _REGRAS_POR_FORMA.get(forma)
+    if regras is None:
+        regras = [
+            (prioridade, fabricante, prefixos)
+            for prioridade, fabricante, regex, prefixos in _REGRAS_COMPILADAS
+            if regex is None or regex.match(forma)
+        ]
+        if len(_REGRAS_POR_FORMA) < MAX_FORMAS_INDEXADAS:
+            _REGRAS_POR_FORMA[forma] = regras
+    return regras
+
+
+# Função para listar todos os fabricantes possíveis de um código: [(fabricante, prioridade), ...]
+# em ordem de prioridade (o primeiro é o que extrair_fabricante_por_padrao devolve)
+def candidatos_fabricante(codigo_peca):
+    codigo_normalizado = normalizar_codigo(codigo_peca)
+    candidatos = []
+    vistos = set()
+    for prioridade, fabricante, prefixos in _regras_da_forma(forma_codigo(codigo_normalizado)):
+        if fabricante in vistos or (prefixos and not codigo_normalizado.startswith(prefixos)):
+            continue
+        vistos.add(fabricante)
+        candidatos.append((fabricante, prioridade))
+    return candidatos
+
+
+# Função para extrair fabricante do código com base em padrões conhecidos
+def extrair_fabricante_por_padrao(codigo_peca):
+    candidatos = candidatos_fabricante(codigo_peca)
+    return candidatos[0][0] if candidatos else None
+
+
+# Função para classificar muitos códigos de uma vez (importação de catálogos).
+# Os códigos são agrupados pela forma, e as regras rodam uma vez por forma distinta.
+# Devolve o fabricante de cada código, ou a lista de candidatos se "todos" for verdadeiro.
+def classificar_codigos(codigos, todos=False):
+    codigos_normalizados = [normalizar_codigo(codigo) for codigo in codigos]
+    formas = [codigo.translate(_TRADUCAO_FORMA) for codigo in codigos_normalizados]
+    regras_por_forma = {forma: _regras_da_forma(forma) for forma in set(formas)}
+
+    resultados = []
+    for codigo_normalizado, forma in zip(codigos_normalizados, formas):
+        candidatos = []
+        for prioridade, fabricante, prefixos in regras_por_forma[forma]:
+            if prefixos and not codigo_normalizado.startswith(prefixos):
+                continue
+            if todos:
+                if all(fabricante != outro for outro, _ in candidatos):
+                    candidatos.append((fabricante, prioridade))
+            else:
+                candidatos = fabricante
+                break
+        resultados.append(candidatos if todos else (candidatos or None))
+    return resultados
+
+
+# Fabricantes procurados no título, em ordem de prioridade
+FABRICANTES_TITULO = [
+    "Renault", "Fiat", "Volkswagen", "VW", "Chevrolet", "GM", "Ford", "Toyota", 
+    "Honda", "Hyundai", "Kia", "Nissan", "Peugeot", "Citroen", "BMW", "Mercedes", 
+    "Audi", "Mitsubishi", "Subaru", "Suzuki", "Jeep", "Land Rover", "Jaguar", 
+    "Volvo", "Porsche", "Ferrari", "Lamborghini", "Maserati", "Bentley", "Rolls-Royce"
+]
+
+# Siglas normalizadas para o nome do fabricante
+SINONIMOS_FABRICANTES = {"VW": "Volkswagen", "GM": "Chevrolet"}
+
+# Palavras-chave de cada categoria (vale a primeira categoria, na ordem abaixo, com alguma palavra)
+CATEGORIAS = {
+    "Suspensão": ["suspensão", "amortecedor", "mola", "bandeja", "pivô", "barra", "estabilizador", "manga de eixo"],
+    "Motor": ["motor", "pistão", "biela", "virabrequim", "comando", "válvula", "cabeçote", "bloco", "junta", "correia", "tensor"],
+    "Freio": ["freio", "pastilha", "disco", "pinça", "cilindro", "fluido", "abs"],
+    "Elétrica": ["elétric", "sensor", "módulo", "chicote", "farol", "lanterna", "lâmpada", "bateria", "alternador", "motor de partida"],
+    "Carroceria": ["carroceria", "porta", "capô", "painel", "para-choque", "parachoque", "paralama", "teto", "coluna", "longarina", "defletor", "suporte", "guia"],
+    "Transmissão": ["transmissão", "câmbio", "embreagem", "disco de embreagem", "platô", "diferencial", "semi-eixo", "homocinética"],
+    "Arrefecimento": ["arrefecimento", "radiador", "ventoinha", "bomba d'água", "bomba de água", "reservatório", "mangueira", "válvula termostática"],
+    "Direção": ["direção", "caixa de direção", "bomba de direção", "hidráulica", "coluna de direção", "terminal", "barra de direção"],
+    "Injeção": ["injeção", "bico injetor", "bomba de combustível", "filtro", "tanque", "sonda lambda", "sensor de oxigênio"],
+    "Escapamento": ["escapamento", "catalisador", "silencioso", "coletor", "abafador", "tubo"],
+    "Interior": ["interior", "banco", "painel", "console", "tapete", "acabamento", "forro", "volante"],
+    "Vidros": ["vidro", "janela", "para-brisa", "parabrisa", "máquina de vidro", "elevador de vidro"],
+    "Travessas": ["travessa", "crossmember", "reforço", "reinforcement", "support panel"]
+}
+
+# Palavras que valorizam um candidato a nome da peça (usadas por extrair_nome_exato_peca)
+TERMOS_PECA = ["travessa", "suporte", "defletor", "lanterna", "filtro", "longarina", "parachoque", "crossmember"]
+MARCAS_NOME = ["renault", "fiat", "volkswagen", "vw", "chevrolet", "gm", "ford", "toyota", "honda",
+               "hyundai", "kia", "nissan", "land rover"]
+
+# Todas as tabelas acima compiladas uma única vez: uma varredura do texto acha tudo
+BUSCADOR_TITULOS = BuscadorPalavras({
+    "fabricante": [(fabricante, SINONIMOS_FABRICANTES.get(fabricante, fabricante)) for fabricante in FABRICANTES_TITULO],
+    "categoria": [(palavra, categoria) for categoria, palavras in CATEGORIAS.items() for palavra in palavras],
+    "termo_peca": [(palavra, palavra) for palavra in TERMOS_PECA],
+    "marca": [(palavra, palavra) for palavra in MARCAS_NOME],
+    "original": [("original", "original")]
+})
+
+
+# Função para extrair fabricante do título da peça
+def extrair_fabricante_do_titulo(titulo):
+    return BUSCADOR_TITULOS.primeiros(titulo).get("fabricante")
+
+
+# Função para extrair categoria da peça
+def extrair_categoria(titulo):
+    return BUSCADOR_TITULOS.primeiros(titulo).get("categoria")
+
+
+# Função para classificar vários títulos de uma vez (fabricante e categoria de cada um)
+def classificar_titulos(titulos):
+    return [
+        {"fabricante": primeiros.get("fabricante"), "categoria": primeiros.get("categoria")}
+        for primeiros in BUSCADOR_TITULOS.primeiros_varios(titulos)
+    ]
+
+
+# Função para extrair NCM com base na categoria
+def obter_ncm_por_categoria(categoria):
+    ncm_dict = {
+        "Suspensão": "87088000",
+        "Motor": "84099990",
+        "Freio": "87083090",
+        "Elétrica": "85119000",
+        "Carroceria": "87082999",
+        "Transmissão": "87084090",
+        "Arrefecimento": "87089990",
+        "Direção": "87087090",
+        "Injeção": "84133030",
+        "Escapamento": "87089200",
+        "Interior": "87082100",
+        "Vidros": "70072900",
+        "Lanternas": "85122022",
+        "Faróis": "85122010",
+        "Filtros": "84213100",
+        "Travessas": "87082999"
+    }
+    
+    return ncm_dict.get(categoria, "87089990")  # Código genérico para outras peças automotivas
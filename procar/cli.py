@@ -0,0 +1,265 @@
+import argparse
+import json
+import sys
+
+from procar.lote import WORKERS_PADRAO
+
+# Os módulos de busca (requests, BeautifulSoup) só são importados dentro de cada comando,
+# para que o CLI inicie rápido e possa ser disparado em vários processos em paralelo.
+
+
+# Função para ler o argumento --parte ("K/N", com 1 <= K <= N) como (K, N)
+def ler_parte(texto):
+    try:
+        indice, total = (int(numero) for numero in texto.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"parte inválida: {texto!r} (use K/N, por exemplo 1/4)")
+    if not 1 <= indice <= total:
+        raise argparse.ArgumentTypeError(f"parte inválida: {texto!r} (K precisa estar entre 1 e N)")
+    return indice, total
+
+
+# Função para pegar a parte K de N da lista (as N partes juntas cobrem a lista uma vez só)
+def parte_da_lista(codigos, parte):
+    indice, total = parte
+    return codigos[indice - 1::total]
+
+
+# Comando "procar lookup": busca uma peça e imprime o resultado
+def comando_lookup(args):
+    from procar.busca import buscar_informacoes_peca
+
+    def ao_progresso(percentual, mensagem):
+        if not args.silencioso:
+            sys.stderr.write(f"\r[{percentual:3d}%] {mensagem:<70}")
+            sys.stderr.flush()
+
+    info_peca = buscar_informacoes_peca(args.codigo, ao_progresso=ao_progresso, prazo=args.prazo or None)
+    if not args.silencioso:
+        sys.stderr.write("\n")
+
+    if args.json:
+        print(json.dumps(info_peca, ensure_ascii=False, indent=2))
+    else:
+        print(info_peca["nome"])
+        print(f"Fabricante: {info_peca['fabricante']}")
+        print(f"Categoria: {info_peca['categoria_ml']} (NCM {info_peca['ncm']})")
+        if info_peca["preco_novo_min"] is not None:
+            print(f"Preço novo: mín. R$ {info_peca['preco_novo_min']:.2f} / méd. R$ {info_peca['preco_novo_med']:.2f}")
+        else:
+            print("Preço novo: não informado")
+        print(f"Fonte: {info_peca.get('fonte')}")
+        if info_peca.get("parcial"):
+            campos_parciais = [campo for campo, situacao in info_peca["completude"].items() if situacao == "parcial"]
+            if info_peca.get("motivo_parcial") == "fontes" and info_peca.get("fontes_cortadas"):
+                motivo = f"sem resposta de {', '.join(info_peca['fontes_cortadas'])}"
+            else:
+                motivo = "prazo esgotado"
+            print(f"Resultado parcial ({motivo}): {', '.join(campos_parciais)}")
+    return 0
+
+
+# Comando "procar batch": processa um arquivo de códigos
+def comando_batch(args):
+    from procar.busca import PRAZO_LOTE, buscar_informacoes_peca
+    from procar.lote import formatar_duracao, ler_codigos, processar_lote
+
+    with open(args.entrada, "rb") as arquivo:
+        codigos = ler_codigos(arquivo.read())
+
+    # Dividir a lista entre processos: --parte 2/4 pega o segundo de quatro pedaços
+    if args.parte:
+        codigos = parte_da_lista(codigos, args.parte)
+
+    def ao_progresso(estatisticas):
+        if args.silencioso:
+            return
+        sys.stderr.write(
+            f"\r{estatisticas.concluidos}/{estatisticas.total} peças | "
+            f"{estatisticas.vazao:.2f} peças/s | falhas: {estatisticas.falhas} | "
+            f"restante: {formatar_duracao(estatisticas.eta)}   "
+        )
+        sys.stderr.flush()
+
+    prazo = PRAZO_LOTE if args.prazo is None else args.prazo or None
+
+    def buscar(codigo):
+        return buscar_informacoes_peca(codigo, prazo=prazo)
+
+    estatisticas = processar_lote(codigos, buscar, args.saida,
+                                  workers=args.workers, ao_progresso=ao_progresso)
+    if not args.silencioso:
+        sys.stderr.write("\n")
+        # Avisar sobre fontes e sites que deixaram de ser consultados durante o lote
+        from procar.saude import FECHADO, obter_saude
+        for chave, saude in obter_saude().estado().items():
+            if saude["estado"] != FECHADO:
+                sys.stderr.write(f"{chave}: circuito {saude['estado']} (sucesso {saude['taxa_sucesso']:.0%} "
+                                 f"em {saude['observacoes']} consultas)\n")
+    return 0 if not estatisticas.falhas else 1
+
+
+# Comando "procar ingest": importa arquivos de catálogo para o índice local
+def comando_ingest(args):
+    from procar.catalogo import obter_catalogo
+
+    catalogo = obter_catalogo()
+    for caminho in args.arquivos:
+        contagem = catalogo.ingerir_arquivo(caminho)
+        if not args.silencioso:
+            sys.stderr.write(
+                f"{caminho}: {contagem['novos']} novas, {contagem['alterados']} alteradas, "
+                f"{contagem['inalterados']} inalteradas, {contagem['ignorados']} ignoradas\n"
+            )
+    if not args.silencioso:
+        sys.stderr.write(f"Catálogo local: {catalogo.tamanho()} peças\n")
+    return 0
+
+
+# Comando "procar search": busca peças pelo nome no catálogo local
+def comando_search(args):
+    from procar.catalogo import obter_catalogo
+
+    registros = obter_catalogo().buscar_por_nome(args.texto, limite=args.limite)
+    for registro in registros:
+        if args.json:
+            print(json.dumps(registro, ensure_ascii=False))
+        else:
+            print(f"{registro['codigo']}\t{registro['nome']}\t{registro['fabricante']}")
+    return 0 if registros else 1
+
+
+# Comando "procar complete": lista os códigos conhecidos que começam com o prefixo
+def comando_complete(args):
+    from procar.codigos import obter_indice_codigos
+
+    indice = obter_indice_codigos()
+    codigos = indice.completar(args.prefixo, limite=args.limite) or indice.parecidos(args.prefixo, limite=args.limite)
+    for codigo in codigos:
+        print(codigo)
+    return 0 if codigos else 1
+
+
+# Comando "procar prices": resumo e histórico de preços observados de uma peça
+def comando_prices(args):
+    from procar.precos import obter_historico_precos
+
+    historico = obter_historico_precos()
+    resumo = historico.agregado_codigo(args.codigo)
+    if not resumo:
+        sys.stderr.write(f"Nenhum preço registrado para {args.codigo}\n")
+        return 1
+
+    if args.json:
+        print(json.dumps({"resumo": resumo, "historico": historico.historico(args.codigo)}, ensure_ascii=False))
+    else:
+        print(f"{resumo['contagem']} preços | mín. R$ {resumo['minimo']:.2f} | mediana R$ {resumo['mediana']:.2f} | "
+              f"média R$ {resumo['media']:.2f} | máx. R$ {resumo['maximo']:.2f}")
+    return 0
+
+
+# Comando "procar metrics": tempos, falhas e bytes por etapa, somando as buscas registradas
+def comando_metrics(args):
+    from procar.metricas import ler_metricas, resumir
+
+    rastreamentos = ler_metricas(args.arquivo)
+    if args.ultimas:
+        rastreamentos = rastreamentos[-args.ultimas:]
+    if not rastreamentos:
+        sys.stderr.write("Nenhuma busca registrada\n")
+        return 1
+
+    print(json.dumps({"buscas": len(rastreamentos), "etapas": resumir(rastreamentos)}, ensure_ascii=False, indent=2))
+    return 0
+
+
+# Comando "procar replay-server": serve uma fita gravada como se fosse a internet
+def comando_replay_server(args):
+    from procar.gravacao import Fita, ServidorReproducao, Simulacao
+
+    fita = Fita(args.fita)
+    if not len(fita):
+        sys.stderr.write(f"Nenhuma troca gravada em {args.fita}\n")
+        return 1
+
+    simulacao = Simulacao(args.latencia_ms, args.variacao_ms, args.taxa_erros,
+                          status_erro=args.status_erro or None, semente=args.semente)
+    servidor = ServidorReproducao(fita, simulacao, (args.endereco, args.porta))
+    sys.stderr.write(f"{len(fita)} páginas em http://{args.endereco}:{servidor.server_port} "
+                     f"(use PROCAR_REPRODUZIR=http://{args.endereco}:{servidor.server_port})\n")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="procar", description="Buscador de autopeças Procar.net")
+    parser.add_argument("-q", "--silencioso", action="store_true", help="não mostrar o progresso")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    lookup = subparsers.add_parser("lookup", help="buscar uma peça pelo código")
+    lookup.add_argument("codigo", help="código da peça (part number)")
+    lookup.add_argument("--json", action="store_true", help="imprimir o resultado completo em JSON")
+    lookup.add_argument("--prazo", type=float, help="prazo total da busca em segundos (padrão: sem prazo)")
+    lookup.set_defaults(funcao=comando_lookup)
+
+    batch = subparsers.add_parser("batch", help="buscar uma lista de peças a partir de um arquivo")
+    batch.add_argument("entrada", help="CSV (ou texto) com os códigos das peças")
+    batch.add_argument("-o", "--saida", required=True,
+                       help="arquivo de saída (.csv ou .jsonl); é retomado se já existir")
+    batch.add_argument("-w", "--workers", type=int, default=WORKERS_PADRAO, help="buscas simultâneas")
+    batch.add_argument("--parte", type=ler_parte, help="processar só uma parte da lista, no formato K/N (ex.: 1/4)")
+    batch.add_argument("--prazo", type=float, help="prazo total de cada busca em segundos (padrão: 30; 0 = sem prazo)")
+    batch.set_defaults(funcao=comando_batch)
+
+    ingest = subparsers.add_parser("ingest", help="importar catálogos de fornecedores (CSV/JSONL) para o índice local")
+    ingest.add_argument("arquivos", nargs="+", help="arquivos com código, nome, fabricante, dimensões e NCM")
+    ingest.set_defaults(funcao=comando_ingest)
+
+    search = subparsers.add_parser("search", help="buscar peças pelo nome no catálogo local")
+    search.add_argument("texto", help="nome (ou parte do nome) da peça")
+    search.add_argument("-n", "--limite", type=int, default=10, help="quantidade máxima de resultados")
+    search.add_argument("--json", action="store_true", help="imprimir cada resultado em JSON")
+    search.set_defaults(funcao=comando_search)
+
+    complete = subparsers.add_parser("complete", help="completar um código pelos códigos já conhecidos")
+    complete.add_argument("prefixo", help="começo do código (a formatação é ignorada)")
+    complete.add_argument("-n", "--limite", type=int, default=10, help="quantidade máxima de códigos")
+    complete.set_defaults(funcao=comando_complete)
+
+    prices = subparsers.add_parser("prices", help="resumo dos preços já observados de uma peça")
+    prices.add_argument("codigo", help="código da peça (part number)")
+    prices.add_argument("--json", action="store_true", help="imprimir o resumo e todas as observações em JSON")
+    prices.set_defaults(funcao=comando_prices)
+
+    metrics = subparsers.add_parser("metrics", help="resumo dos tempos de cada etapa das buscas registradas")
+    metrics.add_argument("--arquivo", help="arquivo de métricas (padrão: metricas.jsonl no diretório de dados)")
+    metrics.add_argument("-n", "--ultimas", type=int, help="considerar só as últimas N buscas")
+    metrics.set_defaults(funcao=comando_metrics)
+
+    replay = subparsers.add_parser("replay-server", help="servir localmente as respostas gravadas com PROCAR_GRAVAR")
+    replay.add_argument("fita", help="arquivo JSONL com as trocas HTTP gravadas")
+    replay.add_argument("--endereco", default="127.0.0.1")
+    replay.add_argument("--porta", type=int, default=8765)
+    replay.add_argument("--latencia-ms", type=float, default=0, help="atraso de cada resposta")
+    replay.add_argument("--variacao-ms", type=float, default=0, help="atraso extra aleatório (de 0 até este valor)")
+    replay.add_argument("--taxa-erros", type=float, default=0, help="fração das respostas que falham (0 a 1)")
+    replay.add_argument("--status-erro", type=int, default=503,
+                        help="status das respostas com falha (0 = derrubar a conexão)")
+    replay.add_argument("--semente", type=int, help="semente dos sorteios, para repetir a mesma sequência")
+    replay.set_defaults(funcao=comando_replay_server)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
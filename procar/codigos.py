@@ -0,0 +1,163 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+# Tudo o que não é letra ou dígito é formatação: "62811-7709R", "628117709 R" e "628117709r"
+# são o mesmo código
+REGEX_FORMATACAO = re.compile(r"[^0-9A-Z]")
+
+# Colunas aceitas como código da peça nos arquivos de entrada (lotes e catálogos)
+COLUNAS_CODIGO = ("codigo", "codigo_peca", "código", "part_number", "partnumber", "code")
+
+
+# Função para obter a forma canônica de um código de peça (maiúsculas, sem espaços e pontuação)
+def normalizar_codigo(codigo_peca):
+    codigo = unicodedata.normalize("NFKD", codigo_peca).encode("ascii", "ignore").decode("ascii")
+    return REGEX_FORMATACAO.sub("", codigo.upper())
+
+
+# Função para saber se um texto (título, snippet, URL) traz o código, com qualquer formatação
+def contem_codigo(texto, codigo_peca):
+    if not texto or not normalizar_codigo(codigo_peca):
+        return False
+    return regex_codigo_inteiro(codigo_peca).search(texto) is not None
+
+
+# Função para montar a expressão regular que acha o código em um texto com qualquer formatação
+# ("628117709R", "628117709-R", "628117709 r", com re.IGNORECASE)
+def padrao_codigo(codigo_peca):
+    return r"[\W_]*".join(re.escape(letra) for letra in normalizar_codigo(codigo_peca))
+
+
+# Função para obter (compilada uma vez por código) a expressão que acha o código inteiro: colado a
+# outras letras ou dígitos ele é parte de outra coisa ("123456" não está em "R$ 12.345,67 frete 8")
+@lru_cache(maxsize=1024)
+def regex_codigo_inteiro(codigo_peca):
+    return re.compile(r"(?<![A-Za-z0-9])" + padrao_codigo(codigo_peca) + r"(?![A-Za-z0-9])", re.IGNORECASE)
+
+
+# Função para saber se dois códigos diferem em no máximo uma letra (troca, falta ou sobra)
+def _uma_diferenca(codigo, outro):
+    if abs(len(codigo) - len(outro)) > 1:
+        return False
+    if len(codigo) > len(outro):
+        codigo, outro = outro, codigo
+    for indice, (letra, outra) in enumerate(zip(codigo, outro)):
+        if letra != outra:
+            if len(codigo) == len(outro):
+                return codigo[indice + 1:] == outro[indice + 1:]
+            return codigo[indice:] == outro[indice + 1:]
+    return True
+
+
+# Índice ordenado dos códigos conhecidos (cache de peças e catálogo local), para autocompletar
+# por prefixo e achar códigos parecidos com busca binária
+class IndiceCodigos:
+    def __init__(self, codigos=()):
+        self._codigos = sorted({normalizar_codigo(codigo) for codigo in codigos} - {""})
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._codigos)
+
+    def __contains__(self, codigo_peca):
+        codigo = normalizar_codigo(codigo_peca)
+        with self._lock:
+            indice = bisect_left(self._codigos, codigo)
+            return indice < len(self._codigos) and self._codigos[indice] == codigo
+
+    # Incluir códigos no índice
+    def adicionar(self, codigos):
+        novos = {normalizar_codigo(codigo) for codigo in codigos} - {""}
+        with self._lock:
+            if len(novos) > 16:
+                self._codigos = sorted(novos.union(self._codigos))
+                return
+            for codigo in novos:
+                indice = bisect_left(self._codigos, codigo)
+                if indice == len(self._codigos) or self._codigos[indice] != codigo:
+                    insort(self._codigos, codigo, lo=indice)
+
+    # Retirar códigos do índice
+    def remover(self, codigos):
+        with self._lock:
+            for codigo in {normalizar_codigo(codigo) for codigo in codigos}:
+                indice = bisect_left(self._codigos, codigo)
+                if indice < len(self._codigos) and self._codigos[indice] == codigo:
+                    del self._codigos[indice]
+
+    # Códigos que começam com o prefixo, em ordem alfabética
+    def completar(self, prefixo, limite=10):
+        prefixo = normalizar_codigo(prefixo)
+        if not prefixo:
+            return []
+        with self._lock:
+            inicio = bisect_left(self._codigos, prefixo)
+            encontrados = []
+            for codigo in self._codigos[inicio:inicio + limite]:
+                if not codigo.startswith(prefixo):
+                    break
+                encontrados.append(codigo)
+            return encontrados
+
+    # Códigos que diferem do informado em uma letra (erro de digitação).
+    # Só são comparados os códigos que compartilham o começo com ele, achados por busca binária.
+    def parecidos(self, codigo_peca, limite=5, prefixo_comum=3):
+        codigo = normalizar_codigo(codigo_peca)
+        if len(codigo) <= prefixo_comum:
+            return []
+        prefixo = codigo[:prefixo_comum]
+        encontrados = []
+        with self._lock:
+            indice = bisect_left(self._codigos, prefixo)
+            while indice < len(self._codigos) and self._codigos[indice].startswith(prefixo):
+                outro = self._codigos[indice]
+                if outro != codigo and _uma_diferenca(codigo, outro):
+                    encontrados.append(outro)
+                    if len(encontrados) >= limite:
+                        break
+                indice += 1
+        return encontrados
+
+    # Sugestões para um código que não está no índice: códigos que começam com ele e parecidos
+    def sugerir(self, codigo_peca, limite=5):
+        if codigo_peca in self:
+            return []
+        sugestoes = self.completar(codigo_peca, limite)
+        for codigo in self.parecidos(codigo_peca, limite):
+            if codigo not in sugestoes:
+                sugestoes.append(codigo)
+        return sugestoes[:limite]
+
+
+_indice_codigos = None
+_lock_indice_codigos = threading.Lock()
+
+
+# Função para obter o índice de códigos do processo (montado na primeira vez com os códigos
+# do cache de peças e do catálogo local; depois é atualizado a cada gravação)
+def obter_indice_codigos():
+    global _indice_codigos
+    from procar.cache import obter_cache_pecas
+    from procar.catalogo import obter_catalogo
+
+    with _lock_indice_codigos:
+        if _indice_codigos is None:
+            codigos = list(obter_cache_pecas().codigos())
+            codigos.extend(obter_catalogo().codigos())
+            _indice_codigos = IndiceCodigos(codigos)
+        return _indice_codigos
+
+
+# Função para avisar o índice (se já estiver montado) sobre códigos novos
+def registrar_codigos(codigos):
+    if _indice_codigos is not None:
+        _indice_codigos.adicionar(codigos)
+
+
+# Função para avisar o índice (se já estiver montado) sobre códigos removidos
+def descartar_codigos(codigos):
+    if _indice_codigos is not None:
+        _indice_codigos.remover(codigos)
@@ -0,0 +1,90 @@
+import os
+
+from procar.codigos import contem_codigo
+
+# Confiança (de 0 a 1) que cada campo precisa atingir para a busca parar de analisar páginas
+# de detalhe. 1 = a evidência "completa" descrita em ConfiancaCampos.
+CONFIANCA_MINIMA = {
+    "nome": 1.0,
+    "precos": 1.0,
+    "compatibilidade": 1.0,
+    "dimensoes": 1.0,
+    "imagem_url": 1.0
+}
+
+# Evidência que dá confiança total a cada campo
+PONTUACAO_NOME_CONFIAVEL = 13   # ex.: título do Mercado Livre com o código e o tipo da peça
+PRECOS_SUFICIENTES = 3
+COMPATIBILIDADES_SUFICIENTES = 5  # a consolidação guarda no máximo 5...
+PAGINAS_COM_COMPATIBILIDADE = 2   # ...ou a lista de veículos de duas páginas diferentes
+DIMENSOES = ("largura", "altura", "comprimento", "peso")
+
+
+# Função para ler a confiança mínima da variável de ambiente PROCAR_CONFIANCA, no formato
+# "dimensoes=0.5,compatibilidade=0.4" (campos não citados mantêm o padrão; itens com campo
+# desconhecido ou valor que não é número são ignorados)
+def confianca_do_ambiente():
+    minima = {}
+    for item in os.environ.get("PROCAR_CONFIANCA", "").split(","):
+        if "=" not in item:
+            continue
+        campo, valor = item.split("=", 1)
+        if campo.strip() not in CONFIANCA_MINIMA:
+            continue
+        try:
+            minima[campo.strip()] = float(valor)
+        except ValueError:
+            continue
+    return minima
+
+
+# Evidências acumuladas de cada campo durante uma busca: o nome exato vindo das fontes, os
+# preços observados e o que as páginas de detalhe já analisadas trouxeram
+class ConfiancaCampos:
+    def __init__(self, codigo_peca, minima=None):
+        self.codigo_peca = codigo_peca
+        self.minima = {**CONFIANCA_MINIMA, **confianca_do_ambiente(), **(minima or {})}
+        self.pontuacao_nome = 0
+        self.titulos_com_codigo = 0
+        self.precos = 0
+        self.compatibilidade = set()
+        self.paginas_com_compatibilidade = 0
+        self.dimensoes = set()
+        self.imagem = False
+
+    # Registrar a pontuação do melhor nome exato encontrado nas fontes
+    def registrar_nome(self, pontuacao):
+        self.pontuacao_nome = max(self.pontuacao_nome, pontuacao or 0)
+
+    # Registrar preços observados (listagens ou páginas)
+    def registrar_precos(self, quantidade):
+        self.precos += quantidade
+
+    # Registrar o que uma página de detalhe analisada trouxe
+    def registrar_pagina(self, info):
+        if contem_codigo(info.get("titulo"), self.codigo_peca):
+            self.titulos_com_codigo += 1
+        if info.get("preco") and info["preco"] > 0:
+            self.precos += 1
+        if info.get("compatibilidade"):
+            self.compatibilidade.update(info["compatibilidade"])
+            self.paginas_com_compatibilidade += 1
+        self.dimensoes.update(chave for chave in (info.get("dimensoes") or {}) if chave in DIMENSOES)
+        if info.get("imagem_url"):
+            self.imagem = True
+
+    # Confiança atual de cada campo (0 a 1)
+    def confianca(self):
+        return {
+            "nome": min(1.0, max(self.pontuacao_nome / PONTUACAO_NOME_CONFIAVEL, self.titulos_com_codigo / 2)),
+            "precos": min(1.0, self.precos / PRECOS_SUFICIENTES),
+            "compatibilidade": min(1.0, max(len(self.compatibilidade) / COMPATIBILIDADES_SUFICIENTES,
+                                            self.paginas_com_compatibilidade / PAGINAS_COM_COMPATIBILIDADE)),
+            "dimensoes": len(self.dimensoes) / len(DIMENSOES),
+            "imagem_url": 1.0 if self.imagem else 0.0
+        }
+
+    # Saber se todos os campos já atingiram a confiança mínima
+    def atingida(self):
+        confianca = self.confianca()
+        return all(confianca[campo] >= minima for campo, minima in self.minima.items())
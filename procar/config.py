@@ -0,0 +1,10 @@
+import os
+
+# Diretório onde ficam os dados persistentes (caches, índices, históricos)
+DIRETORIO_DADOS = os.environ.get("PROCAR_DADOS", os.path.join(os.path.expanduser("~"), ".procar"))
+
+
+# Função para montar o caminho de um arquivo dentro do diretório de dados
+def caminho_dados(nome_arquivo):
+    os.makedirs(DIRETORIO_DADOS, exist_ok=True)
+    return os.path.join(DIRETORIO_DADOS, nome_arquivo)
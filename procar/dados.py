@@ -0,0 +1,71 @@
+# Cache de peças já pesquisadas e validadas
+CACHE_PECAS = {
+    "LR006225": {
+        "nome": "Travessa Dianteira Inferior Land Rover Freelander 2",
+        "fabricante": "Land Rover",
+        "descricao": "TRAVESSA DIANTEIRA INFERIOR LAND ROVER FREELANDER 2 2006 A 2014 - ORIGINAL",
+        "compatibilidade": [
+            "LAND ROVER FREELANDER 2 (2006-2014)",
+            "LAND ROVER DISCOVERY SPORT (2015-2019)",
+            "RANGE ROVER EVOQUE (2012-2018)"
+        ],
+        "preco_novo_min": 580.00,
+        "preco_novo_med": 750.50,
+        "preco_usado_min": 350.00,
+        "preco_usado_med": 450.30,
+        "preco_recond_min": 420.00,
+        "preco_recond_med": 520.00,
+        "dimensoes": {
+            "largura": 40,
+            "altura": 10,
+            "comprimento": 60,
+            "peso": 2.5
+        },
+        "ncm": "87082999",
+        "categoria_ml": "Travessas e Crossmembers",
+        "imagem_url": "https://http2.mlstatic.com/D_NQ_NP_2X_628111-MLB31002253028_062019-F.webp",
+        "fonte": "Cache validado"
+    },
+    "852213BA0A": {
+        "nome": "Suporte Guia Parachoque Traseiro Esquerdo Nissan Versa",
+        "fabricante": "Nissan",
+        "descricao": "SUPORTE GUIA PARACHOQUE TRASEIRO ESQUERDO NISSAN VERSA 2011 A 2019 - ORIGINAL",
+        "compatibilidade": [
+            "NISSAN VERSA (2011-2019)",
+            "NISSAN MARCH (2011-2019)"
+        ],
+        "preco_novo_min": 120.00,
+        "preco_novo_med": 180.50,
+        "preco_usado_min": 80.00,
+        "preco_usado_med": 110.30,
+        "preco_recond_min": 95.00,
+        "preco_recond_med": 130.00,
+        "dimensoes": {
+            "largura": 15,
+            "altura": 10,
+            "comprimento": 25,
+            "peso": 0.35
+        },
+        "ncm": "87082999",
+        "categoria_ml": "Parachoques",
+        "imagem_url": "https://http2.mlstatic.com/D_NQ_NP_2X_991721-MLB43736719278_102020-F.webp",
+        "fonte": "Cache validado"
+    }
+}
+
+
+# Lista de sites confiáveis para priorizar na busca
+SITES_CONFIAVEIS = [
+    "mercadolivre.com.br",
+    "shopee.com.br",
+    "pecaagora.com.br",
+    "autopecaonline.com.br",
+    "pecasautomotivas.com.br",
+    "buscapecas.com.br",
+    "jaguarlandroverclassic.com",
+    "britcar.com",
+    "autodoc.com.br",
+    "pecas.com.br",
+    "pecauto.com.br",
+    "webpecas.com.br"
+]
@@ -0,0 +1,264 @@
+import html as html_lib
+import json
+import re
+
+# Dados estruturados das páginas de produto: JSON-LD (schema.org Product), meta tags OpenGraph
+# (og:/product:) e o estado JSON que as lojas embutem para o JavaScript da página. Os blocos são
+# localizados direto no HTML, sem montar a árvore, e quase sempre trazem nome, preço, marca,
+# GTIN, imagem e medidas exatos.
+
+REGEX_TITULO = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+REGEX_META = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+REGEX_ATRIBUTO = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+REGEX_JSON_LD = re.compile(r'<script[^>]+application/ld\+json[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+REGEX_NEXT_DATA = re.compile(r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+REGEX_ESTADO = re.compile(r'__(?:PRELOADED|INITIAL)_STATE__\s*=\s*')
+
+# Meta tags lidas e o campo de cada uma
+METAS = {
+    "og:title": "titulo",
+    "og:description": "descricao",
+    "description": "descricao",
+    "og:image": "imagem_url",
+    "product:price:amount": "preco",
+    "og:price:amount": "preco",
+    "product:brand": "marca"
+}
+
+# Medidas do schema.org e os campos de dimensões
+MEDIDAS = {"width": "largura", "height": "altura", "depth": "comprimento", "weight": "peso"}
+
+# Fatores para centímetros e quilos (códigos UN/CEFACT usados em unitCode, ou a unidade escrita),
+# sempre em minúsculas. Medida com unidade fora desta lista é descartada.
+FATORES_UNIDADE = {
+    "cmt": 1, "cm": 1, "mmt": 0.1, "mm": 0.1, "mtr": 100, "m": 100,
+    "inh": 2.54, "in": 2.54, "pol": 2.54, "fot": 30.48, "ft": 30.48,
+    "kgm": 1, "kg": 1, "grm": 0.001, "g": 0.001,
+    "lbr": 0.45359237, "lb": 0.45359237, "lbs": 0.45359237, "onz": 0.028349523, "oz": 0.028349523
+}
+REGEX_MEDIDA = re.compile(r'(\d+(?:[,.]\d+)?)\s*(cm|mm|m|in|pol|ft|kg|g|lbs|lb|oz)\b', re.IGNORECASE)
+
+CHAVES_GTIN = ("gtin13", "gtin14", "gtin12", "gtin8", "gtin", "ean")
+
+
+# Função para converter um preço ("189.90", "1.234,56", "1,234.56", "R$ 1.234", 189.9) em número.
+# O separador decimal é o último separador, desde que tenha 1 ou 2 dígitos depois dele; com 3
+# dígitos depois de um separador único, ele é de milhar. O que não se encaixa (grupos de milhar
+# tortos, "12.3456") é ambíguo e fica sem preço.
+def ler_preco(valor):
+    if isinstance(valor, (int, float)):
+        return float(valor) if valor > 0 else None
+    if not isinstance(valor, str):
+        return None
+    texto = re.sub(r'[^\d,.]', '', valor).strip(',.')
+    posicao = max(texto.rfind(','), texto.rfind('.'))
+    inteiro, decimais = texto, ""
+    if posicao != -1:
+        separador = texto[posicao]
+        casas = len(texto) - posicao - 1
+        outro = '.' if separador == ',' else ','
+        if casas in (1, 2) and texto.count(separador) == 1:
+            inteiro, decimais, milhar = texto[:posicao], texto[posicao + 1:], outro
+        elif casas == 3 and outro not in texto:
+            milhar = separador
+        else:
+            return None
+        grupos = inteiro.split(milhar)
+        if len(grupos) > 1 and (not 1 <= len(grupos[0]) <= 3 or any(len(grupo) != 3 for grupo in grupos[1:])):
+            return None
+        inteiro = "".join(grupos)
+    try:
+        preco = float(f"{inteiro or 0}.{decimais or 0}")
+    except ValueError:
+        return None
+    return preco if preco > 0 else None
+
+
+# Função para converter uma medida do schema.org (QuantitativeValue, número ou "40 cm") em cm ou kg.
+# Sem unidade, o número já é tomado como cm/kg; com uma unidade desconhecida, a medida é
+# descartada e fica para a leitura do HTML.
+def ler_medida(valor):
+    unidade = None
+    if isinstance(valor, dict):
+        unidade = valor.get("unitCode") or valor.get("unitText")
+        valor = valor.get("value")
+    if isinstance(valor, str):
+        match = REGEX_MEDIDA.search(valor)
+        if match:
+            valor, unidade = match.group(1), unidade or match.group(2)
+        try:
+            valor = float(str(valor).replace(',', '.'))
+        except ValueError:
+            return None
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+        return None
+    fator = FATORES_UNIDADE.get(str(unidade).strip().lower()) if unidade else 1
+    if fator is None:
+        return None
+    return round(float(valor) * fator, 4)
+
+
+# Função para pegar o texto de um valor que pode vir como texto, objeto ({"name"/"url"}) ou lista
+def ler_texto(valor, chave="name"):
+    if isinstance(valor, list):
+        valor = valor[0] if valor else None
+    if isinstance(valor, dict):
+        valor = valor.get(chave) or valor.get("url") or valor.get("name")
+    return valor.strip() if isinstance(valor, str) and valor.strip() else None
+
+
+# Função para listar todos os objetos de um documento JSON-LD (listas e @graph incluídos)
+def objetos_json_ld(dados):
+    pendentes = [dados]
+    while pendentes:
+        item = pendentes.pop()
+        if isinstance(item, list):
+            pendentes.extend(reversed(item))
+        elif isinstance(item, dict):
+            yield item
+            if "@graph" in item:
+                pendentes.append(item["@graph"])
+
+
+# Função para saber se um objeto JSON-LD é um produto
+def eh_produto(objeto):
+    tipo = objeto.get("@type")
+    tipos = tipo if isinstance(tipo, list) else [tipo]
+    return "Product" in tipos or "IndividualProduct" in tipos
+
+
+# Função para ler os campos de um produto schema.org
+def ler_produto(produto):
+    campos = {}
+    if ler_texto(produto.get("name")):
+        campos["titulo"] = ler_texto(produto.get("name"))
+    if ler_texto(produto.get("description")):
+        campos["descricao"] = ler_texto(produto.get("description"))
+    if ler_texto(produto.get("image"), "url"):
+        campos["imagem_url"] = ler_texto(produto.get("image"), "url")
+    if ler_texto(produto.get("brand")):
+        campos["marca"] = ler_texto(produto.get("brand"))
+    for chave in CHAVES_GTIN:
+        if produto.get(chave):
+            campos["gtin"] = str(produto[chave]).strip()
+            break
+
+    # Preço: primeira oferta com preço (ou o menor de uma AggregateOffer)
+    ofertas = produto.get("offers")
+    for oferta in ofertas if isinstance(ofertas, list) else [ofertas]:
+        if isinstance(oferta, dict):
+            preco = ler_preco(oferta.get("price")) or ler_preco(oferta.get("lowPrice"))
+            if preco:
+                campos["preco"] = preco
+                break
+
+    dimensoes = {}
+    for chave, campo in MEDIDAS.items():
+        if produto.get(chave) is not None:
+            medida = ler_medida(produto[chave])
+            if medida is not None:
+                dimensoes[campo] = medida
+    if dimensoes:
+        campos["dimensoes"] = dimensoes
+
+    # Veículos compatíveis (isAccessoryOrSparePartFor)
+    compativeis = produto.get("isAccessoryOrSparePartFor")
+    compativeis = [ler_texto(item) for item in (compativeis if isinstance(compativeis, list) else [compativeis])]
+    compativeis = [item for item in compativeis if item]
+    if compativeis:
+        campos["compatibilidade"] = compativeis
+    return campos
+
+
+# Função para procurar, em um estado JSON embutido, o primeiro objeto com cara de produto
+# (título ou nome e um preço)
+def ler_estado(estado):
+    pendentes = [estado]
+    while pendentes:
+        item = pendentes.pop()
+        if isinstance(item, list):
+            pendentes.extend(reversed(item))
+            continue
+        if not isinstance(item, dict):
+            continue
+        nome = ler_texto(item.get("title")) or ler_texto(item.get("name"))
+        preco = ler_preco(item.get("price"))
+        if nome and preco:
+            campos = {"titulo": nome, "preco": preco}
+            imagem = (ler_texto(item.get("pictures"), "url") or ler_texto(item.get("thumbnail"), "url")
+                      or ler_texto(item.get("image"), "url"))
+            if imagem:
+                campos["imagem_url"] = imagem
+            if ler_texto(item.get("brand")):
+                campos["marca"] = ler_texto(item.get("brand"))
+            for chave in CHAVES_GTIN:
+                if item.get(chave):
+                    campos["gtin"] = str(item[chave]).strip()
+                    break
+            return campos
+        pendentes.extend(reversed(list(item.values())))
+    return {}
+
+
+# Função para ler os estados JSON embutidos (__NEXT_DATA__, __PRELOADED_STATE__, __INITIAL_STATE__)
+def estados_embutidos(html):
+    match = REGEX_NEXT_DATA.search(html)
+    if match:
+        try:
+            yield json.loads(match.group(1))
+        except ValueError:
+            pass
+    decodificador = json.JSONDecoder()
+    for match in REGEX_ESTADO.finditer(html):
+        try:
+            yield decodificador.raw_decode(html, match.end())[0]
+        except ValueError:
+            continue
+
+
+# Função para ler as meta tags OpenGraph/product: da página
+def ler_metas(html):
+    campos = {}
+    for tag in REGEX_META.findall(html):
+        atributos = {nome.lower(): valor_duplo or valor_simples
+                     for nome, valor_duplo, valor_simples in REGEX_ATRIBUTO.findall(tag)}
+        campo = METAS.get((atributos.get("property") or atributos.get("name") or "").lower())
+        conteudo = html_lib.unescape(atributos.get("content") or "").strip()
+        if not campo or not conteudo or campo in campos:
+            continue
+        if campo == "preco":
+            conteudo = ler_preco(conteudo)
+            if conteudo is None:
+                continue
+        campos[campo] = conteudo
+    return campos
+
+
+# Função para extrair os dados estruturados de uma página de detalhe. Devolve só os campos
+# encontrados, nos mesmos nomes de analisar_pagina (mais "marca" e "gtin"). Vale o JSON-LD, depois
+# o estado embutido e por fim as meta tags; o título é o da tag <title>, como na leitura completa.
+def extrair_dados_estruturados(html):
+    campos = {}
+
+    for match in REGEX_JSON_LD.finditer(html):
+        try:
+            dados = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for objeto in objetos_json_ld(dados):
+            if eh_produto(objeto):
+                for campo, valor in ler_produto(objeto).items():
+                    campos.setdefault(campo, valor)
+
+    for estado in estados_embutidos(html):
+        for campo, valor in ler_estado(estado).items():
+            campos.setdefault(campo, valor)
+
+    for campo, valor in ler_metas(html).items():
+        campos.setdefault(campo, valor)
+
+    match = REGEX_TITULO.search(html)
+    if match:
+        campos["titulo"] = html_lib.unescape(match.group(1)).strip()
+
+    return campos
@@ -0,0 +1,277 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+from procar.classificacao import BUSCADOR_TITULOS
+from procar.codigos import contem_codigo, regex_codigo_inteiro
+from procar.estruturados import extrair_dados_estruturados
+from procar.metricas import medir, submeter
+from procar.pagina import analisar_pagina
+from procar.prazo import esgotado, restante
+from procar.rede import baixar
+
+# Limites de concorrência para a análise das páginas de detalhe
+MAX_PAGINAS_SIMULTANEAS = 6
+MAX_PAGINAS_POR_DOMINIO = 2
+
+# Bytes baixados no máximo de cada página de detalhe (o que interessa fica no início da página)
+MAX_BYTES_PAGINA = 1024 * 1024
+
+# Campos da página de detalhe usados na consolidação: quando os dados estruturados trazem todos,
+# o HTML nem é percorrido
+CAMPOS_CONSOLIDACAO = ("titulo", "preco", "compatibilidade", "dimensoes", "imagem_url")
+MEDIDAS = ("largura", "altura", "comprimento", "peso")
+
+
+# Função para extrair o nome exato da peça a partir dos resultados
+def extrair_nome_exato_peca(resultados_google, resultados_ml, resultados_shopee, codigo_peca):
+    candidatos = []
+    # O código é procurado com qualquer formatação ("628117709R", "628117709-R", "628117709 r")
+    regex_codigo = regex_codigo_inteiro(codigo_peca)
+    regex_snippet = re.compile(r'([^.,:;]+' + regex_codigo.pattern + r'[^.,:;]+)', re.IGNORECASE)
+    
+    # Processar resultados do Mercado Livre (alta prioridade)
+    for resultado in resultados_ml:
+        titulo = resultado.get("titulo", "")
+        if contem_codigo(titulo, codigo_peca):
+            # Limpar o título
+            titulo_limpo = regex_codigo.sub('', titulo).strip()
+            titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
+            
+            if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
+                candidatos.append({
+                    "nome": titulo_limpo,
+                    "pontuacao": 10,
+                    "fonte": "Mercado Livre",
+                    "url": resultado.get("link", "")
+                })
+    
+    # Processar resultados da Shopee
+    for resultado in resultados_shopee:
+        titulo = resultado.get("titulo", "")
+        if contem_codigo(titulo, codigo_peca):
+            # Limpar o título
+            titulo_limpo = regex_codigo.sub('', titulo).strip()
+            titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
+            
+            if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
+                candidatos.append({
+                    "nome": titulo_limpo,
+                    "pontuacao": 8,
+                    "fonte": "Shopee",
+                    "url": resultado.get("link", "")
+                })
+    
+    # Processar resultados do Google
+    for resultado in resultados_google:
+        titulo = resultado.get("titulo", "")
+        snippet = resultado.get("snippet", "")
+        domain = resultado.get("domain", "")
+        
+        # Verificar se o código está no título ou snippet
+        if contem_codigo(titulo, codigo_peca) or contem_codigo(snippet, codigo_peca):
+            # Extrair do título
+            if contem_codigo(titulo, codigo_peca):
+                # Limpar o título
+                titulo_limpo = regex_codigo.sub('', titulo).strip()
+                titulo_limpo = re.sub(r'^\W+|\W+$', '', titulo_limpo).strip()  # Remover pontuação no início/fim
+                
+                if len(titulo_limpo) > 10:  # Garantir que não seja muito curto
+                    pontuacao_base = 7
+                    
+                    # Aumentar pontuação para sites confiáveis
+                    if resultado.get("confiavel", False):
+                        pontuacao_base += 3
+                    
+                    candidatos.append({
+                        "nome": titulo_limpo,
+                        "pontuacao": pontuacao_base,
+                        "fonte": f"Google ({domain})",
+                        "url": resultado.get("link", "")
+                    })
+            
+            # Extrair do snippet
+            match_snippet = regex_snippet.search(snippet)
+            if match_snippet:
+                snippet_text = match_snippet.group(1).strip()
+                # Limpar o snippet
+                snippet_limpo = regex_codigo.sub('', snippet_text).strip()
+                snippet_limpo = re.sub(r'^\W+|\W+$', '', snippet_limpo).strip()  # Remover pontuação no início/fim
+                
+                if len(snippet_limpo) > 10:  # Garantir que não seja muito curto
+                    pontuacao_base = 5
+                    
+                    # Aumentar pontuação para sites confiáveis
+                    if resultado.get("confiavel", False):
+                        pontuacao_base += 2
+                    
+                    candidatos.append({
+                        "nome": snippet_limpo,
+                        "pontuacao": pontuacao_base,
+                        "fonte": f"Google Snippet ({domain})",
+                        "url": resultado.get("link", "")
+                    })
+    
+    # Pontuar os candidatos (uma única varredura por todos os nomes)
+    encontrados_por_nome = BUSCADOR_TITULOS.primeiros_varios(candidato["nome"] for candidato in candidatos)
+    for candidato, encontrados in zip(candidatos, encontrados_por_nome):
+        # Adicionar pontos para nomes mais específicos
+        if "termo_peca" in encontrados:
+            candidato["pontuacao"] += 3
+        
+        # Adicionar pontos para nomes com fabricante
+        if "marca" in encontrados:
+            candidato["pontuacao"] += 2
+        
+        # Adicionar pontos para nomes com "original"
+        if "original" in encontrados:
+            candidato["pontuacao"] += 1
+        
+        # Penalizar nomes muito longos
+        if len(candidato["nome"].lower()) > 100:
+            candidato["pontuacao"] -= 2
+    
+    # Ordenar por pontuação
+    candidatos.sort(key=lambda x: x["pontuacao"], reverse=True)
+    
+    # Retornar o melhor candidato e a lista completa para debug
+    if candidatos:
+        return {
+            "nome": candidatos[0]["nome"],
+            "fonte": candidatos[0]["fonte"],
+            "url": candidatos[0]["url"],
+            "todos_candidatos": candidatos[:5]  # Retornar os 5 melhores para debug
+        }
+    else:
+        return {
+            "nome": None,
+            "fonte": None,
+            "url": None,
+            "todos_candidatos": []
+        }
+
+
+# Função para extrair informações detalhadas de um site.
+# Primeiro vêm os dados estruturados (JSON-LD, meta tags, estado embutido); a leitura do HTML
+# só procura os campos que eles não trouxeram.
+# "parar()" diz se a busca já não precisa da página (prazo ou confiança atingida): ela é consultada
+# antes do download, na fila do domínio, durante a leitura do corpo e antes da análise.
+def extrair_informacoes_site(url, codigo_peca, timeout=10, parar=None):
+    with medir("pagina", urlparse(url).netloc) as trecho:
+        if esgotado() or (parar and parar()):
+            trecho.status = "cancelada"
+            return informacoes_site_vazias(url)
+        try:
+            response = baixar(url, timeout=timeout, max_bytes=MAX_BYTES_PAGINA, desistir=parar)
+            if parar and parar():
+                trecho.status = "cancelada"
+                return informacoes_site_vazias(url)
+            html = response.text
+            with medir("parse", "estruturados") as trecho_estruturados:
+                estruturados = extrair_dados_estruturados(html)
+                trecho_estruturados.extras["campos"] = sorted(estruturados)
+
+            # Imagem: como as <img> da página, a estruturada só vale de cara se trouxer o código da
+            # peça; sem isso, uma <img> com o código tem preferência e ela fica de reserva
+            imagem_reserva = None
+            if estruturados.get("imagem_url") and not contem_codigo(estruturados["imagem_url"], codigo_peca):
+                imagem_reserva = estruturados.pop("imagem_url")
+
+            faltando = [campo for campo in CAMPOS_CONSOLIDACAO if not estruturados.get(campo)]
+            if "dimensoes" not in faltando and len(estruturados["dimensoes"]) < len(MEDIDAS):
+                faltando.append("dimensoes")
+
+            info = informacoes_site_vazias(url)
+            if faltando:
+                with medir("parse", "pagina") as trecho_pagina:
+                    info.update(analisar_pagina(html, codigo_peca, ate_bastar=True, campos=faltando))
+                    trecho_pagina.extras["campos"] = faltando
+
+            # Medidas: as estruturadas valem mais; o HTML só completa as que faltarem
+            dimensoes = {**info["dimensoes"], **estruturados.get("dimensoes", {})}
+            info.update(estruturados)
+            info["dimensoes"] = dimensoes
+            info["imagem_url"] = info["imagem_url"] or imagem_reserva
+            info["url"] = url
+            return info
+        except Exception as e:
+            if parar and parar():
+                trecho.status = "cancelada"
+            else:
+                trecho.falhou(e)
+            return informacoes_site_vazias(url)
+
+
+# Função para montar o resultado vazio de um site que não pôde ser analisado
+def informacoes_site_vazias(url):
+    return {
+        "titulo": "",
+        "descricao": "",
+        "texto_relevante": "",
+        "preco": None,
+        "compatibilidade": [],
+        "dimensoes": {},
+        "imagem_url": None,
+        "url": url
+    }
+
+
+# Função para analisar vários sites em paralelo, limitando conexões por domínio.
+# As URLs são despachadas na ordem recebida (da mais para a menos promissora). "basta()" é
+# consultada a cada página concluída: quando devolve True, as páginas que ainda não saíram não
+# são baixadas e as que estão em andamento ficam de fora do resultado.
+# Se a busca tiver prazo, as páginas que não ficarem prontas a tempo também ficam de fora.
+def extrair_informacoes_sites(urls, codigo_peca, ao_concluir=None, basta=None,
+                              max_simultaneas=MAX_PAGINAS_SIMULTANEAS,
+                              max_por_dominio=MAX_PAGINAS_POR_DOMINIO):
+    resultados = [None] * len(urls)
+    fila = list(enumerate(urls))
+    ativos_por_dominio = {}
+    futuros = {}
+    concluidas = 0
+    # Sinal para as páginas ainda em andamento quando a análise termina: elas param de baixar e
+    # de ocupar a fila dos domínios
+    encerrada = threading.Event()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_simultaneas))
+    try:
+        while fila or futuros:
+            # Prazo da busca esgotado: não esperar pelas páginas que faltam
+            if esgotado():
+                break
+
+            # Os campos já têm a confiança pedida: não analisar mais nada
+            if basta and basta():
+                break
+
+            # Despachar páginas enquanto houver vaga global e vaga no domínio
+            for item in list(fila):
+                if len(futuros) >= max_simultaneas:
+                    break
+                indice, url = item
+                dominio = urlparse(url).netloc
+                if ativos_por_dominio.get(dominio, 0) >= max_por_dominio:
+                    continue
+                fila.remove(item)
+                ativos_por_dominio[dominio] = ativos_por_dominio.get(dominio, 0) + 1
+                futuro = submeter(executor, extrair_informacoes_site, url, codigo_peca, parar=encerrada.is_set)
+                futuros[futuro] = (indice, url, dominio)
+
+            # Aguardar a próxima página terminar (ou o prazo acabar)
+            concluidos, _ = wait(list(futuros), timeout=restante(), return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                indice, url, dominio = futuros.pop(futuro)
+                ativos_por_dominio[dominio] -= 1
+                try:
+                    resultados[indice] = futuro.result()
+                except Exception as e:
+                    resultados[indice] = informacoes_site_vazias(url)
+                concluidas += 1
+                if ao_concluir:
+                    ao_concluir(concluidas, len(urls), resultados[indice])
+    finally:
+        encerrada.set()
+        executor.shutdown(wait=False)
+
+    return [resultado for resultado in resultados if resultado is not None]
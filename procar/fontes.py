@@ -0,0 +1,266 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import quote_plus, urlparse
+
+from procar.codigos import contem_codigo
+from procar.dados import SITES_CONFIAVEIS
+from procar.metricas import medir, submeter
+from procar.parser_html import ler_html
+from procar.prazo import esgotado, restante
+from procar.saude import obter_saude
+from procar.rede import baixar
+
+# Prazo máximo (em segundos) de cada fonte de busca
+PRAZOS_FONTES = {
+    "google": 8,
+    "mercado_livre": 10,
+    "shopee": 6
+}
+
+# Partes da página de cada fonte que interessam (parsing parcial)
+SOMENTE_GOOGLE = [("div", "g")]
+SOMENTE_MERCADO_LIVRE = [("a", "ui-search-link"), (None, "ui-search-result__content-wrapper")]
+SOMENTE_SHOPEE = [(None, "shopee-search-item-result__item")]
+
+
+# Função para buscar no Google
+def buscar_google(query, num_results=20, timeout=10):
+    with medir("fonte", "google") as trecho:
+        try:
+            url = f"https://www.google.com/search?q={quote_plus(query)}&num={num_results}"
+            response = baixar(url, timeout=timeout)
+            with medir("parse", "google"):
+                resultados = extrair_resultados_google(response.text)
+            trecho.extras["itens"] = len(resultados)
+            return resultados
+        except Exception as e:
+            trecho.falhou(e)
+            return []
+
+
+# Função para extrair os resultados de uma página de busca do Google
+def extrair_resultados_google(html, backend=None):
+    documento = ler_html(html, backend, somente=SOMENTE_GOOGLE)
+    
+    # Extrair resultados
+    resultados = []
+    for g in documento.selecionar('div.g'):
+        anchor = g.selecionar_um('a')
+        if anchor and anchor.atributo('href', '').startswith('http'):
+            title_elem = g.selecionar_um('h3')
+            snippet_elem = g.selecionar_um('div.VwiC3b') or g.selecionar_um('span.aCOpRe')
+            
+            title = title_elem.texto if title_elem else "Sem título"
+            snippet = snippet_elem.texto if snippet_elem else "Sem descrição"
+            link = anchor.atributo('href')
+            
+            # Verificar se é um site confiável
+            domain = urlparse(link).netloc
+            confiavel = any(site in domain for site in SITES_CONFIAVEIS)
+            
+            resultados.append({
+                "titulo": title,
+                "snippet": snippet,
+                "link": link,
+                "confiavel": confiavel,
+                "domain": domain
+            })
+    
+    # Ordenar resultados: sites confiáveis primeiro
+    resultados.sort(key=lambda x: (not x["confiavel"]))
+    
+    return resultados
+
+
+# Função para buscar no Mercado Livre
+def buscar_mercado_livre(codigo_peca, timeout=10):
+    with medir("fonte", "mercado_livre") as trecho:
+        try:
+            url = f"https://lista.mercadolivre.com.br/{codigo_peca}"
+            response = baixar(url, timeout=timeout)
+            with medir("parse", "mercado_livre"):
+                resultados = extrair_resultados_mercado_livre(response.text, codigo_peca)
+            trecho.extras["itens"] = len(resultados)
+            return resultados
+        except Exception as e:
+            trecho.falhou(e)
+            return []
+
+
+# Função para extrair os anúncios de uma página de busca do Mercado Livre
+def extrair_resultados_mercado_livre(html, codigo_peca, backend=None):
+    documento = ler_html(html, backend, somente=SOMENTE_MERCADO_LIVRE)
+    
+    # Tentar extrair informações
+    resultados = []
+    items = documento.selecionar('.ui-search-result__content-wrapper')
+    
+    for item in items[:5]:  # Limitar a 5 resultados
+        try:
+            titulo_elem = item.selecionar_um('.ui-search-item__title')
+            preco_elem = item.selecionar_um('.price-tag-fraction')
+            link_elem = item.ancestral('a', 'ui-search-link')
+            
+            titulo = titulo_elem.texto if titulo_elem else "Não disponível"
+            preco = float(preco_elem.texto.replace('.', '').replace(',', '.')) if preco_elem else 0
+            link = link_elem.atributo('href') if link_elem else None
+            
+            # Verificar se o código está no título
+            relevancia = 5 if contem_codigo(titulo, codigo_peca) else 1
+            
+            resultados.append({
+                "titulo": titulo,
+                "preco": preco,
+                "link": link,
+                "relevancia": relevancia
+            })
+        except Exception as e:
+            continue
+    
+    # Ordenar por relevância
+    resultados.sort(key=lambda x: x["relevancia"], reverse=True)
+    
+    return resultados
+
+
+# Função para buscar na Shopee
+def buscar_shopee(codigo_peca, timeout=10):
+    with medir("fonte", "shopee") as trecho:
+        try:
+            url = f"https://shopee.com.br/search?keyword={codigo_peca}"
+            response = baixar(url, timeout=timeout)
+            with medir("parse", "shopee"):
+                resultados = extrair_resultados_shopee(response.text, codigo_peca)
+            trecho.extras["itens"] = len(resultados)
+            return resultados
+        except Exception as e:
+            trecho.falhou(e)
+            return []
+
+
+# Função para extrair os produtos de uma página de busca da Shopee
+def extrair_resultados_shopee(html, codigo_peca, backend=None):
+    documento = ler_html(html, backend, somente=SOMENTE_SHOPEE)
+    
+    # Tentar extrair informações
+    resultados = []
+    items = documento.selecionar('.shopee-search-item-result__item')
+    
+    for item in items[:5]:  # Limitar a 5 resultados
+        try:
+            titulo_elem = item.selecionar_um('.shopee-item-card__text-name')
+            preco_elem = item.selecionar_um('.shopee-item-card__current-price')
+            link_elem = item.selecionar_um('a')
+            
+            titulo = titulo_elem.texto if titulo_elem else "Não disponível"
+            
+            # Extrair preço (formato pode variar)
+            preco = 0
+            if preco_elem:
+                preco_text = preco_elem.texto.replace('R$', '').strip()
+                try:
+                    preco = float(preco_text.replace('.', '').replace(',', '.'))
+                except:
+                    pass
+            
+            # Construir link completo
+            link = None
+            if link_elem and link_elem.atributo('href'):
+                href = link_elem.atributo('href')
+                if href.startswith('/'):
+                    link = f"https://shopee.com.br{href}"
+                else:
+                    link = href
+            
+            # Verificar se o código está no título
+            relevancia = 5 if contem_codigo(titulo, codigo_peca) else 1
+            
+            resultados.append({
+                "titulo": titulo,
+                "preco": preco,
+                "link": link,
+                "relevancia": relevancia
+            })
+        except Exception as e:
+            continue
+    
+    # Ordenar por relevância
+    resultados.sort(key=lambda x: x["relevancia"], reverse=True)
+    
+    return resultados
+
+
+# Função para consultar Google, Mercado Livre e Shopee em paralelo
+def buscar_fontes_em_paralelo(codigo_peca, ao_concluir=None):
+    fontes = {
+        "google": (buscar_google, (f"{codigo_peca} peça automotiva nome exato", 20)),
+        "mercado_livre": (buscar_mercado_livre, (codigo_peca,)),
+        "shopee": (buscar_shopee, (codigo_peca,))
+    }
+    resultados = {nome: [] for nome in fontes}
+
+    # Fontes que vêm falhando ou voltando vazias ficam de fora até a espera do circuito terminar
+    saude = obter_saude()
+    for nome in list(fontes):
+        if not saude.permitir(f"fonte:{nome}"):
+            del fontes[nome]
+            with medir("fonte", nome) as trecho:
+                trecho.status = "circuito_aberto"
+            if ao_concluir:
+                ao_concluir(nome, resultados[nome])
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(fontes)))
+    inicio = time.monotonic()
+    futuros = {}
+    prazos = {}
+    cortadas_pela_busca = set()
+    # Nenhuma fonte espera além do prazo total da busca, se houver. Quando é ele que vence
+    # primeiro, a fonte não teve o tempo dela e o abandono não conta na saúde.
+    restante_busca = restante()
+    for nome, (funcao, argumentos) in fontes.items():
+        futuro = submeter(executor, funcao, *argumentos, timeout=PRAZOS_FONTES[nome])
+        futuros[futuro] = nome
+        prazo_fonte = PRAZOS_FONTES[nome]
+        if restante_busca is not None and restante_busca < prazo_fonte:
+            prazo_fonte = restante_busca
+            cortadas_pela_busca.add(futuro)
+        prazos[futuro] = inicio + prazo_fonte
+
+    pendentes = set(futuros)
+    try:
+        while pendentes:
+            # Abandonar fontes que estouraram o próprio prazo
+            agora = time.monotonic()
+            for futuro in [f for f in pendentes if prazos[f] <= agora]:
+                pendentes.discard(futuro)
+                futuro.cancel()
+                if futuro not in cortadas_pela_busca:
+                    saude.registrar(f"fonte:{futuros[futuro]}", False, duracao=agora - inicio)
+                with medir("fonte", futuros[futuro]) as trecho:
+                    trecho.status = "prazo_busca" if futuro in cortadas_pela_busca else "prazo_esgotado"
+                    trecho.extras["prazo_s"] = round(prazos[futuro] - inicio, 1)
+            if not pendentes:
+                break
+
+            # Aguardar a próxima fonte terminar (ou o próximo prazo vencer)
+            proximo_prazo = min(prazos[f] for f in pendentes)
+            concluidos, pendentes = wait(pendentes, timeout=proximo_prazo - agora, return_when=FIRST_COMPLETED)
+
+            for futuro in concluidos:
+                nome = futuros[futuro]
+                try:
+                    resultados[nome] = futuro.result()
+                except Exception as e:
+                    resultados[nome] = []
+                # Fonte sem nenhum resultado conta como falha (página de consentimento, captcha...),
+                # a não ser que tenha voltado vazia porque o prazo da busca acabou
+                if resultados[nome] or not esgotado():
+                    saude.registrar(f"fonte:{nome}", bool(resultados[nome]), itens=len(resultados[nome]),
+                                    duracao=time.monotonic() - inicio)
+                if ao_concluir:
+                    ao_concluir(nome, resultados[nome])
+    finally:
+        # Não esperar por fontes atrasadas
+        executor.shutdown(wait=False)
+
+    return resultados
@@ -0,0 +1,267 @@
+import base64
+import json
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Gravação e reprodução das trocas HTTP de uma busca, para testar o pipeline (e medir vazão)
+# sem internet e sempre com as mesmas respostas:
+#
+#   PROCAR_GRAVAR=fita.jsonl procar lookup 628117709R      (grava tudo o que for baixado)
+#   PROCAR_REPRODUZIR=fita.jsonl procar batch ...           (responde com a fita, sem rede)
+#   procar replay-server fita.jsonl --porta 8765 &
+#   PROCAR_REPRODUZIR=http://127.0.0.1:8765 procar batch ...   (responde pelo servidor local)
+#
+# PROCAR_LATENCIA_MS, PROCAR_VARIACAO_MS e PROCAR_TAXA_ERROS simulam a lentidão e as falhas
+# dos sites na reprodução dentro do processo.
+
+# Cabeçalhos que não valem para o corpo gravado (ele é guardado já descomprimido)
+CABECALHOS_DESCARTADOS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+# Troca HTTP gravada: a URL pedida e a resposta recebida
+class Troca:
+    def __init__(self, url, status, headers, conteudo, duracao_ms=None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.conteudo = conteudo
+        self.duracao_ms = duracao_ms
+
+    def para_json(self):
+        return json.dumps({
+            "url": self.url,
+            "status": self.status,
+            "headers": self.headers,
+            "conteudo": base64.b64encode(self.conteudo).decode("ascii"),
+            "duracao_ms": self.duracao_ms
+        }, ensure_ascii=False)
+
+    @classmethod
+    def de_json(cls, linha):
+        dados = json.loads(linha)
+        return cls(dados["url"], dados["status"], dados["headers"], base64.b64decode(dados["conteudo"]),
+                   dados.get("duracao_ms"))
+
+
+# Fita: arquivo JSONL com uma troca por linha. Na gravação, cada troca é acrescentada assim que
+# termina; na reprodução, vale a última troca gravada de cada URL.
+class Fita:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._trocas = {}
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    if not linha.strip():
+                        continue
+                    try:
+                        troca = Troca.de_json(linha)
+                    except (ValueError, KeyError):
+                        continue
+                    self._trocas[troca.url] = troca
+
+    def __len__(self):
+        return len(self._trocas)
+
+    def obter(self, url):
+        return self._trocas.get(url)
+
+    def gravar(self, troca):
+        linha = troca.para_json()
+        with self._lock:
+            self._trocas[troca.url] = troca
+            with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha + "\n")
+
+
+# Função para montar uma resposta do requests a partir de uma troca gravada
+def montar_resposta(troca, request, duracao=0.0):
+    response = Response()
+    response.status_code = troca.status
+    response.headers = CaseInsensitiveDict(troca.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = troca.conteudo
+    response._content_consumed = True
+    response.url = request.url
+    response.request = request
+    response.reason = "Recorded"
+    response.elapsed = timedelta(seconds=duracao)
+    return response
+
+
+# Adaptador que repassa os pedidos ao adaptador original e grava cada resposta na fita.
+# Respostas abertas com stream=True são gravadas quando procar.rede.ler_corpo termina de ler o
+# corpo (pelo gancho "ao_ler_corpo"): a fita fica com o mesmo corpo, cortado no mesmo limite de
+# bytes, que a busca usou, e o resto da página nem chega a ser baixado.
+class AdaptadorGravacao(BaseAdapter):
+    def __init__(self, adaptador, fita):
+        super().__init__()
+        self.adaptador = adaptador
+        self.fita = fita
+
+    def send(self, request, **kwargs):
+        inicio = time.perf_counter()
+        response = self.adaptador.send(request, **kwargs)
+        # 304 só faz sentido para quem tem a cópia antiga: não entra na fita
+        if response.status_code == 304:
+            return response
+        headers = {nome: valor for nome, valor in response.headers.items()
+                   if nome.lower() not in CABECALHOS_DESCARTADOS}
+
+        def gravar(response):
+            # Corpo cortado pelo prazo: na reprodução pareceria a página inteira
+            if getattr(response, "corte", None) == "prazo":
+                return
+            self.fita.gravar(Troca(request.url, response.status_code, headers, response.content,
+                                   round((time.perf_counter() - inicio) * 1000, 1)))
+
+        if kwargs.get("stream"):
+            response.ao_ler_corpo = gravar
+        else:
+            gravar(response)
+        return response
+
+    def close(self):
+        self.adaptador.close()
+
+
+# Falhas e lentidão simuladas na reprodução: latência fixa mais uma variação aleatória, e uma
+# fração dos pedidos que falha (status_erro, ou queda de conexão se status_erro for None)
+class Simulacao:
+    def __init__(self, latencia_ms=0, variacao_ms=0, taxa_erros=0.0, status_erro=503, semente=None):
+        self.latencia_ms = latencia_ms
+        self.variacao_ms = variacao_ms
+        self.taxa_erros = taxa_erros
+        self.status_erro = status_erro
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def do_ambiente(cls):
+        return cls(
+            latencia_ms=float(os.environ.get("PROCAR_LATENCIA_MS", 0)),
+            variacao_ms=float(os.environ.get("PROCAR_VARIACAO_MS", 0)),
+            taxa_erros=float(os.environ.get("PROCAR_TAXA_ERROS", 0))
+        )
+
+    # Esperar a latência simulada e sortear se este pedido falha; devolve a duração em segundos
+    def aplicar(self):
+        with self._lock:
+            espera = self.latencia_ms + self._aleatorio.uniform(0, self.variacao_ms)
+            falhar = self._aleatorio.random() < self.taxa_erros
+        if espera:
+            time.sleep(espera / 1000)
+        return espera / 1000, falhar
+
+
+# Adaptador que responde com a fita, sem ir à rede. URLs que não estão na fita recebem 404.
+class AdaptadorReproducao(BaseAdapter):
+    def __init__(self, fita, simulacao=None):
+        super().__init__()
+        self.fita = fita
+        self.simulacao = simulacao or Simulacao()
+
+    def send(self, request, **kwargs):
+        duracao, falhar = self.simulacao.aplicar()
+        if falhar:
+            if self.simulacao.status_erro is None:
+                raise ConnectionError(f"Falha simulada em {request.url}", request=request)
+            return montar_resposta(Troca(request.url, self.simulacao.status_erro, {}, b""), request, duracao)
+
+        troca = self.fita.obter(request.url) or Troca(request.url, 404, {}, b"")
+        return montar_resposta(troca, request, duracao)
+
+    def close(self):
+        pass
+
+
+# Adaptador que troca o servidor de destino pelo servidor de reprodução local, passando a URL
+# original como parâmetro; o pedido segue pelo adaptador original (pools, novas tentativas)
+class AdaptadorServidor(BaseAdapter):
+    def __init__(self, adaptador, endereco):
+        super().__init__()
+        self.adaptador = adaptador
+        self.endereco = endereco.rstrip("/")
+
+    def send(self, request, **kwargs):
+        url_original = request.url
+        request = request.copy()
+        request.url = f"{self.endereco}/?url={quote(url_original, safe='')}"
+        response = self.adaptador.send(request, **kwargs)
+        response.url = url_original
+        return response
+
+    def close(self):
+        self.adaptador.close()
+
+
+# Função para ligar a gravação ou a reprodução em uma sessão, de acordo com o ambiente
+# (PROCAR_GRAVAR / PROCAR_REPRODUZIR)
+def configurar_sessao(sessao):
+    if os.environ.get("PROCAR_REPRODUZIR"):
+        destino = os.environ["PROCAR_REPRODUZIR"]
+        if destino.startswith(("http://", "https://")):
+            for prefixo, adaptador in list(sessao.adapters.items()):
+                sessao.mount(prefixo, AdaptadorServidor(adaptador, destino))
+        else:
+            adaptador = AdaptadorReproducao(Fita(destino), Simulacao.do_ambiente())
+            for prefixo in list(sessao.adapters):
+                sessao.mount(prefixo, adaptador)
+    elif os.environ.get("PROCAR_GRAVAR"):
+        fita = Fita(os.environ["PROCAR_GRAVAR"])
+        for prefixo, adaptador in list(sessao.adapters.items()):
+            sessao.mount(prefixo, AdaptadorGravacao(adaptador, fita))
+    return sessao
+
+
+# Servidor HTTP local que faz o papel dos sites, respondendo com a fita
+class ServidorReproducao(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fita, simulacao=None, endereco=("127.0.0.1", 8765)):
+        self.fita = fita
+        self.simulacao = simulacao or Simulacao()
+        super().__init__(endereco, _TratadorReproducao)
+
+
+class _TratadorReproducao(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = parse_qs(urlparse(self.path).query).get("url", [""])[0]
+        _, falhar = self.server.simulacao.aplicar()
+        if falhar and self.server.simulacao.status_erro is None:
+            # Queda de conexão: fechar sem responder
+            self.close_connection = True
+            return
+
+        troca = self.server.fita.obter(url)
+        if falhar:
+            status, headers, conteudo = self.server.simulacao.status_erro, {}, b""
+        elif troca is None:
+            status, headers, conteudo = 404, {}, b""
+        else:
+            status, headers, conteudo = troca.status, troca.headers, troca.conteudo
+
+        self.send_response(status)
+        for nome, valor in headers.items():
+            if nome.lower() not in ("date", "server"):
+                self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def log_message(self, formato, *args):
+        pass
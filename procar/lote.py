@@ -0,0 +1,274 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from procar.agendador import PRIORIDADE_LOTE, prioridade
+from procar.codigos import COLUNAS_CODIGO, normalizar_codigo
+
+# Colunas do CSV de saída (na mesma ordem das informações exibidas na tela)
+COLUNAS_SAIDA = [
+    "codigo", "nome", "fabricante", "descricao", "compatibilidade",
+    "preco_novo_min", "preco_novo_med", "preco_usado_min", "preco_usado_med",
+    "preco_recond_min", "preco_recond_med",
+    "largura", "altura", "comprimento", "peso",
+    "ncm", "categoria_ml", "imagem_url", "fonte", "url_fonte", "campos_parciais", "motivo_parcial", "erro"
+]
+
+# Campos de depuração que não vão para o arquivo de saída
+CAMPOS_DEBUG = ("resultados_debug", "candidatos_nome")
+
+WORKERS_PADRAO = 4
+
+
+# Função para ler os códigos de um CSV (ou de um texto com um código por linha)
+def ler_codigos(conteudo):
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode("utf-8-sig", errors="replace")
+
+    linhas = [linha for linha in csv.reader(io.StringIO(conteudo)) if linha and linha[0].strip()]
+    if not linhas:
+        return []
+
+    # Usar a coluna de código se houver cabeçalho; senão, a primeira coluna
+    indice = 0
+    cabecalho = [coluna.strip().lower() for coluna in linhas[0]]
+    for nome in COLUNAS_CODIGO:
+        if nome in cabecalho:
+            indice = cabecalho.index(nome)
+            linhas = linhas[1:]
+            break
+
+    codigos = []
+    vistos = set()
+    for linha in linhas:
+        if indice >= len(linha):
+            continue
+        codigo = linha[indice].strip()
+        if codigo and normalizar_codigo(codigo) not in vistos:
+            vistos.add(normalizar_codigo(codigo))
+            codigos.append(codigo)
+    return codigos
+
+
+# Função para saber se uma peça já gravada precisa ser buscada de novo na retomada: só as que
+# deram erro ou que o prazo cortou. Parciais porque uma fonte não respondeu ficam como estão (se
+# não, seriam refeitas a cada retomada); linhas antigas, sem o motivo, eram sempre do prazo.
+def refazer_na_retomada(parcial, motivo_parcial, erro):
+    return bool(erro) or (bool(parcial) and motivo_parcial in (None, "", "prazo"))
+
+
+# Função para transformar o resultado de uma peça em registro de saída
+def montar_registro(codigo_peca, info_peca=None, erro=None):
+    registro = {"codigo": codigo_peca}
+    if info_peca:
+        registro.update({chave: valor for chave, valor in info_peca.items() if chave not in CAMPOS_DEBUG})
+    registro["erro"] = erro
+    return registro
+
+
+# Função para achatar um registro em uma linha de CSV
+def registro_para_linha_csv(registro):
+    dimensoes = registro.get("dimensoes") or {}
+    linha = {}
+    for coluna in COLUNAS_SAIDA:
+        if coluna in ("largura", "altura", "comprimento", "peso"):
+            valor = dimensoes.get(coluna)
+        elif coluna == "compatibilidade":
+            valor = " | ".join(registro.get("compatibilidade") or [])
+        elif coluna == "campos_parciais":
+            completude = registro.get("completude") or {}
+            valor = " | ".join(campo for campo, situacao in completude.items() if situacao == "parcial")
+        else:
+            valor = registro.get(coluna)
+        if isinstance(valor, str):
+            valor = valor.replace("\r", " ").replace("\n", " ")
+        linha[coluna] = "" if valor is None else valor
+    return linha
+
+
+# Arquivo de saída que também serve de checkpoint: cada linha é uma peça concluída
+class SaidaLote:
+    def __init__(self, caminho, formato=None):
+        self.caminho = caminho
+        self.formato = formato or ("csv" if caminho.lower().endswith(".csv") else "jsonl")
+        self.concluidos = self._recuperar()
+
+        existe = os.path.exists(caminho) and os.path.getsize(caminho) > 0
+        self._arquivo = open(caminho, "a", encoding="utf-8", newline="")
+        self._escritor_csv = None
+        if self.formato == "csv":
+            self._escritor_csv = csv.DictWriter(self._arquivo, fieldnames=COLUNAS_SAIDA)
+            if not existe:
+                self._escritor_csv.writeheader()
+                self._arquivo.flush()
+
+    # Ler os códigos já gravados, descartando uma última linha incompleta. As peças cortadas pelo
+    # prazo ou com erro (veja refazer_na_retomada) saem do arquivo e são buscadas de novo; um CSV
+    # com as colunas de uma versão anterior é regravado com as colunas atuais.
+    def _recuperar(self):
+        if not os.path.exists(self.caminho):
+            return set()
+
+        with open(self.caminho, "rb+") as arquivo:
+            dados = arquivo.read()
+            fim = dados.rfind(b"\n") + 1
+            if fim < len(dados):
+                arquivo.truncate(fim)
+                dados = dados[:fim]
+
+        texto = dados.decode("utf-8", errors="replace")
+        concluidos = set()
+        refazer = 0
+        if self.formato == "csv":
+            leitor = csv.DictReader(io.StringIO(texto))
+            linhas = []
+            for linha in leitor:
+                if not linha.get("codigo"):
+                    continue
+                if refazer_na_retomada(linha.get("campos_parciais"), linha.get("motivo_parcial"), linha.get("erro")):
+                    refazer += 1
+                    continue
+                linhas.append(linha)
+                concluidos.add(normalizar_codigo(linha["codigo"]))
+            if refazer or (leitor.fieldnames and leitor.fieldnames != COLUNAS_SAIDA):
+                saida = io.StringIO()
+                escritor = csv.DictWriter(saida, fieldnames=COLUNAS_SAIDA, extrasaction="ignore")
+                escritor.writeheader()
+                escritor.writerows(linhas)
+                self._reescrever(saida.getvalue())
+        else:
+            linhas = []
+            for linha in texto.splitlines():
+                try:
+                    registro = json.loads(linha)
+                    codigo = normalizar_codigo(registro["codigo"])
+                except (ValueError, KeyError, AttributeError, TypeError):
+                    continue
+                if refazer_na_retomada(registro.get("parcial"), registro.get("motivo_parcial"), registro.get("erro")):
+                    refazer += 1
+                    continue
+                linhas.append(linha)
+                concluidos.add(codigo)
+            if refazer:
+                self._reescrever("".join(linha + "\n" for linha in linhas))
+        return concluidos
+
+    # Trocar o conteúdo do arquivo de saída de uma vez (arquivo temporário + rename)
+    def _reescrever(self, texto):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8", newline="") as arquivo:
+            arquivo.write(texto)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho)
+
+    def gravar(self, registro):
+        if self._escritor_csv:
+            self._escritor_csv.writerow(registro_para_linha_csv(registro))
+        else:
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self.concluidos.add(normalizar_codigo(registro["codigo"]))
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+# Andamento de um lote: vazão e tempo restante estimado
+class EstatisticasLote:
+    def __init__(self, total, ja_concluidos=0):
+        self.total = total
+        self.ja_concluidos = ja_concluidos
+        self.processados = 0
+        self.falhas = 0
+        self.inicio = time.monotonic()
+
+    @property
+    def concluidos(self):
+        return self.ja_concluidos + self.processados
+
+    @property
+    def decorrido(self):
+        return time.monotonic() - self.inicio
+
+    # Peças por segundo nesta execução (sem contar as retomadas do checkpoint)
+    @property
+    def vazao(self):
+        return self.processados / self.decorrido if self.decorrido > 0 else 0.0
+
+    # Segundos restantes estimados
+    @property
+    def eta(self):
+        if not self.vazao:
+            return None
+        return (self.total - self.concluidos) / self.vazao
+
+
+# Função que busca um código do lote com a prioridade de lote (atrás das buscas da tela)
+def _buscar_em_lote(buscar, codigo):
+    with prioridade(PRIORIDADE_LOTE):
+        return buscar(codigo)
+
+
+# Função para processar um lote de códigos com um pool de workers
+def processar_lote(codigos, buscar, caminho_saida, formato=None, workers=WORKERS_PADRAO,
+                   ao_progresso=None, parar=None):
+    saida = SaidaLote(caminho_saida, formato)
+    pendentes = [codigo for codigo in codigos if normalizar_codigo(codigo) not in saida.concluidos]
+    estatisticas = EstatisticasLote(len(codigos), len(codigos) - len(pendentes))
+    parar = parar or threading.Event()
+
+    if ao_progresso:
+        ao_progresso(estatisticas)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    fila = iter(pendentes)
+    futuros = {}
+    try:
+        while True:
+            # Manter no máximo 2 tarefas por worker em andamento
+            while not parar.is_set() and len(futuros) < workers * 2:
+                codigo = next(fila, None)
+                if codigo is None:
+                    break
+                futuros[executor.submit(_buscar_em_lote, buscar, codigo)] = codigo
+
+            if not futuros:
+                break
+
+            concluidos, _ = wait(list(futuros), return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                codigo = futuros.pop(futuro)
+                try:
+                    registro = montar_registro(codigo, futuro.result())
+                except Exception as e:
+                    registro = montar_registro(codigo, erro=f"{type(e).__name__}: {e}")
+                    estatisticas.falhas += 1
+                saida.gravar(registro)
+                estatisticas.processados += 1
+                if ao_progresso:
+                    ao_progresso(estatisticas)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        saida.fechar()
+
+    return estatisticas
+
+
+# Função para formatar segundos como "1h02m03s"
+def formatar_duracao(segundos):
+    if segundos is None:
+        return "--"
+    segundos = int(segundos)
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    if horas:
+        return f"{horas}h{minutos:02d}m{segundos:02d}s"
+    if minutos:
+        return f"{minutos}m{segundos:02d}s"
+    return f"{segundos}s"
@@ -0,0 +1,211 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from procar.config import caminho_dados
+
+# Cada busca concluída vira uma linha JSON neste arquivo (PROCAR_METRICAS=0 desliga a gravação)
+ARQUIVO_METRICAS = "metricas.jsonl"
+GRAVAR_METRICAS = os.environ.get("PROCAR_METRICAS", "1") != "0"
+
+# Quantidade de rastreamentos recentes mantidos na memória do processo
+RASTREAMENTOS_RECENTES = 200
+
+# Rastreamento da busca em andamento na thread (ou na tarefa) atual
+_rastreamento_atual = contextvars.ContextVar("rastreamento_atual", default=None)
+
+
+# Trecho medido de uma busca: uma fonte, um download, um parsing, a consolidação...
+class Trecho:
+    def __init__(self, rastreamento, tipo, nome):
+        self.rastreamento = rastreamento
+        self.tipo = tipo
+        self.nome = nome
+        self.inicio = time.perf_counter()
+        self.duracao = None
+        self.status = "ok"
+        self.bytes = 0
+        self.http_status = None
+        self.erro = None
+        self.extras = {}
+
+    # Registrar uma exceção (mesmo que ela seja engolida pelo chamador)
+    def falhou(self, erro, status="erro"):
+        self.status = status
+        self.erro = type(erro).__name__
+
+    def para_dict(self):
+        registro = {
+            "tipo": self.tipo,
+            "nome": self.nome,
+            "inicio_ms": round((self.inicio - self.rastreamento.inicio) * 1000, 1),
+            "duracao_ms": round(self.duracao * 1000, 1) if self.duracao is not None else None,
+            "status": self.status,
+            "bytes": self.bytes,
+            "http_status": self.http_status,
+            "erro": self.erro
+        }
+        registro.update(self.extras)
+        return registro
+
+
+# Trecho que não mede nada, usado quando não há busca sendo rastreada
+class _TrechoNulo:
+    def falhou(self, erro, status="erro"):
+        pass
+
+    def __setattr__(self, nome, valor):
+        pass
+
+    @property
+    def extras(self):
+        return {}
+
+
+# Rastreamento de uma busca: todos os trechos medidos, de todas as threads
+class Rastreamento:
+    def __init__(self, nome, **atributos):
+        self.nome = nome
+        self.atributos = atributos
+        self.criado_em = time.time()
+        self.inicio = time.perf_counter()
+        self.duracao = None
+        self.trechos = []
+        self._lock = threading.Lock()
+
+    def adicionar(self, trecho):
+        with self._lock:
+            if self.duracao is None:
+                self.trechos.append(trecho)
+
+    def para_dict(self):
+        with self._lock:
+            trechos = [trecho.para_dict() for trecho in self.trechos]
+        return {
+            "nome": self.nome,
+            **self.atributos,
+            "criado_em": self.criado_em,
+            "duracao_ms": round(self.duracao * 1000, 1) if self.duracao is not None else None,
+            "trechos": sorted(trechos, key=lambda trecho: trecho["inicio_ms"])
+        }
+
+
+_recentes = deque(maxlen=RASTREAMENTOS_RECENTES)
+_lock_arquivo = threading.Lock()
+
+
+# Rastrear uma busca: os trechos medidos dentro do bloco (inclusive em outras threads, se as
+# tarefas forem enviadas com submeter) ficam neste rastreamento. Se já houver um rastreamento
+# ativo, o bloco só o reaproveita.
+@contextmanager
+def rastrear(nome, **atributos):
+    atual = _rastreamento_atual.get()
+    if atual is not None:
+        yield atual
+        return
+
+    rastreamento = Rastreamento(nome, **atributos)
+    marcador = _rastreamento_atual.set(rastreamento)
+    try:
+        yield rastreamento
+    finally:
+        _rastreamento_atual.reset(marcador)
+        rastreamento.duracao = time.perf_counter() - rastreamento.inicio
+        _recentes.append(rastreamento)
+        if GRAVAR_METRICAS:
+            _gravar(rastreamento)
+
+
+# Medir um trecho da busca atual. Exceções que escapam do bloco são registradas e repassadas.
+@contextmanager
+def medir(tipo, nome):
+    rastreamento = _rastreamento_atual.get()
+    if rastreamento is None:
+        yield _TrechoNulo()
+        return
+
+    trecho = Trecho(rastreamento, tipo, nome)
+    try:
+        yield trecho
+    except BaseException as e:
+        trecho.falhou(e)
+        raise
+    finally:
+        trecho.duracao = time.perf_counter() - trecho.inicio
+        rastreamento.adicionar(trecho)
+
+
+# Função para enviar uma tarefa a um executor levando junto o rastreamento atual
+def submeter(executor, funcao, *args, **kwargs):
+    return executor.submit(contextvars.copy_context().run, funcao, *args, **kwargs)
+
+
+# Função para acrescentar um rastreamento ao arquivo de métricas
+def _gravar(rastreamento):
+    try:
+        linha = json.dumps(rastreamento.para_dict(), ensure_ascii=False)
+        with _lock_arquivo, open(caminho_dados(ARQUIVO_METRICAS), "a", encoding="utf-8") as arquivo:
+            arquivo.write(linha + "\n")
+    except OSError:
+        pass
+
+
+# Função para listar os rastreamentos mais recentes do processo (do mais antigo ao mais novo)
+def rastreamentos_recentes():
+    return [rastreamento.para_dict() for rastreamento in list(_recentes)]
+
+
+# Função para resumir rastreamentos por tipo e nome de trecho: quantidade, status, erros, bytes e
+# percentis de duração
+def resumir(rastreamentos):
+    grupos = {}
+    for rastreamento in rastreamentos:
+        for trecho in rastreamento["trechos"]:
+            grupo = grupos.setdefault(f"{trecho['tipo']}:{trecho['nome']}",
+                                      {"duracoes": [], "status": {}, "erros": {}, "bytes": 0})
+            if trecho["duracao_ms"] is not None:
+                grupo["duracoes"].append(trecho["duracao_ms"])
+            grupo["status"][trecho["status"]] = grupo["status"].get(trecho["status"], 0) + 1
+            if trecho["erro"]:
+                grupo["erros"][trecho["erro"]] = grupo["erros"].get(trecho["erro"], 0) + 1
+            grupo["bytes"] += trecho["bytes"] or 0
+
+    resumo = {}
+    for chave, grupo in sorted(grupos.items()):
+        duracoes = sorted(grupo["duracoes"])
+
+        def percentil(fracao):
+            if not duracoes:
+                return None
+            return duracoes[min(len(duracoes) - 1, int(fracao * len(duracoes)))]
+
+        resumo[chave] = {
+            "quantidade": len(duracoes),
+            "status": grupo["status"],
+            "erros": grupo["erros"],
+            "bytes": grupo["bytes"],
+            "p50_ms": percentil(0.5),
+            "p90_ms": percentil(0.9),
+            "p99_ms": percentil(0.99),
+            "max_ms": duracoes[-1] if duracoes else None
+        }
+    return resumo
+
+
+# Função para ler os rastreamentos gravados no arquivo de métricas
+def ler_metricas(caminho=None):
+    caminho = caminho or caminho_dados(ARQUIVO_METRICAS)
+    if not os.path.exists(caminho):
+        return []
+    rastreamentos = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                rastreamentos.append(json.loads(linha))
+            except ValueError:
+                continue
+    return rastreamentos
@@ -0,0 +1,258 @@
+import re
+from bisect import bisect_left
+
+from procar.codigos import contem_codigo, padrao_codigo
+from procar.parser_html import percorrer
+
+# Elementos HTML que não têm fechamento
+ELEMENTOS_VAZIOS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer"
+}
+
+# Elementos cujo conteúdo não conta como texto visível (e nem como preço: um "R$" solto em um
+# script costuma ser de outro produto; o preço declarado nos scripts vem de procar.estruturados)
+ELEMENTOS_OCULTOS = {"script", "style"}
+
+# Elementos de tabela, que fora de uma <table> não existem: o selectolax (como os navegadores)
+# descarta a tag e deixa o texto no elemento de fora, e os outros backends fazem o mesmo aqui
+ELEMENTOS_TABELA = {"caption", "col", "colgroup", "tbody", "td", "tfoot", "th", "thead", "tr"}
+
+# Elementos analisados por cada campo
+TAGS_TEXTO_RELEVANTE = {"h1", "h2", "h3", "p", "li", "td"}
+TAGS_COMPATIBILIDADE = {"li", "p", "div"}
+TAGS_DIMENSOES = {"li", "p", "div", "td"}
+TAGS_ANALISADAS = TAGS_TEXTO_RELEVANTE | TAGS_COMPATIBILIDADE | TAGS_DIMENSOES
+
+# Campos devolvidos pela leitura de uma página de detalhe
+CAMPOS_PAGINA = ("titulo", "descricao", "texto_relevante", "preco", "compatibilidade", "dimensoes", "imagem_url")
+
+PALAVRAS_COMPATIBILIDADE = ["compatível", "compatibilidade", "aplicação", "serve para"]
+PALAVRAS_DIMENSOES = ["dimensão", "dimensões", "medida", "medidas", "peso"]
+
+REGEX_PRECO = re.compile(r'R\$\s*(\d+[,.]\d+)')
+REGEX_DIMENSOES = {
+    "largura": re.compile(r'largura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)'),
+    "altura": re.compile(r'altura[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)'),
+    "comprimento": re.compile(r'(?:comprimento|profundidade)[:\s]*(\d+(?:[,.]\d+)?)\s*(?:cm|mm|m)'),
+    "peso": re.compile(r'peso[:\s]*(\d+(?:[,.]\d+)?)\s*(kg|g)')
+}
+
+
+# Função para listar as posições de cada palavra em um texto
+def ocorrencias(texto, palavras):
+    posicoes = {}
+    for palavra in palavras:
+        if not palavra:
+            continue
+        inicios = []
+        posicao = texto.find(palavra)
+        while posicao != -1:
+            inicios.append(posicao)
+            posicao = texto.find(palavra, posicao + 1)
+        posicoes[palavra] = inicios
+    return posicoes
+
+
+# Função para saber se alguma palavra ocorre inteira dentro do trecho [inicio, fim)
+def contem(posicoes, inicio, fim):
+    for palavra, inicios in posicoes.items():
+        indice = bisect_left(inicios, inicio)
+        if indice < len(inicios) and inicios[indice] + len(palavra) <= fim:
+            return True
+    return False
+
+
+# Coletor de uma página em uma única passada.
+# Recebe eventos (abertura, fechamento, texto) e guarda o texto visível em um único buffer;
+# cada elemento analisado vira só um intervalo [inicio, fim) nesse buffer. Assim o texto de um
+# elemento nunca é remontado a partir dos descendentes, o que custava tempo quadrático em
+# páginas muito aninhadas.
+# "campos" limita o trabalho aos campos pedidos (os demais voltam vazios).
+class ColetorPagina:
+    def __init__(self, codigo_peca, campos=None):
+        self.campos = set(CAMPOS_PAGINA if campos is None else campos)
+        self.codigo_peca = codigo_peca
+        self._regex_codigo = re.compile(padrao_codigo(codigo_peca), re.IGNORECASE)
+        self._partes = []
+        self._partes_lower = []
+        self._tamanho = 0
+        self._tamanho_lower = 0
+        self._pilha = []  # [nome, ordem, inicio, inicio_lower]
+        self._ordem = 0
+        self._elementos = []  # (ordem, nome, inicio, fim, inicio_lower, fim_lower)
+        self._no_texto = []
+        self._titulo = None
+        self.descricao = None
+        self.imagem_url = None
+        self.preco = None
+        # Campos não pedidos já contam como vistos para basta()
+        self._compatibilidade_vista = "compatibilidade" not in self.campos
+        self._dimensoes_vistas = set() if "dimensoes" in self.campos else set(REGEX_DIMENSOES)
+
+    # Abertura de um elemento
+    def iniciar(self, nome, atributos):
+        self._fechar_no_texto()
+
+        if nome == "meta" and self.descricao is None and atributos.get("name") == "description":
+            self.descricao = atributos.get("content") or ""
+        elif nome == "img" and self.imagem_url is None and "imagem_url" in self.campos:
+            src = atributos.get("src") or ""
+            alt = atributos.get("alt") or ""
+            if src and (contem_codigo(src, self.codigo_peca) or contem_codigo(alt, self.codigo_peca)):
+                self.imagem_url = src
+
+        if nome in ELEMENTOS_VAZIOS:
+            return
+        if nome in ELEMENTOS_TABELA and not any(aberto[0] == "table" for aberto in self._pilha):
+            return
+
+        self._pilha.append([nome, self._ordem, self._tamanho, self._tamanho_lower])
+        self._ordem += 1
+
+    # Fechamento de um elemento (fecha também os filhos que ficaram abertos)
+    def fechar(self, nome):
+        self._fechar_no_texto()
+
+        for indice in range(len(self._pilha) - 1, -1, -1):
+            if self._pilha[indice][0] == nome:
+                break
+        else:
+            return
+
+        while len(self._pilha) > indice:
+            self._registrar(self._pilha.pop())
+
+    # Texto visível
+    def texto(self, dados):
+        if self._pilha and self._pilha[-1][0] in ELEMENTOS_OCULTOS:
+            return
+        self._partes.append(dados)
+        self._partes_lower.append(dados.lower())
+        self._tamanho += len(dados)
+        self._tamanho_lower += len(self._partes_lower[-1])
+        self._no_texto.append(dados)
+        if not self._compatibilidade_vista or len(self._dimensoes_vistas) < len(REGEX_DIMENSOES):
+            self._acompanhar(self._partes_lower[-1])
+
+    # Anotar, texto a texto, se a compatibilidade e cada medida já apareceram (só para basta())
+    def _acompanhar(self, texto_lower):
+        if not self._compatibilidade_vista:
+            self._compatibilidade_vista = any(palavra in texto_lower for palavra in PALAVRAS_COMPATIBILIDADE)
+        for chave, regex in REGEX_DIMENSOES.items():
+            if chave not in self._dimensoes_vistas and regex.search(texto_lower):
+                self._dimensoes_vistas.add(chave)
+
+    # Saber se tudo o que foi pedido já apareceu (título, descrição, preço, imagem, compatibilidade
+    # e as quatro medidas): o resto da página pode ser ignorado. O texto relevante não segura a
+    # leitura: ele fica com o que foi lido até ali.
+    def basta(self):
+        vistos = {
+            "titulo": self._titulo is not None,
+            "descricao": self.descricao is not None,
+            "preco": self.preco is not None,
+            "imagem_url": self.imagem_url is not None,
+            "compatibilidade": self._compatibilidade_vista,
+            "dimensoes": len(self._dimensoes_vistas) == len(REGEX_DIMENSOES)
+        }
+        return all(vistos.get(campo, True) for campo in self.campos)
+
+    # Texto que não aparece na página (comentários): só serve para o preço
+    def texto_oculto(self, dados):
+        self._no_texto.append(dados)
+
+    def _fechar_no_texto(self):
+        if not self._no_texto:
+            return
+        if self.preco is None and "preco" in self.campos:
+            match = REGEX_PRECO.search("".join(self._no_texto))
+            if match:
+                try:
+                    self.preco = float(match.group(1).replace('.', '').replace(',', '.'))
+                except ValueError:
+                    pass
+        self._no_texto = []
+
+    def _registrar(self, aberto):
+        nome, ordem, inicio, inicio_lower = aberto
+        if nome == "title" and self._titulo is None:
+            self._titulo = (inicio, self._tamanho)
+        if nome in TAGS_ANALISADAS:
+            self._elementos.append((ordem, nome, inicio, self._tamanho, inicio_lower, self._tamanho_lower))
+
+    # Montar o resultado no mesmo formato de extrair_informacoes_site
+    def resultado(self):
+        self._fechar_no_texto()
+        while self._pilha:
+            self._registrar(self._pilha.pop())
+        self._elementos.sort()
+
+        texto = "".join(self._partes)
+        texto_lower = "".join(self._partes_lower)
+
+        titulo = texto[self._titulo[0]:self._titulo[1]] if self._titulo else ""
+
+        # Texto relevante: elementos que contêm o código da peça
+        texto_relevante = ""
+        if "texto_relevante" in self.campos:
+            # O código pode aparecer com qualquer formatação ("628117709 R"); cada grafia vira uma "palavra".
+            # Aqui ele não precisa estar separado do resto (regex_codigo_inteiro): no buffer, o texto de
+            # elementos vizinhos fica colado ("Ref</td><td>628117709R" vira "Ref628117709R").
+            posicoes_codigo = {}
+            for match in self._regex_codigo.finditer(texto_lower):
+                posicoes_codigo.setdefault(match.group(), []).append(match.start())
+            for ordem, nome, inicio, fim, inicio_lower, fim_lower in self._elementos:
+                if nome in TAGS_TEXTO_RELEVANTE and contem(posicoes_codigo, inicio_lower, fim_lower):
+                    texto_relevante += texto[inicio:fim].strip() + " "
+
+        # Compatibilidade
+        compatibilidade = []
+        if "compatibilidade" in self.campos:
+            posicoes_compatibilidade = ocorrencias(texto_lower, PALAVRAS_COMPATIBILIDADE)
+            compatibilidade = [
+                texto[inicio:fim].strip()
+                for ordem, nome, inicio, fim, inicio_lower, fim_lower in self._elementos
+                if nome in TAGS_COMPATIBILIDADE and contem(posicoes_compatibilidade, inicio_lower, fim_lower)
+            ]
+
+        # Dimensões: vale o último elemento (na ordem do documento) que traz cada medida
+        candidatos = []
+        if "dimensoes" in self.campos:
+            posicoes_dimensoes = ocorrencias(texto_lower, PALAVRAS_DIMENSOES)
+            candidatos = [
+                (inicio_lower, fim_lower)
+                for ordem, nome, inicio, fim, inicio_lower, fim_lower in self._elementos
+                if nome in TAGS_DIMENSOES and contem(posicoes_dimensoes, inicio_lower, fim_lower)
+            ]
+        dimensoes = {}
+        for chave, regex in REGEX_DIMENSOES.items():
+            for inicio_lower, fim_lower in reversed(candidatos):
+                match = regex.search(texto_lower, inicio_lower, fim_lower)
+                if not match:
+                    continue
+                valor = float(match.group(1).replace(',', '.'))
+                if chave == "peso" and match.group(2) == "g":
+                    valor = valor / 1000  # Converter de g para kg
+                dimensoes[chave] = valor
+                break
+
+        return {
+            "titulo": titulo,
+            "descricao": self.descricao or "",
+            "texto_relevante": texto_relevante,
+            "preco": self.preco,
+            "compatibilidade": compatibilidade,
+            "dimensoes": dimensoes,
+            "imagem_url": self.imagem_url
+        }
+
+
+# Função para extrair título, descrição, preço, compatibilidade, dimensões e imagem em uma passada.
+# Com "ate_bastar", a leitura para assim que tudo o que a consolidação usa tiver aparecido (as
+# medidas passam a valer as do trecho lido, e não as do fim da página); "campos" limita a leitura
+# aos campos que ainda faltam.
+def analisar_pagina(html, codigo_peca, backend=None, ate_bastar=False, campos=None):
+    coletor = ColetorPagina(codigo_peca, campos)
+    percorrer(html, coletor, backend, parar=coletor.basta if ate_bastar else None)
+    return coletor.resultado()
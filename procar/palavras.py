@@ -0,0 +1,95 @@
+import re
+from bisect import bisect_left
+
+# Separador usado para analisar vários textos de uma vez (não aparece em nenhuma palavra-chave)
+SEPARADOR = "\x00"
+
+
+# Função para montar uma regex em forma de árvore de prefixos (trie).
+# Em cada posição do texto ela casa a palavra-chave mais longa que começa ali, testando
+# cada caractere uma única vez em vez de tentar as palavras uma a uma.
+def _regex_trie(palavras):
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for caractere in palavra:
+            no = no.setdefault(caractere, {})
+        no[""] = True
+
+    def montar(no):
+        ramos = [re.escape(caractere) + montar(filho) for caractere, filho in sorted(no.items()) if caractere]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        return "(?:" + corpo + ")?" if "" in no else corpo
+
+    # O lookahead permite achar ocorrências sobrepostas ("disco" dentro de "disco de embreagem")
+    return re.compile("(?=(" + montar(trie) + "))")
+
+
+# Buscador de várias tabelas de palavras-chave em uma única varredura do texto.
+# Cada tabela é uma lista ordenada de (palavra, valor); a ordem define a prioridade,
+# exatamente como nos laços "for ... if palavra in texto" que ele substitui.
+class BuscadorPalavras:
+    def __init__(self, tabelas):
+        self.tabelas = list(tabelas)
+        acertos_por_palavra = {}
+        for tabela, entradas in tabelas.items():
+            for prioridade, (palavra, valor) in enumerate(entradas):
+                acertos_por_palavra.setdefault(palavra.lower(), []).append((tabela, prioridade, valor))
+        palavras = list(acertos_por_palavra)
+
+        # A regex devolve só a palavra mais longa em cada posição; as palavras que são
+        # prefixo dela também ocorrem ali, então entram junto
+        self._acertos = {
+            palavra: [acerto for outra in palavras if palavra.startswith(outra) for acerto in acertos_por_palavra[outra]]
+            for palavra in palavras
+        }
+        # Só o acerto de maior prioridade de cada tabela, para quem quer apenas o primeiro
+        self._melhores = {}
+        for palavra, acertos in self._acertos.items():
+            melhores = {}
+            for tabela, prioridade, valor in acertos:
+                if tabela not in melhores or prioridade < melhores[tabela][0]:
+                    melhores[tabela] = (prioridade, valor)
+            self._melhores[palavra] = [(tabela, prioridade, valor) for tabela, (prioridade, valor) in melhores.items()]
+        self._regex = _regex_trie(palavras)
+
+    # Todas as ocorrências no texto: {tabela: [valores em ordem de prioridade]}
+    def buscar(self, texto):
+        encontrados = {}
+        for match in self._regex.finditer(texto.lower()):
+            for tabela, prioridade, valor in self._acertos[match.group(1)]:
+                encontrados.setdefault(tabela, {})[prioridade] = valor
+        return {tabela: [valores[prioridade] for prioridade in sorted(valores)] for tabela, valores in encontrados.items()}
+
+    # Primeiro valor (o de maior prioridade) de cada tabela
+    def primeiros(self, texto):
+        return self.primeiros_varios([texto])[0]
+
+    # Versão em lote de primeiros(): todos os textos em uma única varredura
+    def primeiros_varios(self, textos):
+        # lower() pode mudar o tamanho do texto ("İ"), então as posições vêm do texto já convertido
+        textos = [texto.lower() for texto in textos]
+        fins = []
+        posicao = 0
+        for texto in textos:
+            posicao += len(texto)
+            fins.append(posicao)
+            posicao += len(SEPARADOR)
+
+        melhores_por_texto = [{} for _ in textos]
+        fim = -1
+        melhores = None
+        for match in self._regex.finditer(SEPARADOR.join(textos)):
+            # As ocorrências vêm em ordem, então só se procura o texto quando ele muda
+            if match.start() > fim:
+                indice = bisect_left(fins, match.start())
+                fim = fins[indice]
+                melhores = melhores_por_texto[indice]
+            for tabela, prioridade, valor in self._melhores[match.group(1)]:
+                atual = melhores.get(tabela)
+                if atual is None or prioridade < atual[0]:
+                    melhores[tabela] = (prioridade, valor)
+
+        return [{tabela: valor for tabela, (prioridade, valor) in melhores.items()} for melhores in melhores_por_texto]
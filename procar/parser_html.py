@@ -0,0 +1,221 @@
+import os
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Backends de parsing disponíveis, do mais rápido para o mais lento.
+# "selectolax" (lexbor, em C) e "lxml" (libxml2) são opcionais; "html.parser" é da biblioteca padrão.
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+# Tamanho (em caracteres) dos pedaços entregues aos parsers incrementais, e nós da árvore do
+# selectolax percorridos, entre uma consulta e outra a "parar()"
+TAMANHO_PEDACO = 32 * 1024
+NOS_POR_CONSULTA = 1000
+
+
+# Função para listar os backends instalados
+def backends_disponiveis():
+    disponiveis = []
+    if LexborHTMLParser is not None:
+        disponiveis.append("selectolax")
+    if etree is not None:
+        disponiveis.append("lxml")
+    disponiveis.append("html.parser")
+    return disponiveis
+
+
+# Função para escolher o backend: PROCAR_PARSER, se instalado, ou o mais rápido disponível
+def escolher_backend(backend=None):
+    backend = backend or os.environ.get("PROCAR_PARSER")
+    disponiveis = backends_disponiveis()
+    if backend in disponiveis:
+        return backend
+    return disponiveis[0]
+
+
+# Nó de documento lido com BeautifulSoup (html.parser ou lxml)
+class NoSoup:
+    def __init__(self, tag):
+        self._tag = tag
+
+    def selecionar(self, css):
+        return [NoSoup(tag) for tag in self._tag.select(css)]
+
+    def selecionar_um(self, css):
+        tag = self._tag.select_one(css)
+        return NoSoup(tag) if tag is not None else None
+
+    @property
+    def texto(self):
+        return self._tag.text
+
+    def atributo(self, nome, padrao=None):
+        return self._tag.get(nome, padrao)
+
+    def ancestral(self, nome, classe):
+        tag = self._tag.find_parent(nome, class_=classe)
+        return NoSoup(tag) if tag is not None else None
+
+
+# Nó de documento lido com selectolax (lexbor)
+class NoSelectolax:
+    def __init__(self, no):
+        self._no = no
+
+    def selecionar(self, css):
+        return [NoSelectolax(no) for no in self._no.css(css)]
+
+    def selecionar_um(self, css):
+        no = self._no.css_first(css)
+        return NoSelectolax(no) if no is not None else None
+
+    @property
+    def texto(self):
+        return self._no.text()
+
+    def atributo(self, nome, padrao=None):
+        valor = self._no.attributes.get(nome)
+        return padrao if valor is None else valor
+
+    def ancestral(self, nome, classe):
+        no = self._no.parent
+        while no is not None:
+            if no.tag == nome and classe in (no.attributes.get("class") or "").split():
+                return NoSelectolax(no)
+            no = no.parent
+        return None
+
+
+# Função para montar o filtro de parsing parcial: só ficam na árvore os elementos
+# (e seus descendentes) que casam com algum par (tag, classe) de "somente"
+def criar_filtro(somente):
+    def casa(nome, atributos):
+        classes = atributos.get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        return any((tag is None or tag == nome) and classe in classes for tag, classe in somente)
+    return SoupStrainer(casa)
+
+
+# Função para ler um HTML com o backend escolhido.
+# "somente" permite ler só as partes da página que interessam (ignorado pelo selectolax,
+# que já lê a página inteira mais rápido do que os outros leem só um pedaço).
+def ler_html(html, backend=None, somente=None):
+    backend = escolher_backend(backend)
+    if backend == "selectolax":
+        return NoSelectolax(LexborHTMLParser(html).root)
+
+    filtro = criar_filtro(somente) if somente else None
+    return NoSoup(BeautifulSoup(html, "lxml" if backend == "lxml" else "html.parser", parse_only=filtro))
+
+
+# Parser da biblioteca padrão que repassa os eventos a um coletor
+class ParserColetor(HTMLParser):
+    def __init__(self, coletor):
+        super().__init__(convert_charrefs=True)
+        self.coletor = coletor
+
+    def handle_starttag(self, tag, attrs):
+        self.coletor.iniciar(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.coletor.fechar(tag)
+
+    def handle_data(self, data):
+        self.coletor.texto(data)
+
+    def handle_comment(self, data):
+        self.coletor.texto_oculto(data)
+
+
+# Alvo do parser do lxml que repassa os eventos a um coletor
+class AlvoLxml:
+    def __init__(self, coletor):
+        self.coletor = coletor
+
+    def start(self, tag, attrib):
+        self.coletor.iniciar(tag, attrib)
+
+    def end(self, tag):
+        self.coletor.fechar(tag)
+
+    def data(self, data):
+        self.coletor.texto(data)
+
+    def comment(self, text):
+        self.coletor.texto_oculto(text)
+
+    def close(self):
+        return None
+
+
+# Função para percorrer a árvore do selectolax gerando os mesmos eventos
+def _eventos_selectolax(raiz, coletor, parar=None):
+    pilha = [(raiz, False)]
+    visitados = 0
+    while pilha:
+        visitados += 1
+        if parar is not None and visitados % NOS_POR_CONSULTA == 0 and parar():
+            return
+        no, fechamento = pilha.pop()
+        if fechamento:
+            coletor.fechar(no.tag)
+            continue
+
+        if no.tag == "-text":
+            coletor.texto(no.text_content or "")
+            continue
+        if no.tag == "-comment":
+            coletor.texto_oculto(no.comment_content or "")
+            continue
+
+        coletor.iniciar(no.tag, no.attributes)
+        pilha.append((no, True))
+
+        filhos = []
+        filho = no.child
+        while filho is not None:
+            filhos.append(filho)
+            filho = filho.next
+        pilha.extend((filho, False) for filho in reversed(filhos))
+
+
+# Função para entregar o HTML ao parser em pedaços, parando quando "parar()" devolver True
+def _alimentar(parser, html, parar):
+    if parar is None:
+        parser.feed(html)
+        return
+    for inicio in range(0, len(html), TAMANHO_PEDACO):
+        parser.feed(html[inicio:inicio + TAMANHO_PEDACO])
+        if parar():
+            break
+
+
+# Função para enviar os eventos de um HTML (abertura, fechamento, texto) a um coletor.
+# "parar()" é consultada a cada pedaço do HTML: quando devolve True, o resto da página não é
+# lido (o selectolax monta a árvore inteira de uma vez, mas para de percorrê-la).
+def percorrer(html, coletor, backend=None, parar=None):
+    backend = escolher_backend(backend)
+    if not html.strip():
+        return coletor
+    if backend == "selectolax":
+        _eventos_selectolax(LexborHTMLParser(html).root, coletor, parar)
+    elif backend == "lxml":
+        parser = etree.HTMLParser(target=AlvoLxml(coletor))
+        _alimentar(parser, html, parar)
+        parser.close()
+    else:
+        parser = ParserColetor(coletor)
+        _alimentar(parser, html, parar)
+        parser.close()
+    return coletor
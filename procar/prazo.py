@@ -0,0 +1,53 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Prazo total da busca na thread (ou tarefa) atual: instante (time.monotonic) em que ela
+# precisa terminar, ou None
+_fim_atual = contextvars.ContextVar("fim_do_prazo", default=None)
+
+
+# Erro de uma etapa que nem começou porque o prazo da busca já tinha acabado
+class PrazoEsgotado(Exception):
+    pass
+
+
+# Definir o prazo (em segundos) de tudo o que for feito dentro do bloco, inclusive nas threads
+# dos executores (tarefas enviadas com metricas.submeter). Prazos encaixados valem o menor;
+# segundos=None mantém o prazo atual.
+@contextmanager
+def definir_prazo(segundos):
+    if segundos is None:
+        yield
+        return
+    fim = time.monotonic() + segundos
+    atual = _fim_atual.get()
+    marcador = _fim_atual.set(fim if atual is None else min(atual, fim))
+    try:
+        yield
+    finally:
+        _fim_atual.reset(marcador)
+
+
+# Função para saber quantos segundos ainda restam do prazo (None = sem prazo)
+def restante():
+    fim = _fim_atual.get()
+    if fim is None:
+        return None
+    return max(0.0, fim - time.monotonic())
+
+
+# Função para saber se o prazo já acabou
+def esgotado():
+    segundos = restante()
+    return segundos is not None and segundos <= 0
+
+
+# Função para limitar o timeout de um download ao que resta do prazo
+def limitar_timeout(timeout):
+    segundos = restante()
+    if segundos is None:
+        return timeout
+    if segundos <= 0:
+        raise PrazoEsgotado()
+    return segundos if timeout is None else min(timeout, segundos)
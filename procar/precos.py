@@ -0,0 +1,325 @@
+import json
+import math
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from procar.codigos import normalizar_codigo
+from procar.config import caminho_dados
+
+# numpy é opcional: com ele as consultas ao histórico varrem as colunas de uma vez
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Trava entre processos (vários "procar batch --parte K/N" gravando no mesmo histórico);
+# fcntl não existe no Windows, onde só a trava entre threads vale
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Colunas do histórico: um arquivo binário por coluna, com valores de tamanho fixo
+# (códigos de tipo do módulo array: "d" = float64, "I" = uint32, "B" = uint8, "H" = uint16)
+COLUNAS = {
+    "instante": "d",
+    "codigo": "I",
+    "preco": "d",
+    "fonte": "B",
+    "categoria": "H"
+}
+
+# Origem de cada preço observado
+FONTES = ("mercado_livre", "shopee", "site", "outro")
+
+# Largura das faixas do histograma de preços (1%): a mediana é aproximada com essa precisão
+FATOR_FAIXA = 1.01
+
+
+# Agregado incremental de preços: contagem, soma, mínimo, máximo e um histograma em faixas
+# logarítmicas, que dá a mediana sem guardar os preços
+class AgregadoPrecos:
+    def __init__(self, contagem=0, soma=0.0, minimo=None, maximo=None, faixas=None):
+        self.contagem = contagem
+        self.soma = soma
+        self.minimo = minimo
+        self.maximo = maximo
+        self.faixas = faixas or {}
+
+    def adicionar(self, preco):
+        self.contagem += 1
+        self.soma += preco
+        self.minimo = preco if self.minimo is None else min(self.minimo, preco)
+        self.maximo = preco if self.maximo is None else max(self.maximo, preco)
+        faixa = round(math.log(preco) / math.log(FATOR_FAIXA))
+        self.faixas[faixa] = self.faixas.get(faixa, 0) + 1
+
+    @property
+    def media(self):
+        return self.soma / self.contagem if self.contagem else None
+
+    @property
+    def mediana(self):
+        if not self.contagem:
+            return None
+        metade = (self.contagem + 1) / 2
+        acumulado = 0
+        for faixa in sorted(self.faixas):
+            acumulado += self.faixas[faixa]
+            if acumulado >= metade:
+                # O centro da faixa, limitado aos preços realmente vistos
+                return min(max(FATOR_FAIXA ** faixa, self.minimo), self.maximo)
+        return self.maximo
+
+    def resumo(self):
+        return {
+            "contagem": self.contagem,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "media": self.media,
+            "mediana": self.mediana
+        }
+
+    def para_json(self):
+        return json.dumps({"faixas": self.faixas})
+
+    @classmethod
+    def de_linha(cls, contagem, soma, minimo, maximo, faixas_json):
+        faixas = {int(faixa): quantidade for faixa, quantidade in json.loads(faixas_json)["faixas"].items()}
+        return cls(contagem, soma, minimo, maximo, faixas)
+
+
+# Histórico de preços observados, só de acréscimo.
+# As observações ficam em arquivos colunares (um por campo) que podem ser mapeados em memória;
+# os dicionários de códigos/categorias e os agregados por código e por categoria ficam em SQLite
+# e são atualizados a cada observação, então nunca é preciso reler o histórico para obtê-los.
+# Cada gravação (colunas, agregados e estado) é feita sob uma trava de arquivo, então vários
+# processos podem gravar no mesmo histórico.
+class HistoricoPrecos:
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or caminho_dados("precos")
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(os.path.join(self.diretorio, "agregados.sqlite"),
+                                        check_same_thread=False, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS codigos (id INTEGER PRIMARY KEY, codigo TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS categorias (id INTEGER PRIMARY KEY, categoria TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS agregados (
+                tipo TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                contagem INTEGER NOT NULL,
+                soma REAL NOT NULL,
+                minimo REAL,
+                maximo REAL,
+                faixas TEXT NOT NULL,
+                PRIMARY KEY (tipo, chave)
+            );
+            CREATE TABLE IF NOT EXISTS estado (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+        """)
+        self._conexao.commit()
+
+        self._arquivos = {
+            coluna: open(os.path.join(self.diretorio, f"{coluna}.col"), "ab+") for coluna in COLUNAS
+        }
+        self._arquivo_trava = open(os.path.join(self.diretorio, "gravacao.lock"), "a")
+        with self._travado():
+            self._recuperar()
+
+    # Número de observações gravadas (por todos os processos)
+    def __len__(self):
+        return self._linhas_em_disco()
+
+    def _caminho_coluna(self, coluna):
+        return os.path.join(self.diretorio, f"{coluna}.col")
+
+    # Trava entre threads e, onde houver fcntl, entre processos
+    @contextmanager
+    def _travado(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._arquivo_trava.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._arquivo_trava.fileno(), fcntl.LOCK_UN)
+
+    # Linhas completas nas colunas (a menor entre elas)
+    def _linhas_em_disco(self):
+        return min(os.path.getsize(self._caminho_coluna(coluna)) // array(tipo).itemsize
+                   for coluna, tipo in COLUNAS.items())
+
+    # Acertar as colunas depois de uma interrupção: todas ficam com o mesmo número de linhas, e as
+    # linhas que chegaram às colunas mas não aos agregados são agregadas agora (chamar com a trava)
+    def _recuperar(self):
+        linhas = self._linhas_em_disco()
+        for coluna, tipo in COLUNAS.items():
+            arquivo = self._arquivos[coluna]
+            tamanho = linhas * array(tipo).itemsize
+            if os.path.getsize(self._caminho_coluna(coluna)) != tamanho:
+                arquivo.truncate(tamanho)
+
+        agregadas = self._estado("linhas_agregadas")
+        if agregadas > linhas:
+            # Estado à frente das colunas (colunas apagadas ou truncadas): não reagregar nada
+            agregadas = linhas
+        if agregadas < linhas:
+            colunas = self._ler_colunas(agregadas, linhas)
+            codigos = dict(self._conexao.execute("SELECT id, codigo FROM codigos").fetchall())
+            categorias = dict(self._conexao.execute("SELECT id, categoria FROM categorias").fetchall())
+            observacoes = [
+                (codigos.get(colunas["codigo"][indice]), categorias.get(colunas["categoria"][indice]), colunas["preco"][indice])
+                for indice in range(linhas - agregadas)
+            ]
+            self._agregar(observacoes)
+        self._gravar_estado("linhas_agregadas", linhas)
+        self._conexao.commit()
+
+    def _estado(self, nome):
+        linha = self._conexao.execute("SELECT valor FROM estado WHERE nome = ?", (nome,)).fetchone()
+        return linha[0] if linha else 0
+
+    def _gravar_estado(self, nome, valor):
+        self._conexao.execute("INSERT OR REPLACE INTO estado (nome, valor) VALUES (?, ?)", (nome, valor))
+
+    def _identificador(self, tabela, campo, valor):
+        linha = self._conexao.execute(f"SELECT id FROM {tabela} WHERE {campo} = ?", (valor,)).fetchone()
+        if linha:
+            return linha[0]
+        return self._conexao.execute(f"INSERT INTO {tabela} ({campo}) VALUES (?)", (valor,)).lastrowid
+
+    # Atualizar os agregados por código e por categoria com (codigo, categoria, preco)
+    def _agregar(self, observacoes):
+        agregados = {}
+        for codigo, categoria, preco in observacoes:
+            for tipo, chave in (("codigo", codigo), ("categoria", categoria)):
+                if chave is None:
+                    continue
+                if (tipo, chave) not in agregados:
+                    agregados[(tipo, chave)] = self._carregar_agregado(tipo, chave)
+                agregados[(tipo, chave)].adicionar(preco)
+
+        for (tipo, chave), agregado in agregados.items():
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO agregados (tipo, chave, contagem, soma, minimo, maximo, faixas) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tipo, chave, agregado.contagem, agregado.soma, agregado.minimo, agregado.maximo, agregado.para_json())
+            )
+
+    def _carregar_agregado(self, tipo, chave):
+        linha = self._conexao.execute(
+            "SELECT contagem, soma, minimo, maximo, faixas FROM agregados WHERE tipo = ? AND chave = ?", (tipo, chave)
+        ).fetchone()
+        return AgregadoPrecos.de_linha(*linha) if linha else AgregadoPrecos()
+
+    # Registrar os preços observados em uma busca: precos é uma lista de (fonte, preco)
+    def registrar(self, codigo_peca, precos, categoria=None, instante=None):
+        precos = [(fonte, preco) for fonte, preco in precos if preco and preco > 0]
+        if not precos:
+            return
+        codigo = normalizar_codigo(codigo_peca)
+        instante = instante or time.time()
+
+        with self._travado():
+            # As linhas contam pelo tamanho das colunas, que outros processos também aumentam
+            self._recuperar()
+            linhas = self._linhas_em_disco()
+
+            id_codigo = self._identificador("codigos", "codigo", codigo)
+            id_categoria = self._identificador("categorias", "categoria", categoria) if categoria else 0
+
+            valores = {
+                "instante": [instante] * len(precos),
+                "codigo": [id_codigo] * len(precos),
+                "preco": [float(preco) for fonte, preco in precos],
+                "fonte": [FONTES.index(fonte) if fonte in FONTES else FONTES.index("outro") for fonte, preco in precos],
+                "categoria": [id_categoria] * len(precos)
+            }
+            # Primeiro as colunas, depois os agregados: se o processo cair no meio, _recuperar
+            # agrega o que faltou
+            for coluna, tipo in COLUNAS.items():
+                self._arquivos[coluna].write(array(tipo, valores[coluna]).tobytes())
+                self._arquivos[coluna].flush()
+
+            self._agregar([(codigo, categoria, preco) for fonte, preco in precos])
+            self._gravar_estado("linhas_agregadas", linhas + len(precos))
+            self._conexao.commit()
+
+    # Resumo dos preços de um código: contagem, mínimo, máximo, média e mediana (ou None)
+    def agregado_codigo(self, codigo_peca):
+        with self._lock:
+            agregado = self._carregar_agregado("codigo", normalizar_codigo(codigo_peca))
+        return agregado.resumo() if agregado.contagem else None
+
+    # Resumo dos preços de uma categoria (ou None)
+    def agregado_categoria(self, categoria):
+        with self._lock:
+            agregado = self._carregar_agregado("categoria", categoria)
+        return agregado.resumo() if agregado.contagem else None
+
+    # Colunas das linhas [inicio, fim), mapeadas em memória (arrays do numpy, se instalado)
+    def _ler_colunas(self, inicio, fim):
+        colunas = {}
+        for coluna, tipo in COLUNAS.items():
+            tamanho_item = array(tipo).itemsize
+            arquivo = self._arquivos[coluna]
+            arquivo.flush()
+            if fim <= inicio:
+                colunas[coluna] = array(tipo)
+                continue
+            mapa = mmap.mmap(arquivo.fileno(), fim * tamanho_item, access=mmap.ACCESS_READ)
+            if numpy is not None:
+                colunas[coluna] = numpy.frombuffer(mapa, dtype=tipo, count=fim - inicio, offset=inicio * tamanho_item)
+            else:
+                colunas[coluna] = memoryview(mapa)[inicio * tamanho_item:].cast(tipo)
+        return colunas
+
+    # Observações de um código, em ordem de chegada: [{"instante", "preco", "fonte"}, ...]
+    def historico(self, codigo_peca, desde=None):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT id FROM codigos WHERE codigo = ?", (normalizar_codigo(codigo_peca),)
+            ).fetchone()
+            if not linha:
+                return []
+            colunas = self._ler_colunas(0, self._linhas_em_disco())
+
+        if numpy is not None:
+            filtro = colunas["codigo"] == linha[0]
+            if desde is not None:
+                filtro &= colunas["instante"] >= desde
+            indices = numpy.flatnonzero(filtro).tolist()
+        else:
+            indices = [
+                indice for indice, id_codigo in enumerate(colunas["codigo"])
+                if id_codigo == linha[0] and (desde is None or colunas["instante"][indice] >= desde)
+            ]
+        return [
+            {
+                "instante": float(colunas["instante"][indice]),
+                "preco": float(colunas["preco"][indice]),
+                "fonte": FONTES[colunas["fonte"][indice]]
+            }
+            for indice in indices
+        ]
+
+
+_historico_precos = None
+_lock_historico_precos = threading.Lock()
+
+
+# Função para obter o histórico de preços compartilhado pelo processo
+def obter_historico_precos():
+    global _historico_precos
+    with _lock_historico_precos:
+        if _historico_precos is None:
+            _historico_precos = HistoricoPrecos()
+        return _historico_precos
@@ -0,0 +1,283 @@
+import codecs
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from procar.agendador import STATUS_RECUSA, FilaEsgotada, obter_agendador
+from procar.cache_http import obter_cache_http
+from procar.gravacao import configurar_sessao
+from procar.metricas import medir
+from procar.prazo import esgotado, limitar_timeout
+from procar.saude import CircuitoAberto, obter_saude, resposta_saudavel
+from procar.unico import ChamadaUnica
+
+# User-Agent único usado por todos os buscadores
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Compressão aceita na transferência (brotli só se houver decodificador instalado)
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS_PADRAO = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.5",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive"
+}
+
+# Tamanho do pool de conexões por host (os demais hosts usam POOL_PADRAO)
+POOLS_POR_HOST = {
+    "https://www.google.com": 4,
+    "https://lista.mercadolivre.com.br": 8,
+    "https://produto.mercadolivre.com.br": 8,
+    "https://shopee.com.br": 4
+}
+POOL_PADRAO = 10
+
+# Tentativas em falhas transitórias (conexão, timeouts de leitura e 5xx). Recusas (429/503)
+# não são repetidas aqui: elas pausam o domínio no agendador e são repetidas por ele.
+TENTATIVAS = 2
+FATOR_ESPERA = 0.5
+STATUS_TRANSITORIOS = (500, 502, 504)
+TENTATIVAS_RECUSA = 1
+
+# Corpo das respostas: lido em blocos e só até este tamanho (depois de descomprimido); o resto
+# da página é descartado sem ser baixado
+MAX_BYTES_PADRAO = 2 * 1024 * 1024
+TAMANHO_BLOCO = 64 * 1024
+
+# Codificação do corpo: charset do Content-Type ou, na falta dele, do <meta> no início da página
+REGEX_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+REGEX_CHARSET_META = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+BYTES_PROCURA_META = 4096
+ENCODING_PADRAO = "utf-8"
+
+
+# Função para montar a política de novas tentativas
+def criar_retry():
+    return Retry(
+        total=TENTATIVAS,
+        connect=TENTATIVAS,
+        read=1,
+        status=TENTATIVAS,
+        backoff_factor=FATOR_ESPERA,
+        status_forcelist=STATUS_TRANSITORIOS,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+# Função para criar uma sessão HTTP com pools por host, keep-alive e compressão
+def criar_sessao(pools_por_host=None, pool_padrao=POOL_PADRAO):
+    sessao = requests.Session()
+    sessao.headers.update(HEADERS_PADRAO)
+
+    adaptador_padrao = HTTPAdapter(pool_connections=pool_padrao, pool_maxsize=pool_padrao,
+                                   max_retries=criar_retry())
+    sessao.mount("https://", adaptador_padrao)
+    sessao.mount("http://", adaptador_padrao)
+
+    # Prefixos mais longos têm precedência sobre "https://" na escolha do adaptador
+    for prefixo, tamanho in (pools_por_host or POOLS_POR_HOST).items():
+        sessao.mount(prefixo, HTTPAdapter(pool_connections=1, pool_maxsize=tamanho,
+                                          max_retries=criar_retry()))
+
+    # Gravação ou reprodução das trocas HTTP, se pedidas pelo ambiente (veja procar.gravacao)
+    return configurar_sessao(sessao)
+
+
+_sessao = None
+_lock_sessao = threading.Lock()
+
+
+# Função para obter a sessão HTTP compartilhada pelo processo
+def obter_sessao():
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            _sessao = criar_sessao()
+        return _sessao
+
+
+# Função para descobrir a codificação de uma resposta sem analisar o corpo inteiro: charset do
+# Content-Type, senão o <meta charset> (ou http-equiv) do início da página, senão UTF-8
+def descobrir_encoding(headers, corpo):
+    candidatos = []
+    match = REGEX_CHARSET.search(headers.get("Content-Type", ""))
+    if match:
+        candidatos.append(match.group(1))
+    match = REGEX_CHARSET_META.search(corpo[:BYTES_PROCURA_META])
+    if match:
+        candidatos.append(match.group(1).decode("ascii", errors="ignore"))
+    for candidato in candidatos:
+        try:
+            return codecs.lookup(candidato).name
+        except LookupError:
+            continue
+    return ENCODING_PADRAO
+
+
+# Função para ler o corpo de uma resposta aberta com stream=True, em blocos, até max_bytes (ou até
+# o prazo da busca acabar, ou "desistir()" devolver True). A resposta fica com o corpo lido em
+# .content, a codificação definida e "corte" indicando se o corpo foi cortado ("limite" ou "prazo")
+# ou não (None).
+def ler_corpo(response, max_bytes=MAX_BYTES_PADRAO, desistir=None):
+    partes = []
+    lidos = 0
+    corte = None
+    try:
+        for bloco in response.iter_content(TAMANHO_BLOCO):
+            partes.append(bloco)
+            lidos += len(bloco)
+            if max_bytes is not None and lidos >= max_bytes:
+                corte = "limite"
+                break
+            if esgotado() or (desistir and desistir()):
+                corte = "prazo"
+                break
+    finally:
+        # Corpo não lido até o fim: a conexão é fechada em vez de voltar ao pool
+        response.close()
+
+    corpo = b"".join(partes)
+    if max_bytes is not None:
+        corpo = corpo[:max_bytes]
+    response._content = corpo
+    response._content_consumed = True
+    response.encoding = descobrir_encoding(response.headers, corpo)
+    response.corte = corte
+    # Gravação das trocas ligada (procar.gravacao): a fita recebe o corpo já limitado
+    ao_ler_corpo = getattr(response, "ao_ler_corpo", None)
+    if ao_ler_corpo:
+        ao_ler_corpo(response)
+    return response
+
+
+# Downloads em andamento no processo: pedidos simultâneos da mesma URL viram um só
+_downloads = ChamadaUnica()
+
+
+# Função para baixar uma página usando a sessão e o cache HTTP compartilhados.
+# Só os primeiros "max_bytes" do corpo são baixados (None = sem limite).
+# "desistir()", se informada, é consultada na fila do domínio e durante a leitura do corpo: quem
+# pediu a página não precisa mais dela (o pedido sai da fila, ou o corpo fica cortado). Se outros
+# pedidos estiverem esperando o mesmo download, quem desiste sai da espera com TimeoutError.
+def baixar(url, headers=None, timeout=10, usar_cache=True, max_bytes=MAX_BYTES_PADRAO, desistir=None):
+    with medir("download", urlparse(url).netloc) as trecho:
+        cache = obter_cache_http() if usar_cache else None
+        guardada = cache.obter(url) if cache else None
+        # Corpo guardado cortado em um limite menor que o deste pedido: não serve nem para revalidar
+        if guardada and not guardada.atende(max_bytes):
+            guardada = None
+
+        # Resposta ainda válida: nem precisa ir à rede
+        if guardada and not guardada.vencida:
+            trecho.status = "cache"
+            trecho.http_status = guardada.status_code
+            return guardada
+
+        # O download nunca passa do prazo da busca (PrazoEsgotado se ele já acabou)
+        timeout = limitar_timeout(timeout)
+
+        # Domínio que vem falhando: nem tentar até a espera do circuito terminar
+        dominio = urlparse(url).netloc
+        if not obter_saude().permitir(f"dominio:{dominio}"):
+            raise CircuitoAberto(dominio)
+
+        # Pedidos simultâneos da mesma página dividem um só download. Cada um aplica o próprio
+        # "desistir" à sua espera; o download só é cortado quando todos tiverem desistido.
+        chave = (url, tuple(sorted((headers or {}).items())), usar_cache, max_bytes)
+        desistencia = (lambda: _downloads.desistiram(chave)) if desistir else None
+        response = _downloads.executar(chave, lambda: _baixar_da_rede(url, headers, timeout, cache, guardada, max_bytes,
+                                                                      desistencia),
+                                       limite=timeout, desistir=desistir)
+        trecho.http_status = response.status_code
+        if response is guardada:
+            trecho.status = "revalidada"
+        else:
+            trecho.bytes = len(response.content or b"")
+            if getattr(response, "corte", None):
+                trecho.extras["corte"] = response.corte
+            if response.status_code >= 400:
+                trecho.status = "http_erro"
+        return response
+
+
+# Função para buscar a página no servidor (revalidando a cópia vencida, se houver)
+def _baixar_da_rede(url, headers, timeout, cache, guardada, max_bytes=MAX_BYTES_PADRAO, desistir=None):
+    # Resposta vencida: pedir ao servidor apenas se ela mudou
+    headers = dict(headers or {})
+    if guardada:
+        if guardada.etag:
+            headers["If-None-Match"] = guardada.etag
+        if guardada.last_modified:
+            headers["If-Modified-Since"] = guardada.last_modified
+
+    # Cada pedido espera a vez do domínio no agendador (taxa por domínio, prioridade da tela
+    # sobre o lote); uma recusa pausa o domínio e o pedido volta para a fila uma vez
+    dominio = urlparse(url).netloc
+    agendador = obter_agendador()
+    response = None
+    inicio = time.monotonic()
+    for tentativa in range(TENTATIVAS_RECUSA + 1):
+        try:
+            with medir("fila", dominio):
+                agendador.aguardar(dominio, limite=timeout, desistir=desistir)
+        except FilaEsgotada:
+            if response is None:
+                raise
+            break
+        if response is not None:
+            # Recusa anterior: o corpo dela não interessa
+            response.close()
+        try:
+            response = obter_sessao().get(url, headers=headers, timeout=timeout, stream=True)
+        except Exception:
+            obter_saude().registrar(f"dominio:{dominio}", False, duracao=time.monotonic() - inicio)
+            raise
+        agendador.registrar_resposta(dominio, response.status_code, response.headers.get("Retry-After"))
+        if response.status_code not in STATUS_RECUSA:
+            break
+
+    # Corpo lido em blocos, só até max_bytes
+    try:
+        ler_corpo(response, max_bytes, desistir)
+    except Exception:
+        obter_saude().registrar(f"dominio:{dominio}", False, duracao=time.monotonic() - inicio)
+        raise
+    obter_saude().registrar(f"dominio:{dominio}", resposta_saudavel(response.status_code),
+                            duracao=time.monotonic() - inicio)
+
+    if response.status_code == 304 and guardada:
+        guardada.expira_em = cache.renovar(url)
+        return guardada
+
+    # Corpo cortado pelo prazo não vai para o cache; cortado pelo limite vai, com o limite anotado
+    # (só serve para pedidos com limite igual ou menor)
+    if (cache and response.status_code == 200 and response.corte != "prazo"
+            and "no-store" not in response.headers.get("Cache-Control", "")):
+        cache.gravar(
+            url,
+            response.status_code,
+            response.content,
+            response.encoding,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            limite_bytes=max_bytes if response.corte == "limite" else None
+        )
+
+    return response
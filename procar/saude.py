@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+
+# Observações mantidas por fonte/domínio para calcular a saúde (janela móvel)
+JANELA_SAUDE = 20
+
+# O circuito só abre com pelo menos este número de observações na janela...
+MIN_OBSERVACOES = 10
+
+# ...e quando esta fração delas falhou (erro, prazo esgotado ou nenhum resultado)
+LIMITE_FALHAS = 0.8
+
+# Espera (em segundos) até a próxima tentativa com o circuito aberto; dobra a cada nova
+# falha da tentativa, até ESPERA_MAXIMA
+ESPERA_INICIAL = 60
+ESPERA_MAXIMA = 30 * 60
+
+# Respostas que contam como falha do domínio (bloqueio, limite de pedidos ou erro do servidor)
+STATUS_FALHA = (403, 429)
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+TESTANDO = "testando"
+
+
+# Erro de uma consulta não feita porque o circuito da fonte/domínio está aberto
+class CircuitoAberto(Exception):
+    pass
+
+
+# Função para saber se uma resposta HTTP conta como sucesso para a saúde do domínio
+def resposta_saudavel(status_code):
+    return status_code < 500 and status_code not in STATUS_FALHA
+
+
+# Saúde de uma fonte ou domínio: últimas observações e estado do disjuntor (circuit breaker)
+class Circuito:
+    def __init__(self):
+        self.observacoes = deque(maxlen=JANELA_SAUDE)
+        self.estado = FECHADO
+        self.espera = ESPERA_INICIAL
+        self.reabre_em = None
+        self.teste_iniciado_em = None
+
+    def taxa_falhas(self):
+        if not self.observacoes:
+            return 0.0
+        return sum(1 for sucesso, itens, duracao in self.observacoes if not sucesso) / len(self.observacoes)
+
+    def resumo(self, agora):
+        duracoes = sorted(duracao for sucesso, itens, duracao in self.observacoes if duracao is not None)
+        itens = [itens for sucesso, itens, duracao in self.observacoes if itens is not None]
+        return {
+            "estado": self.estado,
+            "observacoes": len(self.observacoes),
+            "taxa_sucesso": round(1 - self.taxa_falhas(), 2) if self.observacoes else None,
+            "itens_medio": round(sum(itens) / len(itens), 1) if itens else None,
+            "latencia_p50_ms": round(duracoes[len(duracoes) // 2] * 1000) if duracoes else None,
+            "nova_tentativa_em_s": max(0, round(self.reabre_em - agora)) if self.estado == ABERTO else None
+        }
+
+
+# Saúde de todas as fontes de busca e domínios do processo.
+# Fontes e domínios que falham (ou voltam vazios) quase sempre deixam de ser consultados; depois
+# da espera, uma única consulta de teste decide se o circuito fecha de novo ou continua aberto.
+class SaudeFontes:
+    def __init__(self):
+        self._circuitos = {}
+        self._lock = threading.Lock()
+
+    def _circuito(self, chave):
+        if chave not in self._circuitos:
+            self._circuitos[chave] = Circuito()
+        return self._circuitos[chave]
+
+    # Saber se a fonte/domínio pode ser consultado agora (com o circuito aberto, só a consulta
+    # de teste passa, quando a espera termina)
+    def permitir(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            circuito = self._circuito(chave)
+            if circuito.estado == FECHADO:
+                return True
+            if circuito.estado == TESTANDO:
+                # Teste que nunca voltou (ex.: thread abandonada): liberar outro
+                if agora - circuito.teste_iniciado_em < circuito.espera:
+                    return False
+            elif agora < circuito.reabre_em:
+                return False
+            circuito.estado = TESTANDO
+            circuito.teste_iniciado_em = agora
+            return True
+
+    # Registrar o resultado de uma consulta: sucesso, itens obtidos e duração em segundos
+    def registrar(self, chave, sucesso, itens=None, duracao=None):
+        agora = time.monotonic()
+        with self._lock:
+            circuito = self._circuito(chave)
+            circuito.observacoes.append((sucesso, itens, duracao))
+
+            if circuito.estado == TESTANDO:
+                if sucesso:
+                    circuito.estado = FECHADO
+                    circuito.espera = ESPERA_INICIAL
+                    circuito.observacoes.clear()
+                    circuito.observacoes.append((sucesso, itens, duracao))
+                else:
+                    circuito.espera = min(circuito.espera * 2, ESPERA_MAXIMA)
+                    circuito.estado = ABERTO
+                    circuito.reabre_em = agora + circuito.espera
+            elif (circuito.estado == FECHADO and len(circuito.observacoes) >= MIN_OBSERVACOES
+                  and circuito.taxa_falhas() >= LIMITE_FALHAS):
+                circuito.estado = ABERTO
+                circuito.reabre_em = agora + circuito.espera
+
+    # Fechar o circuito e esquecer as observações (ex.: o operador sabe que o site voltou)
+    def reiniciar(self, chave=None):
+        with self._lock:
+            if chave is None:
+                self._circuitos.clear()
+            else:
+                self._circuitos.pop(chave, None)
+
+    # Saúde de cada fonte e domínio já consultado, para exibição
+    def estado(self):
+        agora = time.monotonic()
+        with self._lock:
+            return {chave: circuito.resumo(agora) for chave, circuito in sorted(self._circuitos.items())}
+
+
+_saude = None
+_lock_saude = threading.Lock()
+
+
+# Função para obter a saúde das fontes compartilhada pelo processo
+def obter_saude():
+    global _saude
+    with _lock_saude:
+        if _saude is None:
+            _saude = SaudeFontes()
+        return _saude
@@ -0,0 +1,91 @@
+import threading
+import time
+
+# Intervalo (em segundos) entre as consultas a "desistir" de quem espera outra chamada
+INTERVALO_DESISTENCIA = 0.1
+
+# Uma chamada em andamento: quem chega depois espera pelo mesmo resultado
+class _ChamadaEmAndamento:
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado = None
+        self.erro = None
+        self.esperando = 0
+        # "desistir" de cada chamada interessada no resultado (None = nunca desiste)
+        self.interessados = []
+
+
+# Grupo de chamadas únicas ("single flight"): chamadas simultâneas com a mesma chave
+# executam a função uma única vez e todas recebem o mesmo resultado (ou a mesma exceção).
+# Nada fica guardado depois que a chamada termina; para isso existem os caches.
+class ChamadaUnica:
+    def __init__(self):
+        self._em_andamento = {}
+        self._lock = threading.Lock()
+
+    # Executar funcao() para a chave, ou esperar a execução que já está em andamento.
+    # "ao_esperar" é chamado (na thread de quem espera) quando a chamada vai aguardar outra;
+    # quem espera mais que "limite" segundos, ou cuja "desistir()" devolve True durante a espera,
+    # recebe TimeoutError (a outra execução continua). A execução em si só pode ser interrompida
+    # quando todos os interessados desistirem (veja desistiram).
+    def executar(self, chave, funcao, ao_esperar=None, limite=None, desistir=None):
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._em_andamento[chave] = _ChamadaEmAndamento()
+            else:
+                chamada.esperando += 1
+            chamada.interessados.append(desistir)
+
+        if not lider:
+            if ao_esperar:
+                ao_esperar()
+            if not self._esperar(chamada, limite, desistir):
+                with self._lock:
+                    chamada.esperando -= 1
+                    chamada.interessados.remove(desistir)
+                raise TimeoutError(f"Chamada em andamento para {chave!r} não terminou a tempo")
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao()
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            chamada.concluida.set()
+
+    # Esperar a chamada em andamento terminar; devolve False se o limite acabou ou se desistiu antes
+    def _esperar(self, chamada, limite, desistir):
+        if desistir is None:
+            return chamada.concluida.wait(limite)
+        fim = time.monotonic() + limite if limite is not None else None
+        while True:
+            espera = INTERVALO_DESISTENCIA
+            if fim is not None:
+                espera = min(espera, fim - time.monotonic())
+                if espera <= 0:
+                    return chamada.concluida.is_set()
+            if chamada.concluida.wait(espera):
+                return True
+            if desistir():
+                return False
+
+    # Saber se todas as chamadas interessadas na execução em andamento da chave já desistiram
+    # (para a execução ser interrompida; quem não informou "desistir" nunca desiste)
+    def desistiram(self, chave):
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            interessados = list(chamada.interessados) if chamada else []
+        return bool(interessados) and all(desistir is not None and desistir() for desistir in interessados)
+
+    # Quantidade de chamadas em andamento e de quem está esperando por elas
+    def andamento(self):
+        with self._lock:
+            return {chave: chamada.esperando for chave, chamada in self._em_andamento.items()}
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Os testes nunca tocam o diretório de dados do usuário nem gravam métricas
+os.environ["PROCAR_DADOS"] = tempfile.mkdtemp(prefix="procar-testes-")
+os.environ["PROCAR_METRICAS"] = "0"
+os.environ.pop("PROCAR_REPRODUZIR", None)
+os.environ.pop("PROCAR_GRAVAR", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procar import agendador, cache_http, rede, saude  # noqa: E402
+from procar.gravacao import AdaptadorReproducao, Fita, Troca  # noqa: E402
+
+
+# Fita de reprodução no lugar da internet: os downloads do teste respondem com as trocas
+# gravadas nela (URLs fora da fita recebem 404). Cache HTTP, agendador (sem limite de taxa) e
+# saúde das fontes são novos a cada teste.
+class FitaTeste(Fita):
+    def responder(self, url, conteudo, status=200, headers=None):
+        if isinstance(conteudo, str):
+            conteudo = conteudo.encode("utf-8")
+        headers = {"Content-Type": "text/html; charset=utf-8", **(headers or {})}
+        self.gravar(Troca(url, status, headers, conteudo))
+
+
+# Adaptador de reprodução que também guarda os pedidos recebidos (em fita.pedidos); a lentidão
+# simulada fica em fita.adaptador.simulacao
+class AdaptadorTeste(AdaptadorReproducao):
+    def send(self, request, **kwargs):
+        self.fita.pedidos.append(request)
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture
+def fita(tmp_path, monkeypatch):
+    fita = FitaTeste(str(tmp_path / "fita.jsonl"))
+    fita.pedidos = []
+    adaptador = fita.adaptador = AdaptadorTeste(fita)
+    sessao = rede.criar_sessao()
+    for prefixo in list(sessao.adapters):
+        sessao.mount(prefixo, adaptador)
+    monkeypatch.setattr(rede, "_sessao", sessao)
+    monkeypatch.setattr(cache_http, "_cache_http", cache_http.CacheHttp(str(tmp_path / "http.sqlite")))
+    monkeypatch.setattr(agendador, "_agendador", agendador.Agendador({"*": (0, 1)}))
+    monkeypatch.setattr(saude, "_saude", saude.SaudeFontes())
+    return fita
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from procar import agendador as modulo_agendador
+from procar.agendador import Agendador, FilaEsgotada, ler_retry_after, taxas_do_ambiente
+
+
+def test_balde_de_fichas():
+    agendador = Agendador({"loja.test": (20, 2)})
+    # A rajada sai sem espera; o pedido seguinte espera uma ficha (1/20 s)
+    assert agendador.aguardar("loja.test") < 0.01
+    assert agendador.aguardar("loja.test") < 0.01
+    espera = agendador.aguardar("loja.test")
+    assert 0.03 < espera < 0.2
+
+
+def test_sem_limite_de_taxa():
+    agendador = Agendador({"*": (0, 1)})
+    inicio = time.monotonic()
+    for _ in range(50):
+        agendador.aguardar("loja.test")
+    assert time.monotonic() - inicio < 0.1
+
+
+def test_limite_da_fila():
+    agendador = Agendador({"loja.test": (1, 1)})
+    agendador.aguardar("loja.test")
+    with pytest.raises(FilaEsgotada):
+        agendador.aguardar("loja.test", limite=0.05)
+    assert agendador.estado()["loja.test"]["esperando"] == 0
+
+
+def test_prioridade_da_tela_passa_na_frente_do_lote():
+    agendador = Agendador({"loja.test": (10, 1)})
+    agendador.aguardar("loja.test")
+    ordem = []
+
+    def pedir(nome, prioridade):
+        agendador.aguardar("loja.test", prioridade=prioridade)
+        ordem.append(nome)
+
+    lote = threading.Thread(target=pedir, args=("lote", modulo_agendador.PRIORIDADE_LOTE))
+    lote.start()
+    time.sleep(0.02)
+    tela = threading.Thread(target=pedir, args=("tela", modulo_agendador.PRIORIDADE_INTERATIVA))
+    tela.start()
+    lote.join()
+    tela.join()
+    assert ordem == ["tela", "lote"]
+
+
+def test_recusa_pausa_o_dominio_pelo_retry_after():
+    agendador = Agendador({"*": (0, 1)})
+    agendador.registrar_resposta("loja.test", 429, "0.2")
+    espera = agendador.aguardar("loja.test")
+    assert 0.15 < espera < 0.4
+    # Outros domínios não são afetados
+    assert agendador.aguardar("outra.test") < 0.01
+
+
+def test_recusas_sem_retry_after_dobram_a_pausa(monkeypatch):
+    monkeypatch.setattr(modulo_agendador, "PAUSA_INICIAL", 0.1)
+    agendador = Agendador({"*": (0, 1)})
+
+    agendador.registrar_resposta("loja.test", 503)
+    assert 0.05 < agendador.aguardar("loja.test") < 0.2
+    agendador.registrar_resposta("loja.test", 429)
+    assert 0.15 < agendador.aguardar("loja.test") < 0.35
+
+    # Uma resposta normal zera a pausa acumulada
+    agendador.registrar_resposta("loja.test", 200)
+    agendador.registrar_resposta("loja.test", 429)
+    assert agendador.aguardar("loja.test") < 0.2
+
+
+def test_ler_retry_after():
+    assert ler_retry_after("3") == 3.0
+    assert ler_retry_after(None) is None
+    assert ler_retry_after("amanhã") is None
+    assert ler_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_taxas_do_ambiente_ignoram_itens_mal_formados(monkeypatch):
+    monkeypatch.setenv("PROCAR_TAXAS", "www.google.com=0.5, shopee.com.br=rapido,=3,a.test=-1,b.test=nan,"
+                                       "c.test=inf,sem-taxa,*=2")
+    assert taxas_do_ambiente() == {"www.google.com": (0.5, 1), "*": (2.0, 4)}
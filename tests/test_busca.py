@@ -0,0 +1,65 @@
+import threading
+import time
+
+from procar import fontes
+from procar.busca import buscar_informacoes_peca
+
+
+def test_motivo_parcial_fonte_sem_resposta(fita, monkeypatch):
+    def shopee_lenta(codigo_peca, timeout=None):
+        time.sleep(0.5)
+        return []
+
+    monkeypatch.setattr(fontes, "buscar_google", lambda query, num_results=20, timeout=None: [])
+    monkeypatch.setattr(fontes, "buscar_mercado_livre", lambda codigo_peca, timeout=None: [])
+    monkeypatch.setattr(fontes, "buscar_shopee", shopee_lenta)
+    monkeypatch.setattr(fontes, "PRAZOS_FONTES", {**fontes.PRAZOS_FONTES, "shopee": 0.1})
+
+    info = buscar_informacoes_peca("BUSCA-TESTE-1")
+
+    assert info["parcial"]
+    assert info["motivo_parcial"] == "fontes"
+    assert info["fontes_cortadas"] == ["Shopee"]
+
+
+def test_motivo_parcial_prazo_da_busca(fita, monkeypatch):
+    def fonte_lenta(*argumentos, timeout=None):
+        time.sleep(0.5)
+        return []
+
+    for nome in ("buscar_google", "buscar_mercado_livre", "buscar_shopee"):
+        monkeypatch.setattr(fontes, nome, fonte_lenta)
+
+    info = buscar_informacoes_peca("BUSCA-TESTE-2", prazo=0.1)
+
+    assert info["parcial"]
+    assert info["motivo_parcial"] == "prazo"
+
+
+def test_quem_espera_outra_busca_nao_repete_a_busca_quando_o_prazo_acaba(fita, monkeypatch):
+    chamadas = []
+
+    def fonte_lenta(*argumentos, timeout=None):
+        chamadas.append(1)
+        time.sleep(0.5)
+        return []
+
+    for nome in ("buscar_google", "buscar_mercado_livre", "buscar_shopee"):
+        monkeypatch.setattr(fontes, nome, fonte_lenta)
+
+    lider = threading.Thread(target=buscar_informacoes_peca, args=("BUSCA-TESTE-3",))
+    lider.start()
+    while len(chamadas) < 3:
+        time.sleep(0.005)
+
+    inicio = time.monotonic()
+    info = buscar_informacoes_peca("BUSCA-TESTE-3", prazo=0.1)
+    assert time.monotonic() - inicio < 0.4
+    lider.join()
+
+    # Resultado parcial na hora, sem consultar as fontes de novo
+    assert len(chamadas) == 3
+    assert info["parcial"]
+    assert info["motivo_parcial"] == "prazo"
+    assert set(info["completude"].values()) == {"parcial"}
+    assert info["nome"] == "Peça automotiva BUSCATESTE3"
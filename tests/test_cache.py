@@ -0,0 +1,53 @@
+import time
+
+from procar import cache as modulo_cache
+from procar.cache import CachePecas
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = time.time()
+
+    def __call__(self):
+        return self.agora
+
+
+def test_cache_pecas_expira_pelo_ttl(tmp_path, monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo_cache.time, "time", relogio)
+    cache = CachePecas(str(tmp_path / "pecas.sqlite"), ttl=60)
+
+    cache.gravar("628117709-R", {"nome": "Defletor"})
+    assert cache.obter("628117709r") == {"nome": "Defletor"}
+    # Outra instância (outro processo) lê do disco
+    assert CachePecas(cache.caminho).obter("628117709R") == {"nome": "Defletor"}
+
+    relogio.agora += 61
+    assert cache.obter("628117709R") is None
+    assert CachePecas(cache.caminho).obter("628117709R") is None
+    assert cache.codigos() == []
+    assert cache.limpar_expiradas() == 1
+
+
+def test_cache_pecas_fixas_nunca_expiram(tmp_path, monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo_cache.time, "time", relogio)
+    cache = CachePecas(str(tmp_path / "pecas.sqlite"), ttl=60)
+
+    cache.fixar({"LR006225": {"nome": "Travessa"}})
+    cache.gravar("LR006225", {"nome": "Outro nome"})
+    cache.remover("LR006225")
+    relogio.agora += 10 * 365 * 24 * 3600
+
+    assert cache.obter("LR006225") == {"nome": "Travessa"}
+    assert CachePecas(cache.caminho).obter("lr-006225") == {"nome": "Travessa"}
+    assert cache.limpar_expiradas() == 0
+
+
+def test_cache_pecas_memoria_limitada(tmp_path):
+    cache = CachePecas(str(tmp_path / "pecas.sqlite"), capacidade=2)
+    for codigo in ("A1", "B2", "C3"):
+        cache.gravar(codigo, {"codigo": codigo})
+    assert list(cache._memoria) == ["B2", "C3"]
+    # O que saiu da memória continua no disco
+    assert cache.obter("A1") == {"codigo": "A1"}
@@ -0,0 +1,64 @@
+import sqlite3
+
+from procar.cache_http import CacheHttp, obter_cache_http
+from procar.rede import baixar
+
+
+def test_cache_http_revalida_com_etag(fita):
+    url = "https://loja.test/produto"
+    fita.responder(url, "<html>versão 1</html>", headers={"ETag": '"v1"'})
+
+    primeira = baixar(url)
+    assert primeira.text == "<html>versão 1</html>"
+    assert len(fita.pedidos) == 1
+
+    # Ainda válida: nem vai à rede
+    assert baixar(url).text == "<html>versão 1</html>"
+    assert len(fita.pedidos) == 1
+
+    # Vencida: o servidor diz que não mudou (304) e a cópia guardada volta a valer
+    cache = obter_cache_http()
+    cache.renovar(url, ttl=-1)
+    fita.responder(url, b"", status=304)
+    revalidada = baixar(url)
+    assert fita.pedidos[-1].headers["If-None-Match"] == '"v1"'
+    assert revalidada.text == "<html>versão 1</html>"
+    assert not cache.obter(url).vencida
+
+    # Vencida e alterada: a resposta nova substitui a guardada
+    cache.renovar(url, ttl=-1)
+    fita.responder(url, "<html>versão 2</html>", headers={"ETag": '"v2"'})
+    assert baixar(url).text == "<html>versão 2</html>"
+    assert cache.obter(url).etag == '"v2"'
+
+
+def test_cache_http_respeita_o_limite_de_bytes(fita):
+    url = "https://loja.test/grande"
+    corpo = "<html>" + "x" * 300_000 + "</html>"
+    fita.responder(url, corpo)
+
+    assert len(baixar(url, max_bytes=100_000).content) == 100_000
+    assert obter_cache_http().obter(url).limite_bytes == 100_000
+    # Pedido com limite menor: o corpo cortado serve
+    assert len(baixar(url, max_bytes=50_000).content) == 100_000
+    assert len(fita.pedidos) == 1
+
+    # Pedido do corpo inteiro (ou com limite maior): o cortado não serve
+    assert baixar(url, max_bytes=None).text == corpo
+    assert len(fita.pedidos) == 2
+    assert obter_cache_http().obter(url).limite_bytes is None
+    assert baixar(url, max_bytes=200_000).text == corpo
+    assert len(fita.pedidos) == 2
+
+
+def test_cache_http_antigo_ganha_coluna_de_limite(tmp_path):
+    caminho = str(tmp_path / "antigo.sqlite")
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("CREATE TABLE respostas (url TEXT PRIMARY KEY, status INTEGER NOT NULL, corpo BLOB NOT NULL, "
+                    "encoding TEXT, etag TEXT, last_modified TEXT, gravado_em REAL NOT NULL, expira_em REAL NOT NULL)")
+    conexao.commit()
+    conexao.close()
+
+    cache = CacheHttp(caminho)
+    cache.gravar("https://loja.test/p", 200, b"corpo", "utf-8", limite_bytes=5)
+    assert cache.obter("https://loja.test/p").limite_bytes == 5
@@ -0,0 +1,50 @@
+from procar.catalogo import Catalogo, ler_catalogo, registro_para_info_peca
+
+CSV = (
+    "part_number;descricao;marca;largura;preco\n"
+    "628117709R;Defletor ar radiador esquerdo;Renault;12,5;189,90\n"
+    "LR006225;Travessa dianteira inferior;Land Rover;;1.234,56\n"
+    ";Linha sem código;Renault;;\n"
+)
+
+
+def test_ingestao_incremental(tmp_path):
+    catalogo = Catalogo(str(tmp_path / "catalogo.sqlite"))
+    linhas = list(ler_catalogo(CSV.encode("utf-8")))
+
+    assert catalogo.ingerir(linhas) == {"novos": 2, "alterados": 0, "inalterados": 0, "ignorados": 1}
+    # Reimportar o mesmo arquivo não regrava nada
+    assert catalogo.ingerir(linhas) == {"novos": 0, "alterados": 0, "inalterados": 2, "ignorados": 1}
+
+    # Uma linha alterada e uma nova
+    alterado = CSV.replace("189,90", "199,90") + "92404M4000;Lanterna traseira direita;Hyundai;;\n"
+    contagem = catalogo.ingerir(ler_catalogo(alterado.encode("utf-8")))
+    assert contagem == {"novos": 1, "alterados": 1, "inalterados": 1, "ignorados": 1}
+    assert catalogo.tamanho() == 3
+    assert catalogo.obter("628117709-r")["preco_novo_min"] == 199.9
+
+
+def test_ultima_linha_do_mesmo_codigo_vale(tmp_path):
+    catalogo = Catalogo(str(tmp_path / "catalogo.sqlite"))
+    catalogo.ingerir([{"codigo": "A1", "nome": "Primeira"}, {"codigo": "a-1", "nome": "Correção"}])
+    assert catalogo.tamanho() == 1
+    assert catalogo.obter("A1")["nome"] == "Correção"
+
+
+def test_busca_por_nome_acompanha_alteracoes(tmp_path):
+    catalogo = Catalogo(str(tmp_path / "catalogo.sqlite"))
+    catalogo.ingerir(ler_catalogo(CSV.encode("utf-8")))
+    assert [registro["codigo"] for registro in catalogo.buscar_por_nome("trav dianteira")] == ["LR006225"]
+
+    catalogo.ingerir([{"codigo": "LR006225", "nome": "Longarina dianteira", "fabricante": "Land Rover"}])
+    assert catalogo.buscar_por_nome("travessa") == []
+    assert [registro["codigo"] for registro in catalogo.buscar_por_nome("longarina")] == ["LR006225"]
+
+
+def test_registro_para_info_peca(tmp_path):
+    catalogo = Catalogo(str(tmp_path / "catalogo.sqlite"))
+    catalogo.ingerir(ler_catalogo(CSV.encode("utf-8")))
+    info = registro_para_info_peca(catalogo.obter("628117709R"))
+    assert info["fabricante"] == "Renault"
+    assert info["dimensoes"]["largura"] == 12.5
+    assert info["preco_novo_min"] == 189.9
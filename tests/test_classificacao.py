@@ -0,0 +1,127 @@
+import pytest
+
+from procar import classificacao
+from procar.classificacao import (
+    CATEGORIAS,
+    FABRICANTES_TITULO,
+    SINONIMOS_FABRICANTES,
+    candidatos_fabricante,
+    classificar_codigos,
+    classificar_titulos,
+    extrair_categoria,
+    extrair_fabricante_do_titulo,
+    extrair_fabricante_por_padrao
+)
+from procar.palavras import BuscadorPalavras
+
+
+# Os laços originais, que o buscador substitui: vale a primeira palavra da lista presente no título
+def _categoria_original(titulo):
+    for categoria, palavras_chave in CATEGORIAS.items():
+        for palavra in palavras_chave:
+            if palavra.lower() in titulo.lower():
+                return categoria
+    return None
+
+
+def _fabricante_original(titulo):
+    for fabricante in FABRICANTES_TITULO:
+        if fabricante.lower() in titulo.lower():
+            return SINONIMOS_FABRICANTES.get(fabricante, fabricante)
+    return None
+
+
+TITULOS = [
+    "Painel Interno Renault Sandero",                    # "painel" é de Carroceria e de Interior
+    "Acabamento do painel Fiat Uno",                     # Carroceria vem antes de Interior
+    "Kit disco de embreagem VW Gol",                     # "disco" (Freio) antes de "disco de embreagem"
+    "Motor de partida Bosch GM Onix",                    # "motor" (Motor) antes de "motor de partida"
+    "Coluna de direção Ford Ka",                         # "coluna" (Carroceria) antes de "coluna de direção"
+    "Válvula termostática Toyota Corolla",
+    "Sensor de oxigênio Hyundai HB20",
+    "Barra de direção Honda Fit",
+    "Bomba d'água Nissan March",
+    "Kiabanda Suporte Land Rover",                       # "kia" dentro de outra palavra conta, como no laço
+    "Peça sem nada conhecido",
+    "",
+    "İ Parachoque Citroen C3",                           # lower() muda o tamanho do texto
+    "MERCEDES REFORÇO DO PARACHOQUE",
+]
+
+
+@pytest.mark.parametrize("titulo", TITULOS)
+def test_classificacao_igual_aos_lacos_originais(titulo):
+    assert extrair_categoria(titulo) == _categoria_original(titulo)
+    assert extrair_fabricante_do_titulo(titulo) == _fabricante_original(titulo)
+
+
+def test_classificar_titulos_em_lote():
+    esperado = [{"fabricante": _fabricante_original(titulo), "categoria": _categoria_original(titulo)}
+                for titulo in TITULOS]
+    assert classificar_titulos(TITULOS) == esperado
+    assert classificar_titulos([]) == []
+
+
+def test_palavra_de_duas_categorias_fica_com_a_primeira():
+    assert extrair_categoria("painel") == "Carroceria"
+    assert extrair_categoria("console e painel") == "Carroceria"
+    assert extrair_categoria("console") == "Interior"
+
+
+def test_buscador_palavras():
+    buscador = BuscadorPalavras({
+        "categoria": [("disco", "Freio"), ("painel", "Carroceria"), ("disco de embreagem", "Transmissão"),
+                      ("painel", "Interior")],
+        "termo": [("painel", "painel")]
+    })
+    # Palavra repetida na mesma tabela traz os dois valores, na ordem da lista
+    assert buscador.buscar("Painel") == {"categoria": ["Carroceria", "Interior"], "termo": ["painel"]}
+    # Ocorrências sobrepostas são todas achadas, em ordem de prioridade da tabela
+    assert buscador.buscar("disco de embreagem") == {"categoria": ["Freio", "Transmissão"]}
+    assert buscador.primeiros("disco de embreagem e painel") == {"categoria": "Freio", "termo": "painel"}
+    assert buscador.primeiros_varios(["painel", "", "disco de embreagem"]) == [
+        {"categoria": "Carroceria", "termo": "painel"}, {}, {"categoria": "Freio"}]
+
+
+CODIGOS = {
+    "LR012345": [("Land Rover", 1), ("Volkswagen", 6)],     # prefixo vale antes da forma
+    "jlr-123": [("Land Rover", 1)],
+    "123456AB1C": [("Nissan", 2)],
+    "12345A1234B": [("Hyundai/Kia", 3)],
+    "7701208265": [("Toyota", 4)],
+    "8200123A": [("Renault", 5)],
+    "AB123456": [("Volkswagen", 6)],
+    "123ABC456": [("Volkswagen", 6)],
+    "1234567890AB": [("Honda", 7)],
+    "12345678901": [("BMW", 11)],
+    "A1234567890": [("Ford", 9), ("Mercedes-Benz", 12)],    # Mercedes só com o prefixo "A"
+    "B1234567890": [("Ford", 9)],
+    "123ABC45": [("Mercedes-Benz", 12)],
+    # A regra de 7 dígitos da BMW tem a mesma forma da Fiat: nunca é a primeira
+    "1234567": [("Fiat", 8), ("BMW", 11)],
+    "": [],
+    "---": [],
+    "ÇÃ": [],
+}
+
+
+@pytest.mark.parametrize("codigo", list(CODIGOS))
+def test_candidatos_fabricante_em_ordem_de_prioridade(codigo):
+    assert candidatos_fabricante(codigo) == CODIGOS[codigo]
+    esperado = CODIGOS[codigo][0][0] if CODIGOS[codigo] else None
+    assert extrair_fabricante_por_padrao(codigo) == esperado
+
+
+def test_classificar_codigos_igual_a_um_por_um():
+    codigos = list(CODIGOS) + ["1234567", "77-01-208-265"]
+    assert classificar_codigos(codigos) == [extrair_fabricante_por_padrao(codigo) for codigo in codigos]
+    assert classificar_codigos(codigos, todos=True) == [candidatos_fabricante(codigo) for codigo in codigos]
+    assert classificar_codigos([]) == []
+
+
+def test_classificacao_sem_espaco_no_indice_de_formas(monkeypatch):
+    monkeypatch.setattr(classificacao, "_REGRAS_POR_FORMA", {})
+    monkeypatch.setattr(classificacao, "MAX_FORMAS_INDEXADAS", 0)
+    assert classificar_codigos(["1234567", "A1234567890"], todos=True) == [
+        [("Fiat", 8), ("BMW", 11)], [("Ford", 9), ("Mercedes-Benz", 12)]]
+    assert classificacao._REGRAS_POR_FORMA == {}
@@ -0,0 +1,28 @@
+import pytest
+
+from procar.cli import criar_parser, parte_da_lista
+
+
+def _parte(texto):
+    return criar_parser().parse_args(["batch", "codigos.csv", "-o", "saida.jsonl", "--parte", texto]).parte
+
+
+def test_parte_valida():
+    assert _parte("2/4") == (2, 4)
+    assert _parte("1/1") == (1, 1)
+
+
+@pytest.mark.parametrize("texto", ["0/4", "5/4", "1/0", "abc", "1/2/3", "0/0", ""])
+def test_parte_invalida_e_erro_do_argparse(texto, capsys):
+    with pytest.raises(SystemExit) as saida:
+        _parte(texto)
+    assert saida.value.code == 2
+    assert "parte inválida" in capsys.readouterr().err
+
+
+def test_partes_cobrem_a_lista_uma_vez():
+    codigos = [f"C{numero}" for numero in range(11)]
+    partes = [parte_da_lista(codigos, (indice, 4)) for indice in range(1, 5)]
+    assert sorted(codigo for parte in partes for codigo in parte) == sorted(codigos)
+    assert all(partes)
+    assert parte_da_lista(codigos, (1, 1)) == codigos
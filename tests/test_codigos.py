@@ -0,0 +1,82 @@
+import re
+
+from procar.codigos import IndiceCodigos, contem_codigo, normalizar_codigo, padrao_codigo
+from procar.extracao import extrair_nome_exato_peca
+from procar.pagina import analisar_pagina
+
+
+def test_normalizar_codigo():
+    assert normalizar_codigo(" 628117709-r ") == "628117709R"
+    assert normalizar_codigo("0 986 494 294") == "0986494294"
+
+
+def test_contem_codigo_com_qualquer_formatacao():
+    assert contem_codigo("Pastilha de freio 628117709 R Renault", "628117709R")
+    assert contem_codigo("Pastilha 628117709-r", "628117709 R")
+    assert not contem_codigo("Pastilha 628117708R", "628117709R")
+    assert not contem_codigo("Pastilha", "")
+
+
+def test_contem_codigo_exige_o_codigo_inteiro():
+    # Dígitos de um preço e de outro número não formam o código
+    assert not contem_codigo("Preço R$ 12.345,67 frete 8", "123456")
+    assert not contem_codigo("Pastilha X628117709R", "628117709R")
+    assert not contem_codigo("Pastilha 628117709R2", "628117709R")
+    # Pontuação, sublinhado e fim do texto separam o código
+    assert contem_codigo("pastilha_628117709R.jpg", "628117709R")
+    assert contem_codigo("(628117709-R)", "628117709R")
+    assert contem_codigo("Ref: 123.456", "123456")
+
+
+def test_padrao_codigo():
+    regex = re.compile(r"\b" + padrao_codigo("628117709R") + r"\b", re.IGNORECASE)
+    assert regex.sub("", "Pastilha 628117709-r Renault") == "Pastilha  Renault"
+    assert regex.search("Pastilha 628117709R")
+    assert not regex.search("Pastilha 6281177090R")
+
+
+def test_nome_exato_casa_titulos_formatados():
+    resultados_ml = [{"titulo": "Pastilha De Freio Dianteira 6281-17709-R Clio", "link": "https://ml/1"}]
+    info = extrair_nome_exato_peca([], resultados_ml, [], "628117709R")
+    assert info["nome"] == "Pastilha De Freio Dianteira  Clio"
+
+
+def test_pagina_casa_imagem_e_texto_formatados():
+    html = ("<html><head><title>Pastilha</title></head><body>"
+            "<img src='/fotos/outra.jpg' alt='logo'>"
+            "<img src='/fotos/628117709-r.jpg' alt='foto'>"
+            "<p>Pastilha de freio 628117709 R para Clio</p></body></html>")
+    info = analisar_pagina(html, "628117709R")
+    assert info["imagem_url"] == "/fotos/628117709-r.jpg"
+    assert "628117709 R" in info["texto_relevante"]
+
+
+def test_indice_completar_e_pertencer():
+    indice = IndiceCodigos(["628117709R", "628117710R", "92404-M4000", "", "LR006225"])
+    assert len(indice) == 4
+    assert "92404m4000" in indice
+    assert "92404M400" not in indice
+    assert indice.completar("6281") == ["628117709R", "628117710R"]
+    assert indice.completar("6281", limite=1) == ["628117709R"]
+    assert indice.completar("") == []
+
+
+def test_indice_parecidos_e_sugestoes():
+    indice = IndiceCodigos(["628117709R", "628117709F", "628117790R", "751277663R"])
+    # Uma letra trocada, sobrando ou faltando
+    assert sorted(indice.parecidos("628117709X")) == ["628117709F", "628117709R"]
+    assert indice.parecidos("62811770R") == ["628117709R", "628117790R"]
+    assert indice.sugerir("628117709R") == []
+    assert indice.sugerir("6281177") == ["628117709F", "628117709R", "628117790R"]
+
+
+def test_indice_adicionar_e_remover():
+    indice = IndiceCodigos()
+    indice.adicionar(["B2", "a-1"])
+    indice.adicionar([f"C{numero:03d}" for numero in range(20)])
+    assert indice.completar("", 5) == []
+    assert indice.completar("A") == ["A1"]
+    assert len(indice) == 22
+    indice.remover(["a1", "C000", "nao-existe"])
+    assert "A1" not in indice
+    assert len(indice) == 20
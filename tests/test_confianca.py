@@ -0,0 +1,119 @@
+import pytest
+
+from procar import cache, fontes
+from procar.busca import buscar_informacoes_peca
+from procar.confianca import CONFIANCA_MINIMA, ConfiancaCampos, confianca_do_ambiente
+from procar.metricas import rastrear
+
+CODIGO = "628117709R"
+
+
+# Confiança que só exige o campo testado (os demais já valem com 0)
+def _so_o_campo(campo):
+    return ConfiancaCampos(CODIGO, minima={outro: 0 for outro in CONFIANCA_MINIMA if outro != campo})
+
+
+def _pagina(**info):
+    return {"titulo": "", "preco": None, "compatibilidade": [], "dimensoes": {}, "imagem_url": None, **info}
+
+
+def test_nome_basta_com_fonte_confiavel_ou_dois_titulos_com_codigo():
+    confianca = _so_o_campo("nome")
+    confianca.registrar_nome(10)
+    assert not confianca.atingida()
+    confianca.registrar_nome(13)
+    assert confianca.atingida()
+
+    confianca = _so_o_campo("nome")
+    confianca.registrar_pagina(_pagina(titulo=f"Defletor {CODIGO}"))
+    confianca.registrar_pagina(_pagina(titulo="Defletor sem o código"))
+    assert not confianca.atingida()
+    confianca.registrar_pagina(_pagina(titulo="Defletor 62811-7709R"))
+    assert confianca.atingida()
+
+
+def test_precos_bastam_com_tres_observacoes():
+    confianca = _so_o_campo("precos")
+    confianca.registrar_precos(2)
+    confianca.registrar_pagina(_pagina(preco=0))
+    assert not confianca.atingida()
+    confianca.registrar_pagina(_pagina(preco=189.9))
+    assert confianca.atingida()
+
+
+def test_compatibilidade_basta_com_cinco_veiculos_ou_duas_paginas():
+    confianca = _so_o_campo("compatibilidade")
+    confianca.registrar_pagina(_pagina(compatibilidade=["Sandero", "Logan", "Clio", "Sandero"]))
+    assert confianca.confianca()["compatibilidade"] == 0.6
+    confianca.registrar_pagina(_pagina())
+    assert not confianca.atingida()
+    confianca.registrar_pagina(_pagina(compatibilidade=["Sandero"]))
+    assert confianca.atingida()
+
+    confianca = _so_o_campo("compatibilidade")
+    confianca.registrar_pagina(_pagina(compatibilidade=["Sandero", "Logan", "Clio", "Duster", "Kwid"]))
+    assert confianca.atingida()
+
+
+def test_dimensoes_bastam_com_as_quatro_medidas():
+    confianca = _so_o_campo("dimensoes")
+    confianca.registrar_pagina(_pagina(dimensoes={"largura": 40, "altura": 10, "volume": 3}))
+    assert confianca.confianca()["dimensoes"] == 0.5
+    confianca.registrar_pagina(_pagina(dimensoes={"comprimento": 30}))
+    assert not confianca.atingida()
+    confianca.registrar_pagina(_pagina(dimensoes={"peso": 0.35}))
+    assert confianca.atingida()
+
+
+def test_imagem_basta_com_uma_pagina():
+    confianca = _so_o_campo("imagem_url")
+    confianca.registrar_pagina(_pagina())
+    assert not confianca.atingida()
+    confianca.registrar_pagina(_pagina(imagem_url="https://img.loja.test/628117709R.jpg"))
+    assert confianca.atingida()
+
+
+def test_confianca_minima_do_ambiente(monkeypatch):
+    monkeypatch.setenv("PROCAR_CONFIANCA", "dimensoes=0.5, compatibilidade=0.4,precos=muita,cor=1,nome")
+    assert confianca_do_ambiente() == {"dimensoes": 0.5, "compatibilidade": 0.4}
+
+    confianca = ConfiancaCampos(CODIGO, minima={"nome": 0, "precos": 0, "compatibilidade": 0, "imagem_url": 0})
+    confianca.registrar_pagina(_pagina(dimensoes={"largura": 40, "altura": 10}))
+    assert confianca.atingida()
+
+
+PAGINA = f"""<html><head><title>Defletor Ar Radiador Renault {CODIGO}</title></head><body>
+<img src="https://img.loja.test/{CODIGO}.jpg"><p>R$ 189,90</p>
+<ul><li>Compatível com Sandero 2015</li><li>Compatível com Logan 2014</li><li>Compatível com Clio 2012</li>
+<li>Compatível com Duster 2016</li><li>Compatível com Kwid 2019</li></ul>
+<p>Medidas: largura 40 cm altura 10 cm comprimento 30 cm peso 350 g</p></body></html>"""
+
+
+def test_busca_para_de_analisar_paginas_quando_a_confianca_e_atingida(fita, monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "_cache_pecas", cache.CachePecas(str(tmp_path / "pecas.sqlite")))
+    urls = [f"https://loja.test/defletor-{indice}" for indice in range(5)]
+    monkeypatch.setattr(fontes, "buscar_google", lambda query, num_results=20, timeout=None: [])
+    monkeypatch.setattr(fontes, "buscar_mercado_livre", lambda codigo_peca, timeout=None: [
+        {"titulo": f"Defletor Ar Radiador Renault {CODIGO} Original", "link": url, "preco": 189.9} for url in urls[:3]])
+    monkeypatch.setattr(fontes, "buscar_shopee", lambda codigo_peca, timeout=None: [
+        {"titulo": f"Defletor {CODIGO}", "link": url, "preco": 179.9} for url in urls[3:]])
+    for url in urls:
+        fita.responder(url, PAGINA)
+
+    with rastrear("teste") as rastreamento:
+        info = buscar_informacoes_peca(CODIGO)
+
+    # Uma página já traz tudo; com no máximo duas por domínio ao mesmo tempo, as outras nem saem
+    assert len(fita.pedidos) <= 2
+    trecho = next(trecho for trecho in rastreamento.trechos if (trecho.tipo, trecho.nome) == ("etapa", "paginas"))
+    assert trecho.status == "confianca_atingida"
+    assert trecho.extras["itens"] == 5
+    assert 1 <= trecho.extras["analisadas"] <= len(fita.pedidos)
+    # Páginas puladas pela confiança não deixam o resultado parcial
+    assert not info["parcial"]
+    assert set(info["completude"].values()) == {"completo"}
+
+
+@pytest.mark.parametrize("campo", list(CONFIANCA_MINIMA))
+def test_confianca_comeca_zerada(campo):
+    assert not _so_o_campo(campo).atingida()
@@ -0,0 +1,88 @@
+import json
+
+from procar.estruturados import extrair_dados_estruturados, ler_medida, ler_preco
+from procar.extracao import extrair_informacoes_site
+
+
+def pagina(produto=None, metas="", corpo=""):
+    json_ld = f'<script type="application/ld+json">{json.dumps(produto)}</script>' if produto else ""
+    return f"<html><head><title>Pastilha 628117709R</title>{metas}{json_ld}</head><body>{corpo}</body></html>"
+
+
+def test_ler_preco_separadores():
+    assert ler_preco("189.90") == 189.9
+    assert ler_preco("R$ 189,90") == 189.9
+    assert ler_preco("1.234,56") == 1234.56
+    assert ler_preco("1,234.56") == 1234.56
+    assert ler_preco("R$ 1.234") == 1234.0
+    assert ler_preco("1.234.567,89") == 1234567.89
+    assert ler_preco(99) == 99.0
+
+
+def test_ler_preco_ambiguo_ou_invalido():
+    assert ler_preco("12.3456") is None
+    assert ler_preco("1.2.3,45") is None
+    assert ler_preco("1.23.456") is None
+    assert ler_preco("0,00") is None
+    assert ler_preco("sob consulta") is None
+
+
+def test_ler_medida_unidades():
+    assert ler_medida({"value": 40, "unitCode": "CMT"}) == 40
+    assert ler_medida({"value": 10, "unitCode": "INH"}) == 25.4
+    assert ler_medida({"value": 2, "unitText": "LB"}) == 0.9072
+    assert ler_medida({"value": 500, "unitText": "G"}) == 0.5
+    assert ler_medida("35 mm") == 3.5
+    assert ler_medida(12) == 12
+
+
+def test_ler_medida_unidade_desconhecida():
+    assert ler_medida({"value": 3, "unitCode": "XYZ"}) is None
+    assert ler_medida({"value": 3, "unitText": "palmos"}) is None
+
+
+def test_produto_json_ld():
+    html = pagina({
+        "@context": "https://schema.org",
+        "@graph": [{"@type": "WebPage"}, {
+            "@type": "Product",
+            "name": "Pastilha de freio",
+            "image": ["https://loja/628117709R.jpg"],
+            "brand": {"@type": "Brand", "name": "Renault"},
+            "gtin13": "7891234567890",
+            "offers": {"@type": "Offer", "price": "1.234,56"},
+            "width": {"@type": "QuantitativeValue", "value": 4, "unitCode": "INH"},
+            "weight": {"@type": "QuantitativeValue", "value": 1, "unitCode": "ONZ"},
+            "height": {"@type": "QuantitativeValue", "value": 2, "unitCode": "XYZ"},
+            "isAccessoryOrSparePartFor": [{"@type": "Car", "name": "Clio"}, {"@type": "Car", "name": "Logan"}]
+        }]
+    })
+    campos = extrair_dados_estruturados(html)
+    assert campos["titulo"] == "Pastilha 628117709R"
+    assert campos["preco"] == 1234.56
+    assert campos["marca"] == "Renault"
+    assert campos["gtin"] == "7891234567890"
+    assert campos["imagem_url"] == "https://loja/628117709R.jpg"
+    assert campos["dimensoes"] == {"largura": 10.16, "peso": 0.0283}
+    assert campos["compatibilidade"] == ["Clio", "Logan"]
+
+
+def test_estado_embutido_e_metas():
+    estado = {"props": {"pageProps": {"item": {"title": "Pastilha", "price": 189.9, "thumbnail": "https://x/1.jpg"}}}}
+    html = pagina(metas='<meta property="og:description" content="Jogo de pastilhas">'
+                        '<meta property="product:price:amount" content="150.00">',
+                  corpo=f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(estado)}</script>')
+    campos = extrair_dados_estruturados(html)
+    assert campos["preco"] == 189.9
+    assert campos["imagem_url"] == "https://x/1.jpg"
+    assert campos["descricao"] == "Jogo de pastilhas"
+
+
+def test_imagem_estruturada_perde_para_img_com_codigo(fita):
+    produto = {"@type": "Product", "name": "Pastilha", "image": "https://loja/banner.jpg", "offers": {"price": "10"}}
+    fita.responder("https://loja.test/p1", pagina(produto, corpo='<img src="https://loja/628117709-R.jpg" alt="">'))
+    fita.responder("https://loja.test/p2", pagina(produto, corpo='<img src="https://loja/logo.jpg" alt="">'))
+
+    assert extrair_informacoes_site("https://loja.test/p1", "628117709R")["imagem_url"] == "https://loja/628117709-R.jpg"
+    # Sem <img> com o código, a imagem estruturada fica de reserva
+    assert extrair_informacoes_site("https://loja.test/p2", "628117709R")["imagem_url"] == "https://loja/banner.jpg"
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from procar import extracao
+from procar.agendador import Agendador, FilaEsgotada
+from procar.extracao import extrair_informacoes_site, extrair_informacoes_sites
+from procar.prazo import definir_prazo
+
+
+PAGINA = "<html><head><title>Pastilha 628117709R</title></head><body><p>Pastilha 628117709R</p></body></html>"
+
+
+def test_pagina_nao_e_baixada_depois_de_parar(fita):
+    fita.responder("https://loja.test/p1", PAGINA)
+    info = extrair_informacoes_site("https://loja.test/p1", "628117709R", parar=lambda: True)
+    assert info["titulo"] == ""
+
+    with definir_prazo(0):
+        assert extrair_informacoes_site("https://loja.test/p1", "628117709R")["titulo"] == ""
+
+    assert extrair_informacoes_site("https://loja.test/p1", "628117709R")["titulo"] == "Pastilha 628117709R"
+
+
+def test_paginas_em_andamento_param_quando_basta(fita, monkeypatch):
+    baixadas = []
+    canceladas = []
+    original = extracao.extrair_informacoes_site
+
+    def pagina_lenta(url, codigo_peca, timeout=10, parar=None):
+        if url.endswith("/1"):
+            return original(url, codigo_peca, parar=parar)
+        # As demais páginas ainda estão na fila quando a primeira basta
+        while not parar():
+            time.sleep(0.01)
+        canceladas.append(url)
+        return original(url, codigo_peca, parar=parar)
+
+    monkeypatch.setattr(extracao, "extrair_informacoes_site", pagina_lenta)
+    for indice in range(1, 4):
+        fita.responder(f"https://loja{indice}.test/{indice}", PAGINA)
+
+    resultados = extrair_informacoes_sites([f"https://loja{indice}.test/{indice}" for indice in range(1, 4)],
+                                           "628117709R", ao_concluir=lambda *args: baixadas.append(args[2]["url"]),
+                                           basta=lambda: bool(baixadas))
+    time.sleep(0.1)
+    assert [info["url"] for info in resultados] == ["https://loja1.test/1"]
+    assert sorted(canceladas) == ["https://loja2.test/2", "https://loja3.test/3"]
+
+
+def test_fila_do_dominio_desiste_sem_gastar_ficha():
+    agendador = Agendador({"loja.test": (1, 1)})
+    agendador.aguardar("loja.test")
+    desistir = threading.Event()
+    threading.Timer(0.05, desistir.set).start()
+    inicio = time.monotonic()
+    with pytest.raises(FilaEsgotada):
+        agendador.aguardar("loja.test", desistir=desistir.is_set)
+    assert time.monotonic() - inicio < 0.5
@@ -0,0 +1,54 @@
+import time
+
+from procar import fontes
+from procar.prazo import definir_prazo
+from procar.saude import obter_saude
+
+
+def _fonte_lenta(*argumentos, timeout=None):
+    time.sleep(0.5)
+    return []
+
+
+def _trocar_fontes(monkeypatch, funcao):
+    for nome in ("buscar_google", "buscar_mercado_livre", "buscar_shopee"):
+        monkeypatch.setattr(fontes, nome, funcao)
+
+
+def test_prazo_da_fonte_conta_como_falha(fita, monkeypatch):
+    _trocar_fontes(monkeypatch, _fonte_lenta)
+    monkeypatch.setattr(fontes, "PRAZOS_FONTES", {"google": 0.1, "mercado_livre": 0.1, "shopee": 0.1})
+
+    resultados = fontes.buscar_fontes_em_paralelo("628117709R")
+
+    assert resultados == {"google": [], "mercado_livre": [], "shopee": []}
+    estado = obter_saude().estado()
+    assert estado["fonte:shopee"]["observacoes"] == 1
+    assert estado["fonte:shopee"]["taxa_sucesso"] == 0
+
+
+def test_prazo_da_busca_nao_conta_na_saude(fita, monkeypatch):
+    _trocar_fontes(monkeypatch, _fonte_lenta)
+
+    with definir_prazo(0.1):
+        resultados = fontes.buscar_fontes_em_paralelo("628117709R")
+
+    assert resultados == {"google": [], "mercado_livre": [], "shopee": []}
+    assert not any(chave.startswith("fonte:") and resumo["observacoes"]
+                   for chave, resumo in obter_saude().estado().items())
+
+
+def test_fonte_vazia_por_falta_de_prazo_nao_conta_na_saude(fita, monkeypatch):
+    def fonte_vazia_no_fim_do_prazo(*argumentos, timeout=None):
+        time.sleep(0.15)
+        return []
+
+    _trocar_fontes(monkeypatch, fonte_vazia_no_fim_do_prazo)
+    # As fontes não são cortadas na partida (restante() fingido) e voltam vazias já depois do
+    # fim do prazo da busca
+    with definir_prazo(0.12):
+        monkeypatch.setattr(fontes, "restante", lambda: None)
+        fontes.buscar_fontes_em_paralelo("628117709R")
+
+    assert not any(chave.startswith("fonte:") and resumo["observacoes"]
+                   for chave, resumo in obter_saude().estado().items())
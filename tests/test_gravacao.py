@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from procar import rede
+from procar.gravacao import AdaptadorGravacao, Fita, ServidorReproducao, Simulacao, Troca
+from procar.rede import TAMANHO_BLOCO, baixar, criar_sessao, ler_corpo
+
+
+@pytest.fixture
+def gravada(fita, tmp_path):
+    # Gravação por cima da fita de teste, como se a fita de teste fosse a internet
+    gravada = Fita(str(tmp_path / "gravada.jsonl"))
+    for prefixo in list(rede._sessao.adapters):
+        rede._sessao.mount(prefixo, AdaptadorGravacao(fita.adaptador, gravada))
+    return gravada
+
+
+def test_gravacao_guarda_o_corpo_cortado_no_limite_do_download(fita, gravada, tmp_path):
+    url = "https://loja.test/grande"
+    corpo = "<html>" + "x" * 300_000 + "</html>"
+    fita.responder(url, corpo, headers={"ETag": '"v1"', "Content-Length": str(len(corpo))})
+
+    assert len(baixar(url, max_bytes=100_000).content) == 100_000
+
+    troca = Fita(gravada.caminho).obter(url)
+    assert troca.status == 200
+    assert troca.conteudo == corpo.encode("utf-8")[:100_000]
+    assert troca.headers["ETag"] == '"v1"'
+    assert "Content-Length" not in troca.headers
+    assert troca.duracao_ms is not None
+
+
+def test_gravacao_ignora_o_corpo_cortado_pelo_prazo(fita, gravada):
+    url = "https://loja.test/lenta"
+    fita.responder(url, "x" * (3 * TAMANHO_BLOCO))
+
+    response = ler_corpo(rede.obter_sessao().get(url, stream=True), desistir=lambda: True)
+    assert response.corte == "prazo"
+    assert gravada.obter(url) is None
+
+    ler_corpo(rede.obter_sessao().get(url, stream=True))
+    assert len(gravada.obter(url).conteudo) == 3 * TAMANHO_BLOCO
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    fita = Fita(str(tmp_path / "servida.jsonl"))
+    fita.gravar(Troca("https://loja.test/produto?id=1", 200, {"Content-Type": "text/html; charset=utf-8",
+                                                               "ETag": '"v1"'}, "<html>Peça</html>".encode("utf-8")))
+    servidor = ServidorReproducao(fita, endereco=("127.0.0.1", 0))
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_servidor_de_reproducao(servidor, monkeypatch):
+    monkeypatch.setenv("PROCAR_REPRODUZIR", f"http://127.0.0.1:{servidor.server_port}")
+    sessao = criar_sessao()
+
+    # A URL original vai como parâmetro ao servidor local, que responde com a troca gravada
+    response = sessao.get("https://loja.test/produto?id=1", timeout=5)
+    assert response.status_code == 200
+    assert response.text == "<html>Peça</html>"
+    assert response.headers["ETag"] == '"v1"'
+    assert response.url == "https://loja.test/produto?id=1"
+
+    assert sessao.get("https://loja.test/outra", timeout=5).status_code == 404
+
+    # Falhas simuladas
+    servidor.simulacao = Simulacao(taxa_erros=1.0, status_erro=503, semente=1)
+    assert sessao.get("https://loja.test/produto?id=1", timeout=5).status_code == 503
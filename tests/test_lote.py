@@ -0,0 +1,75 @@
+import csv
+import json
+
+import pytest
+
+from procar.lote import ler_codigos, processar_lote
+
+
+def _info(motivo_parcial=None):
+    return {"nome": "Pastilha", "parcial": bool(motivo_parcial), "motivo_parcial": motivo_parcial,
+            "completude": {"nome": "parcial" if motivo_parcial else "completo"}}
+
+
+def test_ler_codigos_com_cabecalho_e_duplicados():
+    conteudo = "descricao,part_number\nPastilha,628117709R\nDisco,628117709-r\nFiltro,92404M4000\n"
+    assert ler_codigos(conteudo.encode("utf-8-sig")) == ["628117709R", "92404M4000"]
+
+
+@pytest.mark.parametrize("extensao", ["jsonl", "csv"])
+def test_retomada_refaz_cortes_do_prazo_e_erros(tmp_path, extensao):
+    caminho = str(tmp_path / f"saida.{extensao}")
+    # D4 ficou parcial porque uma fonte não respondeu: não é refeita (seria refeita sempre)
+    primeira = {"A1": _info(), "B2": _info("prazo"), "C3": None, "D4": _info("fontes")}
+
+    def buscar_primeira(codigo):
+        if primeira[codigo] is None:
+            raise RuntimeError("sem rede")
+        return primeira[codigo]
+
+    processar_lote(list(primeira), buscar_primeira, caminho, workers=1)
+
+    buscados = []
+
+    def buscar_segunda(codigo):
+        buscados.append(codigo)
+        return _info()
+
+    estatisticas = processar_lote(list(primeira), buscar_segunda, caminho, workers=1)
+
+    assert sorted(buscados) == ["B2", "C3"]
+    assert estatisticas.ja_concluidos == 2
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        if extensao == "csv":
+            linhas = list(csv.DictReader(arquivo))
+        else:
+            linhas = [json.loads(linha) for linha in arquivo]
+    assert sorted(linha["codigo"] for linha in linhas) == ["A1", "B2", "C3", "D4"]
+    assert {linha["codigo"]: linha["motivo_parcial"] or None for linha in linhas}["D4"] == "fontes"
+    assert not any(linha["erro"] for linha in linhas)
+
+    # Uma nova retomada não busca mais nada
+    buscados.clear()
+    processar_lote(list(primeira), buscar_segunda, caminho, workers=1)
+    assert buscados == []
+
+
+def test_retomada_de_csv_antigo(tmp_path):
+    # CSV de uma versão sem a coluna motivo_parcial: parciais eram sempre do prazo
+    caminho = str(tmp_path / "saida.csv")
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["codigo", "nome", "campos_parciais", "erro"])
+        escritor.writerow(["A1", "Pastilha", "", ""])
+        escritor.writerow(["B2", "Pastilha", "precos", ""])
+
+    buscados = []
+    processar_lote(["A1", "B2"], lambda codigo: buscados.append(codigo) or _info(), caminho, workers=1)
+
+    assert buscados == ["B2"]
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        leitor = csv.DictReader(arquivo)
+        linhas = list(leitor)
+    assert "motivo_parcial" in leitor.fieldnames
+    assert [linha["codigo"] for linha in linhas] == ["A1", "B2"]
+    assert linhas[0]["nome"] == "Pastilha"
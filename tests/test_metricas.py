@@ -0,0 +1,56 @@
+import json
+
+from procar import cache, fontes, metricas
+from procar.busca import buscar_informacoes_peca
+from procar.cli import main
+from procar.metricas import ler_metricas, resumir
+
+PAGINA = "https://loja.test/defletor-628117709R"
+HTML = "<html><head><title>Defletor 628117709R</title></head><body><p>R$ 189,90</p></body></html>"
+
+
+def test_busca_grava_os_trechos_de_cada_etapa(fita, monkeypatch, tmp_path, capsys):
+    caminho = tmp_path / "metricas.jsonl"
+    monkeypatch.setattr(metricas, "GRAVAR_METRICAS", True)
+    monkeypatch.setattr(metricas, "caminho_dados", lambda nome: str(tmp_path / nome))
+    monkeypatch.setattr(cache, "_cache_pecas", cache.CachePecas(str(tmp_path / "pecas.sqlite")))
+    monkeypatch.setattr(fontes, "buscar_google", lambda query, num_results=20, timeout=None: [])
+    monkeypatch.setattr(fontes, "buscar_mercado_livre", lambda codigo_peca, timeout=None: [
+        {"titulo": "Defletor Ar Radiador Renault 628117709R", "link": PAGINA, "preco": 189.9}])
+    monkeypatch.setattr(fontes, "buscar_shopee", lambda codigo_peca, timeout=None: [])
+    fita.responder(PAGINA, HTML)
+
+    buscar_informacoes_peca("62811-7709R")
+
+    # Uma linha JSON por busca, com um trecho por etapa, download, espera na fila e parsing
+    linhas = caminho.read_text(encoding="utf-8").splitlines()
+    assert len(linhas) == 1
+    rastreamento = json.loads(linhas[0])
+    assert rastreamento["nome"] == "busca"
+    assert rastreamento["codigo"] == "628117709R"
+    trechos = {(trecho["tipo"], trecho["nome"]): trecho for trecho in rastreamento["trechos"]}
+    assert {("etapa", etapa) for etapa in ("cache_pecas", "catalogo", "fontes", "nome_exato", "paginas",
+                                           "consolidacao")} <= set(trechos)
+    assert {("download", "loja.test"), ("fila", "loja.test"), ("pagina", "loja.test"),
+            ("parse", "estruturados"), ("parse", "pagina")} <= set(trechos)
+    assert trechos[("etapa", "cache_pecas")]["status"] == "ausente"
+    assert trechos[("download", "loja.test")]["bytes"] == len(HTML)
+    assert trechos[("download", "loja.test")]["http_status"] == 200
+    assert trechos[("etapa", "paginas")]["analisadas"] == 1
+    for trecho in rastreamento["trechos"]:
+        assert 0 <= trecho["inicio_ms"] <= rastreamento["duracao_ms"]
+        assert trecho["duracao_ms"] is not None
+
+    # A segunda busca sai do cache de peças, sem downloads
+    buscar_informacoes_peca("628117709R")
+    rastreamentos = ler_metricas(str(caminho))
+    assert len(rastreamentos) == 2
+    assert [trecho["nome"] for trecho in rastreamentos[1]["trechos"]] == ["cache_pecas"]
+    assert rastreamentos[1]["trechos"][0]["status"] == "encontrada"
+
+    resumo = resumir(rastreamentos)
+    assert resumo["etapa:cache_pecas"]["status"] == {"ausente": 1, "encontrada": 1}
+    assert resumo["download:loja.test"]["bytes"] == len(HTML)
+
+    assert main(["metrics", "--arquivo", str(caminho)]) == 0
+    assert json.loads(capsys.readouterr().out)["buscas"] == 2
@@ -0,0 +1,96 @@
+import glob
+import gzip
+import os
+
+import pytest
+
+from procar.pagina import ColetorPagina, analisar_pagina
+from procar.parser_html import backends_disponiveis
+
+DIRETORIO_PAGINAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "paginas")
+PAGINAS = sorted(glob.glob(os.path.join(DIRETORIO_PAGINAS, "*.html.gz")))
+CODIGO = "628117709R"
+
+
+def _ler(caminho):
+    with gzip.open(caminho, "rb") as arquivo:
+        return arquivo.read().decode("utf-8", errors="replace")
+
+
+# Todos os backends instalados devolvem o mesmo que o html.parser (que sempre existe)
+@pytest.mark.parametrize("backend", [backend for backend in backends_disponiveis() if backend != "html.parser"])
+@pytest.mark.parametrize("caminho", PAGINAS, ids=os.path.basename)
+def test_backends_analisam_as_paginas_do_benchmark_igual(caminho, backend):
+    html = _ler(caminho)
+    assert analisar_pagina(html, CODIGO, backend) == analisar_pagina(html, CODIGO, "html.parser")
+
+    # Com ate_bastar, cada backend para em um ponto diferente (pedaços de HTML ou nós da árvore): só
+    # os campos que seguram a leitura batem; texto, compatibilidade e medidas são os do trecho lido
+    curta = analisar_pagina(html, CODIGO, backend, ate_bastar=True)
+    curta_referencia = analisar_pagina(html, CODIGO, "html.parser", ate_bastar=True)
+    for campo in ("titulo", "descricao", "preco", "imagem_url"):
+        assert curta[campo] == curta_referencia[campo]
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_celula_fora_de_tabela_e_descartada(backend):
+    # Como nos navegadores, <td> fora de uma <table> não vira elemento: o texto fica no de fora
+    html = "<p>628117709R</p><td>628117709R medida</td><div><td>Código 628117709R</td></div>"
+    assert analisar_pagina(html, CODIGO, backend)["texto_relevante"] == "628117709R "
+
+    html = "<table><tr><td>628117709R</td><td>Renault</td></tr></table>"
+    assert analisar_pagina(html, CODIGO, backend)["texto_relevante"] == "628117709R "
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_compatibilidade_em_divs_aninhadas(backend):
+    # Como na extração antiga, cada <div> com a palavra-chave conta, com o texto dos filhos junto
+    html = ("<html><body><div>Aplicação: <div>Compatível com Sandero 2015</div>"
+            "<div><p>Serve para Logan 2014</p></div></div><div>Sem nada</div></body></html>")
+    assert analisar_pagina(html, CODIGO, backend)["compatibilidade"] == [
+        "Aplicação: Compatível com Sandero 2015Serve para Logan 2014",
+        "Compatível com Sandero 2015",
+        "Serve para Logan 2014",
+        "Serve para Logan 2014",
+    ]
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_preco_dentro_de_script_e_ignorado(backend):
+    html = ('<html><head><script>var recomendado = "R$ 99,90"; var texto = "compatível com tudo";</script>'
+            "<style>.preco:after { content: 'R$ 1,00' }</style></head>"
+            "<body><p>Por R$ 189,90 à vista</p></body></html>")
+    resultado = analisar_pagina(html, CODIGO, backend)
+    assert resultado["preco"] == 189.90
+    assert resultado["compatibilidade"] == []
+
+    # Sem preço visível, o do script não vale
+    assert analisar_pagina("<html><script>preco = 'R$ 99,90'</script><p>Consulte</p></html>", CODIGO,
+                           backend)["preco"] is None
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_campos_limitam_a_leitura(backend):
+    html = ("<html><head><title>Defletor 628117709R</title><meta name='description' content='Defletor'></head>"
+            "<body><img src='/628117709R.jpg'><p>R$ 189,90</p><p>Peça 628117709R</p>"
+            "<li>Compatível com Sandero</li><li>Medidas: largura 10 cm altura 5 cm comprimento 20 cm peso 1 kg</li>"
+            "</body></html>")
+    completo = analisar_pagina(html, CODIGO, backend)
+    assert completo["preco"] == 189.90 and completo["imagem_url"] and completo["compatibilidade"]
+
+    resultado = analisar_pagina(html, CODIGO, backend, campos=["preco", "dimensoes"])
+    assert resultado["preco"] == 189.90
+    assert resultado["dimensoes"] == completo["dimensoes"]
+    assert resultado["compatibilidade"] == []
+    assert resultado["imagem_url"] is None
+    assert resultado["texto_relevante"] == ""
+    # Título e descrição saem de graça da leitura e voltam sempre
+    assert resultado["titulo"] == completo["titulo"]
+
+    # Só o preço pedido: a leitura pode parar assim que ele aparece
+    coletor = ColetorPagina(CODIGO, campos=["preco"])
+    assert not coletor.basta()
+    coletor.iniciar("p", {})
+    coletor.texto("R$ 10,00")
+    coletor.fechar("p")
+    assert coletor.basta()
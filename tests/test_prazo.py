@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from procar.metricas import submeter
+from procar.prazo import PrazoEsgotado, definir_prazo, esgotado, limitar_timeout, restante
+
+
+def test_sem_prazo():
+    assert restante() is None
+    assert not esgotado()
+    assert limitar_timeout(10) == 10
+    with definir_prazo(None):
+        assert restante() is None
+
+
+def test_prazos_encaixados_valem_o_menor():
+    with definir_prazo(5):
+        with definir_prazo(60):
+            assert restante() <= 5
+        with definir_prazo(0.5):
+            assert restante() <= 0.5
+            assert limitar_timeout(10) <= 0.5
+        assert 0.5 < restante() <= 5
+    assert restante() is None
+
+
+def test_prazo_esgotado():
+    with definir_prazo(0.01):
+        time.sleep(0.02)
+        assert esgotado()
+        assert restante() == 0
+        with pytest.raises(PrazoEsgotado):
+            limitar_timeout(10)
+
+
+def test_prazo_vale_nas_threads_do_executor():
+    with ThreadPoolExecutor(max_workers=1) as executor, definir_prazo(2):
+        assert 0 < submeter(executor, restante).result() <= 2
+        # Sem submeter, a thread não herda o prazo
+        assert executor.submit(restante).result() is None
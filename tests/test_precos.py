@@ -0,0 +1,54 @@
+import multiprocessing
+
+from procar.precos import HistoricoPrecos
+
+
+def _gravar(diretorio, codigo, quantidade):
+    historico = HistoricoPrecos(diretorio)
+    for indice in range(quantidade):
+        historico.registrar(codigo, [("mercado_livre", 100.0 + indice % 50)], categoria="Freio")
+
+
+def test_agregados_e_historico(tmp_path):
+    historico = HistoricoPrecos(str(tmp_path))
+    historico.registrar("628117709R", [("mercado_livre", 100.0), ("shopee", 200.0), ("site", 0)], categoria="Freio")
+
+    assert len(historico) == 2
+    resumo = historico.agregado_codigo("628117709-R")
+    assert resumo["contagem"] == 2
+    assert resumo["minimo"] == 100.0
+    assert resumo["maximo"] == 200.0
+    assert historico.agregado_categoria("Freio")["contagem"] == 2
+    assert [item["fonte"] for item in historico.historico("628117709R")] == ["mercado_livre", "shopee"]
+
+
+def test_recupera_linhas_nao_agregadas(tmp_path):
+    historico = HistoricoPrecos(str(tmp_path))
+    historico.registrar("CODA", [("site", 50.0)])
+
+    # Simula uma queda depois das colunas e antes dos agregados
+    historico._gravar_estado("linhas_agregadas", 0)
+    historico._conexao.execute("DELETE FROM agregados")
+    historico._conexao.commit()
+
+    reaberto = HistoricoPrecos(str(tmp_path))
+    assert reaberto.agregado_codigo("CODA")["contagem"] == 1
+
+
+def test_varios_processos_no_mesmo_historico(tmp_path):
+    contexto = multiprocessing.get_context("spawn")
+    processos = [
+        contexto.Process(target=_gravar, args=(str(tmp_path), codigo, 300))
+        for codigo in ("CODA", "CODB")
+    ]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join(120)
+        assert processo.exitcode == 0
+
+    historico = HistoricoPrecos(str(tmp_path))
+    assert len(historico) == 600
+    contagens = [historico.agregado_codigo(codigo)["contagem"] for codigo in ("CODA", "CODB")]
+    assert contagens == [300, 300]
+    assert historico.agregado_categoria("Freio")["contagem"] == 600
@@ -0,0 +1,147 @@
+import io
+import threading
+import time
+
+import pytest
+from requests import Response
+
+from procar.gravacao import Simulacao
+from procar.pagina import analisar_pagina
+from procar.parser_html import backends_disponiveis
+from procar.prazo import definir_prazo
+from procar.rede import ENCODING_PADRAO, TAMANHO_BLOCO, baixar, descobrir_encoding, ler_corpo
+
+
+def _resposta(corpo, headers=None):
+    response = Response()
+    response.status_code = 200
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(corpo)
+    return response
+
+
+def test_ler_corpo_para_no_limite_de_bytes():
+    corpo = b"x" * (3 * TAMANHO_BLOCO)
+    response = ler_corpo(_resposta(corpo), max_bytes=TAMANHO_BLOCO + 10)
+    assert len(response.content) == TAMANHO_BLOCO + 10
+    assert response.corte == "limite"
+
+    # Corpo menor que o limite: lido inteiro, sem corte
+    response = ler_corpo(_resposta(corpo), max_bytes=len(corpo) + 1)
+    assert response.content == corpo
+    assert response.corte is None
+
+    response = ler_corpo(_resposta(corpo), max_bytes=None)
+    assert response.content == corpo
+    assert response.corte is None
+
+
+def test_ler_corpo_cortado_pelo_prazo_ou_pela_desistencia():
+    corpo = b"x" * (3 * TAMANHO_BLOCO)
+    with definir_prazo(0.01):
+        time.sleep(0.02)
+        response = ler_corpo(_resposta(corpo))
+    assert response.corte == "prazo"
+    assert len(response.content) == TAMANHO_BLOCO
+
+    response = ler_corpo(_resposta(corpo), desistir=lambda: True)
+    assert response.corte == "prazo"
+    assert len(response.content) == TAMANHO_BLOCO
+
+    # O limite vale antes do prazo quando os dois acontecem no mesmo bloco
+    response = ler_corpo(_resposta(corpo), max_bytes=TAMANHO_BLOCO, desistir=lambda: True)
+    assert response.corte == "limite"
+
+
+def test_descobrir_encoding():
+    # Content-Type tem precedência sobre o <meta>
+    assert descobrir_encoding({"Content-Type": "text/html; charset=ISO-8859-1"},
+                              b'<meta charset="utf-8">') == "iso8859-1"
+    assert descobrir_encoding({"Content-Type": "text/html"}, b'<html><meta charset="windows-1252">') == "cp1252"
+    assert descobrir_encoding({}, b'<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">') \
+        == "iso8859-1"
+    # Sem charset, ou com um charset desconhecido: UTF-8
+    assert descobrir_encoding({}, b"<html><body>sem charset</body></html>") == ENCODING_PADRAO
+    assert descobrir_encoding({"Content-Type": "text/html; charset=inventado"}, b"") == ENCODING_PADRAO
+    # O <meta> só é procurado no início da página
+    assert descobrir_encoding({}, b" " * 5000 + b'<meta charset="windows-1252">') == ENCODING_PADRAO
+
+
+def test_ler_corpo_decodifica_pelo_meta():
+    corpo = '<html><meta charset="iso-8859-1"><p>Pastilha dianteira, aplicação: Clio</p></html>'.encode("latin-1")
+    response = ler_corpo(_resposta(corpo, {"Content-Type": "text/html"}))
+    assert "aplicação" in response.text
+
+
+# A leitura só é interrompida entre um pedaço e outro (TAMANHO_PEDACO): o recheio separa o início
+# da página, que já tem tudo, do fim
+PAGINA = """
+<html><head><title>Pastilha de freio 7701208265</title>
+<meta name="description" content="Jogo de pastilhas"></head>
+<body>
+<img src="/fotos/7701208265.jpg" alt="Pastilha">
+<p>R$ 129,90</p>
+<div>Compatível com Renault Clio 2012</div>
+<ul><li>Medidas: largura 12 cm altura 5 cm comprimento 15 cm peso 400 g</li></ul>
+""" + "<p>Texto de recheio sem nada de interessante.</p>\n" * 2000 + """
+<div>Outras medidas: largura 99 cm altura 99 cm comprimento 99 cm peso 9 kg</div>
+<p>Código 7701208265 também no fim da página</p>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_analisar_pagina_ate_bastar(backend):
+    completa = analisar_pagina(PAGINA, "7701208265", backend)
+    curta = analisar_pagina(PAGINA, "7701208265", backend, ate_bastar=True)
+
+    # O que a consolidação usa é o mesmo...
+    for campo in ("titulo", "descricao", "preco", "imagem_url", "compatibilidade"):
+        assert curta[campo] == completa[campo]
+    # ...mas as medidas são as do trecho lido, e não as do fim da página
+    assert completa["dimensoes"] == {"largura": 99.0, "altura": 99.0, "comprimento": 99.0, "peso": 9.0}
+    assert curta["dimensoes"] == {"largura": 12.0, "altura": 5.0, "comprimento": 15.0, "peso": 0.4}
+    assert "também no fim da página" in completa["texto_relevante"]
+    assert "também no fim da página" not in curta["texto_relevante"]
+
+
+def _baixar_em_paralelo(url, desistencias):
+    resultados = {}
+
+    def baixar_pagina(indice, desistir):
+        try:
+            resultados[indice] = baixar(url, usar_cache=False, desistir=desistir).text
+        except TimeoutError as e:
+            resultados[indice] = e
+
+    threads = [threading.Thread(target=baixar_pagina, args=(indice, desistir))
+               for indice, desistir in enumerate(desistencias)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(2)
+    return resultados
+
+
+def test_baixar_divide_o_download_entre_quem_pode_desistir(fita):
+    url = "https://loja.test/produto"
+    fita.responder(url, "<html>produto</html>")
+    fita.adaptador.simulacao = Simulacao(latencia_ms=200)
+
+    resultados = _baixar_em_paralelo(url, [lambda: False, lambda: False, None])
+    assert resultados == {0: "<html>produto</html>", 1: "<html>produto</html>", 2: "<html>produto</html>"}
+    assert len(fita.pedidos) == 1
+
+
+def test_desistencia_de_um_pedido_nao_corta_o_download_dos_outros(fita):
+    url = "https://loja.test/produto"
+    fita.responder(url, "<html>produto</html>")
+    fita.adaptador.simulacao = Simulacao(latencia_ms=300)
+    desistiu = threading.Event()
+    threading.Timer(0.1, desistiu.set).start()
+
+    resultados = _baixar_em_paralelo(url, [lambda: False, desistiu.is_set])
+    assert resultados[0] == "<html>produto</html>"
+    assert isinstance(resultados[1], TimeoutError)
+    assert len(fita.pedidos) == 1
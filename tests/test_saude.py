@@ -0,0 +1,72 @@
+import time
+
+from procar import saude as modulo_saude
+from procar.saude import ABERTO, FECHADO, TESTANDO, SaudeFontes, resposta_saudavel
+
+
+def _abrir(saude, chave):
+    for _ in range(modulo_saude.MIN_OBSERVACOES):
+        saude.registrar(chave, False, itens=0, duracao=0.1)
+
+
+def test_circuito_abre_com_muitas_falhas():
+    saude = SaudeFontes()
+    for _ in range(modulo_saude.MIN_OBSERVACOES - 1):
+        saude.registrar("fonte:google", False)
+    # Poucas observações: continua fechado
+    assert saude.permitir("fonte:google")
+    saude.registrar("fonte:google", False)
+    assert saude.estado()["fonte:google"]["estado"] == ABERTO
+    assert not saude.permitir("fonte:google")
+    # Outras chaves não são afetadas
+    assert saude.permitir("fonte:shopee")
+
+
+def test_poucas_falhas_nao_abrem():
+    saude = SaudeFontes()
+    for indice in range(modulo_saude.JANELA_SAUDE):
+        saude.registrar("dominio:loja.test", indice % 3 == 0)
+    assert saude.estado()["dominio:loja.test"]["estado"] == FECHADO
+
+
+def test_teste_depois_da_espera(monkeypatch):
+    monkeypatch.setattr(modulo_saude, "ESPERA_INICIAL", 0.05)
+    saude = SaudeFontes()
+    _abrir(saude, "fonte:shopee")
+    assert not saude.permitir("fonte:shopee")
+
+    time.sleep(0.06)
+    # Só uma consulta de teste passa
+    assert saude.permitir("fonte:shopee")
+    assert saude.estado()["fonte:shopee"]["estado"] == TESTANDO
+    assert not saude.permitir("fonte:shopee")
+
+    # Teste falhou: reabre com o dobro da espera
+    saude.registrar("fonte:shopee", False)
+    assert saude.estado()["fonte:shopee"]["estado"] == ABERTO
+    time.sleep(0.06)
+    assert not saude.permitir("fonte:shopee")
+    time.sleep(0.08)
+    assert saude.permitir("fonte:shopee")
+
+    # Teste deu certo: fecha e esquece as falhas
+    saude.registrar("fonte:shopee", True, itens=3)
+    estado = saude.estado()["fonte:shopee"]
+    assert estado["estado"] == FECHADO
+    assert estado["observacoes"] == 1
+    assert saude.permitir("fonte:shopee")
+
+
+def test_reiniciar():
+    saude = SaudeFontes()
+    _abrir(saude, "fonte:google")
+    saude.reiniciar()
+    assert saude.permitir("fonte:google")
+    assert saude.estado()["fonte:google"]["observacoes"] == 0
+
+
+def test_resposta_saudavel():
+    assert resposta_saudavel(200)
+    assert resposta_saudavel(404)
+    assert not resposta_saudavel(429)
+    assert not resposta_saudavel(503)
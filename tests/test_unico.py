@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from procar.unico import ChamadaUnica
+
+
+def test_chamadas_simultaneas_executam_uma_vez():
+    chamada_unica = ChamadaUnica()
+    execucoes = []
+    esperando = []
+    liberar = threading.Event()
+
+    def funcao():
+        execucoes.append(1)
+        liberar.wait(1)
+        return "resultado"
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(
+        chamada_unica.executar("chave", funcao, ao_esperar=lambda: esperando.append(1)))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while len(esperando) < 4:
+        time.sleep(0.005)
+    assert chamada_unica.andamento() == {"chave": 4}
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert execucoes == [1]
+    assert resultados == ["resultado"] * 5
+    # Nada fica guardado: a próxima chamada executa de novo
+    assert chamada_unica.andamento() == {}
+    chamada_unica.executar("chave", funcao)
+    assert execucoes == [1, 1]
+
+
+def test_erro_chega_a_todos():
+    chamada_unica = ChamadaUnica()
+    comecou = threading.Event()
+
+    def funcao():
+        comecou.set()
+        time.sleep(0.05)
+        raise ValueError("falhou")
+
+    erros = []
+
+    def esperar():
+        comecou.wait(1)
+        try:
+            chamada_unica.executar("chave", funcao)
+        except ValueError as e:
+            erros.append(e)
+
+    seguidor = threading.Thread(target=esperar)
+    seguidor.start()
+    with pytest.raises(ValueError):
+        chamada_unica.executar("chave", funcao)
+    seguidor.join()
+    assert len(erros) == 1
+
+
+def test_limite_de_espera():
+    chamada_unica = ChamadaUnica()
+    comecou = threading.Event()
+    liberar = threading.Event()
+
+    def lenta():
+        comecou.set()
+        liberar.wait(1)
+        return 1
+
+    lider = threading.Thread(target=chamada_unica.executar, args=("chave", lenta))
+    lider.start()
+    comecou.wait(1)
+    with pytest.raises(TimeoutError):
+        chamada_unica.executar("chave", lenta, limite=0.05)
+    liberar.set()
+    lider.join()
+    assert chamada_unica.andamento() == {}
+
+
+def test_desistencia_de_quem_espera():
+    chamada_unica = ChamadaUnica()
+    comecou = threading.Event()
+    liberar = threading.Event()
+    desistir_lider = threading.Event()
+    desistir_seguidor = threading.Event()
+    cortes = []
+
+    def lenta():
+        comecou.set()
+        while not liberar.wait(0.01):
+            if chamada_unica.desistiram("chave"):
+                cortes.append(1)
+                return "cortado"
+        return "inteiro"
+
+    resultados = []
+    lider = threading.Thread(target=lambda: resultados.append(
+        chamada_unica.executar("chave", lenta, desistir=desistir_lider.is_set)))
+    lider.start()
+    comecou.wait(1)
+
+    # Quem espera e desiste sai sozinho; a execução continua para o líder
+    seguidor = threading.Thread(target=lambda: resultados.append(
+        pytest.raises(TimeoutError, chamada_unica.executar, "chave", lenta, desistir=desistir_seguidor.is_set)))
+    seguidor.start()
+    while chamada_unica.andamento() != {"chave": 1}:
+        time.sleep(0.005)
+    desistir_seguidor.set()
+    seguidor.join(1)
+    assert not seguidor.is_alive()
+    assert chamada_unica.andamento() == {"chave": 0}
+    assert not cortes
+
+    # Com todos os interessados desistindo, a execução pode ser cortada
+    desistir_lider.set()
+    lider.join(1)
+    assert cortes == [1]
+    assert resultados[-1] == "cortado"
+
+
+def test_interessado_sem_desistencia_segura_a_execucao():
+    chamada_unica = ChamadaUnica()
+    comecou = threading.Event()
+    liberar = threading.Event()
+
+    def lenta():
+        comecou.set()
+        liberar.wait(1)
+        return 1
+
+    lider = threading.Thread(target=chamada_unica.executar, args=("chave", lenta), kwargs={"desistir": lambda: True})
+    lider.start()
+    comecou.wait(1)
+    assert chamada_unica.desistiram("chave")
+
+    seguidor = threading.Thread(target=chamada_unica.executar, args=("chave", lenta))
+    seguidor.start()
+    while chamada_unica.andamento() != {"chave": 1}:
+        time.sleep(0.005)
+    assert not chamada_unica.desistiram("chave")
+    liberar.set()
+    lider.join()
+    seguidor.join()
+    assert not chamada_unica.desistiram("chave")